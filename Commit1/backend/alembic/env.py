@@ -12,7 +12,7 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.database import Base
-from app.models import Korisnik, Lokacija, Slika, Izlozba, Prijava
+from app.models import Korisnik, Lokacija, Slika, Izlozba, Prijava, ArticRad
 from app.config import settings
 
 # this is the Alembic Config object
@@ -0,0 +1,39 @@
+"""Dodavanje brojača prodatih karata
+
+Revision ID: 004
+Revises: 003
+Create Date: 2024-01-01
+
+Četvrta migracija - dodaje kolonu prodato_karata na izlozbe kako bi se
+preostali kapacitet računao bez učitavanja svih prijava
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'izlozbe',
+        sa.Column('prodato_karata', sa.Integer(), nullable=False, server_default='0')
+    )
+    
+    # Popunjavanje brojača iz postojećih prijava
+    op.execute(
+        """
+        UPDATE izlozbe SET prodato_karata = COALESCE((
+            SELECT SUM(prijave.broj_karata)
+            FROM prijave
+            WHERE prijave.id_izlozba = izlozbe.id_izlozba
+        ), 0)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('izlozbe', 'prodato_karata')
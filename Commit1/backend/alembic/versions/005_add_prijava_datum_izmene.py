@@ -0,0 +1,27 @@
+"""Dodavanje datuma izmene prijave
+
+Revision ID: 005
+Revises: 004
+Create Date: 2024-01-01
+
+Peta migracija - dodaje datum_izmene na prijave (verzija reda za ETag)
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'prijave',
+        sa.Column('datum_izmene', sa.DateTime(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('prijave', 'datum_izmene')
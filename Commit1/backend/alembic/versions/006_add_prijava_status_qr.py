@@ -0,0 +1,33 @@
+"""Dodavanje statusa generisanja QR koda
+
+Revision ID: 006
+Revises: 005
+Create Date: 2024-01-01
+
+Šesta migracija - dodaje status_qr na prijave; QR slika se generiše
+u pozadini posle potvrde prijave
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'prijave',
+        sa.Column('status_qr', sa.String(20), nullable=False, server_default='na_cekanju')
+    )
+    
+    # Postojeće prijave već imaju generisanu sliku
+    op.execute(
+        "UPDATE prijave SET status_qr = 'spreman' WHERE slika_qr IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('prijave', 'status_qr')
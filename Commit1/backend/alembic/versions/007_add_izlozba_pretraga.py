@@ -0,0 +1,103 @@
+"""Full-text pretraga izložbi
+
+Revision ID: 007
+Revises: 006
+Create Date: 2024-01-01
+
+Sedma migracija - dodaje normalizovan dokument za pretragu (pretraga)
+i, na PostgreSQL-u, GIN indeks nad tsvector-om sa težinama
+"""
+import re
+import unicodedata
+from typing import Optional, Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Mora se poklapati sa izlozba_tsvector() iz app/services/search_service.py
+TSVECTOR = (
+    "setweight(to_tsvector('simple', split_part(pretraga, '|', 1)), 'A') || "
+    "setweight(to_tsvector('simple', split_part(pretraga, '|', 2)), 'B') || "
+    "setweight(to_tsvector('simple', split_part(pretraga, '|', 3)), 'C')"
+)
+
+# Normalizacija zamrznuta u trenutku migracije (kopija app/utils/search.py) -
+# kasnija izmena aplikacije ne sme promeniti podatke koje migracija upisuje
+_CIRILICA = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "ђ": "dj", "е": "e",
+    "ж": "z", "з": "z", "и": "i", "ј": "j", "к": "k", "л": "l", "љ": "lj",
+    "м": "m", "н": "n", "њ": "nj", "о": "o", "п": "p", "р": "r", "с": "s",
+    "т": "t", "ћ": "c", "у": "u", "ф": "f", "х": "h", "ц": "c", "ч": "c",
+    "џ": "dz", "ш": "s",
+}
+_LATINICA = {"đ": "dj", "ß": "ss", "æ": "ae", "ø": "o", "ł": "l"}
+_PRESLOVLJAVANJE = str.maketrans({**_CIRILICA, **_LATINICA})
+_TOKEN = re.compile(r"[a-z0-9]+")
+# Broj redova po čitanju i po grupnom UPDATE-u
+BATCH_SIZE = 1000
+
+
+def _search_key(text: Optional[str]) -> str:
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", text.lower().translate(_PRESLOVLJAVANJE))
+    return " ".join(_TOKEN.findall("".join(c for c in text if not unicodedata.combining(c))))
+
+
+def _search_document(*fields: Optional[str]) -> str:
+    return " | ".join(_search_key(field) for field in fields)
+
+
+def _backfill(conn, table, id_column: str, target: str, sources, compute) -> None:
+    """Popunjava kolonu target po grupama (keyset čitanje + executemany UPDATE)"""
+    pk = table.c[id_column]
+    update = (
+        table.update()
+        .where(pk == sa.bindparam('b_id'))
+        .values({target: sa.bindparam('b_value')})
+    )
+    last_id = None
+    while True:
+        query = sa.select(pk, *(table.c[name] for name in sources)).order_by(pk).limit(BATCH_SIZE)
+        if last_id is not None:
+            query = query.where(pk > last_id)
+        rows = conn.execute(query).all()
+        if not rows:
+            return
+        conn.execute(update, [
+            {'b_id': row[0], 'b_value': compute(*row[1:])} for row in rows
+        ])
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    op.add_column('izlozbe', sa.Column('pretraga', sa.Text(), nullable=True))
+    
+    # Popunjavanje dokumenta (normalizacija je u Python-u: ćirilica, dijakritici)
+    conn = op.get_bind()
+    izlozbe = sa.table(
+        'izlozbe',
+        sa.column('id_izlozba', sa.Integer),
+        sa.column('naslov', sa.String),
+        sa.column('kratak_opis', sa.String),
+        sa.column('opis', sa.Text),
+        sa.column('pretraga', sa.Text),
+    )
+    _backfill(
+        conn, izlozbe, 'id_izlozba', 'pretraga', ('naslov', 'kratak_opis', 'opis'), _search_document
+    )
+    
+    if conn.dialect.name == 'postgresql':
+        op.execute(
+            f"CREATE INDEX ix_izlozbe_pretraga ON izlozbe USING gin (({TSVECTOR}))"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_izlozbe_pretraga', 'izlozbe')
+    op.drop_column('izlozbe', 'pretraga')
@@ -0,0 +1,120 @@
+"""Normalizovani ključevi za pretragu
+
+Revision ID: 008
+Revises: 007
+Create Date: 2024-01-01
+
+Osma migracija - dodaje normalizovane ključeve (ćirilica -> latinica,
+bez dijakritika) za lokacije i slike, i indekse za pretragu korisnika
+bez razlike velikih i malih slova
+"""
+import re
+import unicodedata
+from typing import Optional, Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Normalizacija zamrznuta u trenutku migracije (kopija app/utils/search.py) -
+# kasnija izmena aplikacije ne sme promeniti podatke koje migracija upisuje
+_CIRILICA = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "ђ": "dj", "е": "e",
+    "ж": "z", "з": "z", "и": "i", "ј": "j", "к": "k", "л": "l", "љ": "lj",
+    "м": "m", "н": "n", "њ": "nj", "о": "o", "п": "p", "р": "r", "с": "s",
+    "т": "t", "ћ": "c", "у": "u", "ф": "f", "х": "h", "ц": "c", "ч": "c",
+    "џ": "dz", "ш": "s",
+}
+_LATINICA = {"đ": "dj", "ß": "ss", "æ": "ae", "ø": "o", "ł": "l"}
+_PRESLOVLJAVANJE = str.maketrans({**_CIRILICA, **_LATINICA})
+_TOKEN = re.compile(r"[a-z0-9]+")
+# Broj redova po čitanju i po grupnom UPDATE-u
+BATCH_SIZE = 1000
+
+
+def _search_key(text: Optional[str]) -> str:
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", text.lower().translate(_PRESLOVLJAVANJE))
+    return " ".join(_TOKEN.findall("".join(c for c in text if not unicodedata.combining(c))))
+
+
+def _search_document(*fields: Optional[str]) -> str:
+    return " | ".join(_search_key(field) for field in fields)
+
+
+def _backfill(conn, table, id_column: str, target: str, sources, compute) -> None:
+    """Popunjava kolonu target po grupama (keyset čitanje + executemany UPDATE)"""
+    pk = table.c[id_column]
+    update = (
+        table.update()
+        .where(pk == sa.bindparam('b_id'))
+        .values({target: sa.bindparam('b_value')})
+    )
+    last_id = None
+    while True:
+        query = sa.select(pk, *(table.c[name] for name in sources)).order_by(pk).limit(BATCH_SIZE)
+        if last_id is not None:
+            query = query.where(pk > last_id)
+        rows = conn.execute(query).all()
+        if not rows:
+            return
+        conn.execute(update, [
+            {'b_id': row[0], 'b_value': compute(*row[1:])} for row in rows
+        ])
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    is_postgresql = conn.dialect.name == 'postgresql'
+    
+    # Lokacije - ključ grada (pretraga po početku naziva)
+    op.add_column('lokacije', sa.Column('grad_kljuc', sa.String(100), nullable=True))
+    lokacije = sa.table(
+        'lokacije',
+        sa.column('id_lokacija', sa.Integer),
+        sa.column('grad', sa.String),
+        sa.column('grad_kljuc', sa.String),
+    )
+    _backfill(conn, lokacije, 'id_lokacija', 'grad_kljuc', ('grad',), _search_key)
+    # varchar_pattern_ops - LIKE 'prefiks%' koristi indeks i van C kolacije
+    op.create_index(
+        'ix_lokacije_grad_kljuc', 'lokacije', ['grad_kljuc'],
+        postgresql_ops={'grad_kljuc': 'varchar_pattern_ops'}
+    )
+    
+    # Slike - dokument za pretragu (naslov | fotograf | opis)
+    op.add_column('slike', sa.Column('pretraga', sa.Text(), nullable=True))
+    slike = sa.table(
+        'slike',
+        sa.column('id_slika', sa.Integer),
+        sa.column('naslov', sa.String),
+        sa.column('fotograf', sa.String),
+        sa.column('opis', sa.Text),
+        sa.column('pretraga', sa.Text),
+    )
+    _backfill(conn, slike, 'id_slika', 'pretraga', ('naslov', 'fotograf', 'opis'), _search_document)
+    if is_postgresql:
+        # Trigram indeks - LIKE '%rec%' bez skeniranja cele tabele
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(
+            "CREATE INDEX ix_slike_pretraga_trgm ON slike USING gin (pretraga gin_trgm_ops)"
+        )
+    
+    # Korisnici - provera duplikata pri registraciji
+    op.create_index('ix_korisnici_username_lower', 'korisnici', [sa.text('lower(username)')])
+    op.create_index('ix_korisnici_email_lower', 'korisnici', [sa.text('lower(email)')])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_korisnici_email_lower', 'korisnici')
+    op.drop_index('ix_korisnici_username_lower', 'korisnici')
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_slike_pretraga_trgm', 'slike')
+    op.drop_column('slike', 'pretraga')
+    op.drop_index('ix_lokacije_grad_kljuc', 'lokacije')
+    op.drop_column('lokacije', 'grad_kljuc')
@@ -0,0 +1,43 @@
+"""Prostorni indeks lokacija
+
+Revision ID: 009
+Revises: 008
+Create Date: 2024-01-01
+
+Deveta migracija - GiST indeks nad geography tačkom lokacije za pretragu
+po blizini (samo PostgreSQL sa dostupnim PostGIS-om; bez njega aplikacija
+koristi grid indeks u memoriji)
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Isti izraz kao geo_service.lokacija_geography() - inače planer ne koristi indeks
+GEOGRAFIJA = "geography(ST_SetSRID(ST_MakePoint(g_duzina, g_sirina), 4326))"
+
+
+def _postgis_dostupan(conn) -> bool:
+    return bool(conn.execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'postgis'")
+    ).scalar())
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql' or not _postgis_dostupan(conn):
+        return
+    
+    op.execute("CREATE EXTENSION IF NOT EXISTS postgis")
+    op.execute(
+        f"CREATE INDEX ix_lokacije_geografija ON lokacije USING gist (({GEOGRAFIJA}))"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_lokacije_geografija")
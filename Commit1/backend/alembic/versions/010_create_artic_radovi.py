@@ -0,0 +1,53 @@
+"""Lokalni mirror Artic radova
+
+Revision ID: 010
+Revises: 009
+Create Date: 2024-01-01
+
+Deseta migracija - tabela artic_radovi (metapodaci radova sa Art
+Institute of Chicago API) sa indeksom za inkrementalnu sinhronizaciju
+i, na PostgreSQL-u, trigram indeksom za pretragu
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '010'
+down_revision: Union[str, None] = '009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'artic_radovi',
+        sa.Column('id_artic', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('naslov', sa.String(500), nullable=True),
+        sa.Column('umetnik', sa.Text(), nullable=True),
+        sa.Column('datum', sa.String(200), nullable=True),
+        sa.Column('image_id', sa.String(100), nullable=True),
+        sa.Column('opis', sa.Text(), nullable=True),
+        sa.Column('dimenzije', sa.Text(), nullable=True),
+        sa.Column('tehnika', sa.Text(), nullable=True),
+        sa.Column('sirina', sa.Integer(), nullable=True),
+        sa.Column('visina', sa.Integer(), nullable=True),
+        sa.Column('lqip', sa.Text(), nullable=True),
+        sa.Column('poslednja_izmena', sa.DateTime(), nullable=True),
+        sa.Column('pretraga', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('id_artic')
+    )
+    op.create_index('ix_artic_radovi_poslednja_izmena', 'artic_radovi', ['poslednja_izmena'])
+    
+    if op.get_bind().dialect.name == 'postgresql':
+        # pg_trgm je kreiran u migraciji 008
+        op.execute(
+            "CREATE INDEX ix_artic_radovi_pretraga_trgm ON artic_radovi "
+            "USING gin (pretraga gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_artic_radovi_pretraga_trgm', 'artic_radovi')
+    op.drop_index('ix_artic_radovi_poslednja_izmena', 'artic_radovi')
+    op.drop_table('artic_radovi')
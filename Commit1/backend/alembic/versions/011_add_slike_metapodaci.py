@@ -0,0 +1,39 @@
+"""Metapodaci slika za placeholder
+
+Revision ID: 011
+Revises: 010
+Create Date: 2024-01-01
+
+Jedanaesta migracija - dimenzije, dominantna boja, BlurHash i LQIP na
+slikama; popunjavaju se u pozadini (postojeće slike ostaju na čekanju
+i obrađuju se pri sledećem pokretanju aplikacije)
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '011'
+down_revision: Union[str, None] = '010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('slike', sa.Column('sirina', sa.Integer(), nullable=True))
+    op.add_column('slike', sa.Column('visina', sa.Integer(), nullable=True))
+    op.add_column('slike', sa.Column('dominantna_boja', sa.String(7), nullable=True))
+    op.add_column('slike', sa.Column('blurhash', sa.String(100), nullable=True))
+    op.add_column('slike', sa.Column('lqip', sa.Text(), nullable=True))
+    op.add_column(
+        'slike',
+        sa.Column('status_metapodataka', sa.String(20), nullable=False, server_default='na_cekanju')
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('slike', 'status_metapodataka')
+    op.drop_column('slike', 'lqip')
+    op.drop_column('slike', 'blurhash')
+    op.drop_column('slike', 'dominantna_boja')
+    op.drop_column('slike', 'visina')
+    op.drop_column('slike', 'sirina')
@@ -0,0 +1,30 @@
+"""Preuzimanje obrade metapodataka slika
+
+Revision ID: 012
+Revises: 011
+Create Date: 2024-01-01
+
+Dvanaesta migracija - datum preuzimanja obrade metapodataka; slika se
+pre obrade preuzima uslovnim UPDATE-om (na_cekanju -> u_obradi), pa je
+obrađuje samo jedan proces, a napuštena obrada se ponovo preuzima
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '012'
+down_revision: Union[str, None] = '011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('slike', sa.Column('datum_obrade_metapodataka', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    # Obrada prekinuta migracijom se ponavlja
+    op.execute(
+        "UPDATE slike SET status_metapodataka = 'na_cekanju' WHERE status_metapodataka = 'u_obradi'"
+    )
+    op.drop_column('slike', 'datum_obrade_metapodataka')
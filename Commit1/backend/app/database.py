@@ -2,32 +2,63 @@
 Konfiguracija baze podataka
 SQLAlchemy engine i sesija
 """
+from typing import AsyncIterator
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 from app.config import settings
+from app.utils.pool_metrics import instrumented_pool
+from app.utils.metrics import instrument_engine
+from app.utils.profiler import profile_engine
 
-# Kreiranje database engine-a
+# Podešavanja pool-a (po procesu - ukupan broj konekcija je
+# broj workera * (DB_POOL_SIZE + DB_MAX_OVERFLOW))
+POOL_OPTIONS = {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+    "pool_pre_ping": settings.DB_POOL_PRE_PING,
+}
+
+# Kreiranje sinhronog engine-a (skripte i migracije, npr. seed_data.py)
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping=True,  # Provera konekcije pre korišćenja
-    pool_size=5,
-    max_overflow=10
+    poolclass=instrumented_pool(QueuePool, "sync"),
+    **POOL_OPTIONS
+)
+
+# Kreiranje async engine-a (koristi se u FastAPI endpointima)
+async_engine = create_async_engine(
+    settings.async_database_url,
+    poolclass=instrumented_pool(AsyncAdaptedQueuePool, "async"),
+    **POOL_OPTIONS
 )
 
-# Kreiranje sesije
+# Brojanje SQL upita i vremena (metrike po zahtevu, /metrics)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+# Log naredbi (samo dok je aktivan profiler zahteva ili count_queries)
+profile_engine(engine)
+profile_engine(async_engine.sync_engine)
+
+# Kreiranje sesija
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    autoflush=False,
+    expire_on_commit=False  # Objekti ostaju čitljivi posle commit-a bez lazy load-a
+)
 
 # Bazna klasa za modele
 Base = declarative_base()
 
 
-def get_db():
+async def get_db() -> AsyncIterator[AsyncSession]:
     """
-    Dependency za dobijanje database sesije.
-    Koristi se u FastAPI endpointima.
+    Dependency za dobijanje async database sesije.
+    Koristi se u FastAPI endpointima - upiti ne blokiraju event loop.
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
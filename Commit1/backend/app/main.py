@@ -2,14 +2,29 @@
 Glavna FastAPI aplikacija
 Sistem za upravljanje izložbama fotografija
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, status
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 
 from app.config import settings
-from app.database import engine, Base
-from app.routers import auth, korisnici, lokacije, izlozbe, slike, prijave
+from app.database import async_engine, engine, Base
+from app.routers import auth, korisnici, lokacije, izlozbe, slike, prijave, debug
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from app.services.qr_worker import qr_worker
+from app.utils.security import password_hasher
+from app.utils.pool_metrics import pool_metrics
+from app.utils.metrics import (
+    CONTENT_TYPE, Gauge, MetricsMiddleware, PoolCollector, registry
+)
+from app.utils.profiler import ProfilerMiddleware, REQUEST_ID_HEADER, profile_store
+from app.services.health_service import health_checker
+from app.services.artic_service import artic_client
+from app.services import artic_mirror
+from app.services.image_proxy import image_proxy
+from app.services.metadata_worker import metadata_worker
 
 # Konfigurisanje logging-a
 logging.basicConfig(
@@ -30,13 +45,43 @@ async def lifespan(app: FastAPI):
     
     # Kreiranje tabela (za development)
     # U produkciji koristiti Alembic migracije
-    Base.metadata.create_all(bind=engine)
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
     logger.info("Baza podataka inicijalizovana")
     
+    # Deljeni HTTP klijent za Artic API (keep-alive konekcije)
+    await artic_client.start()
+    await image_proxy.start()
+    
+    # Periodična inkrementalna sinhronizacija Artic mirror-a
+    mirror_sync = None
+    if settings.ARTIC_MIRROR_SYNC_MINUTES > 0:
+        mirror_sync = asyncio.create_task(
+            artic_mirror.run_periodic_sync(settings.ARTIC_MIRROR_SYNC_MINUTES)
+        )
+    
+    # QR slike prijava koje nisu stigle da se generišu pre gašenja
+    pending = await qr_worker.resume_pending()
+    if pending:
+        logger.info(f"Ponovo zakazano generisanje QR koda za {pending} prijava")
+    
+    # Slike bez metapodataka (dimenzije, boja, BlurHash)
+    pending = await metadata_worker.resume_pending()
+    if pending:
+        logger.info(f"Zakazana obrada metapodataka za {pending} slika")
+    
     yield
     
     # Shutdown
     logger.info("Gašenje aplikacije...")
+    if mirror_sync is not None:
+        mirror_sync.cancel()
+    await qr_worker.shutdown()
+    await metadata_worker.shutdown()
+    await artic_client.close()
+    await image_proxy.close()
+    password_hasher.shutdown()
+    await async_engine.dispose()
 
 
 # Kreiranje FastAPI instance
@@ -70,8 +115,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", REQUEST_ID_HEADER],
 )
 
+# Metrike zahteva (latencija po ruti, statusi, SQL upiti) - izvoz na /metrics
+app.add_middleware(MetricsMiddleware, exclude_prefixes=("/metrics", "/health"))
+registry.register(PoolCollector({"async": async_engine.sync_engine, "sync": engine}))
+registry.register(Gauge(
+    "password_hash_queue_depth", "Zahtevi koji čekaju na bcrypt nit",
+    lambda: [((), password_hasher.queue_depth)]
+))
+
+# Artic API ima rezervno ponašanje (prazna lista) - otvoren breaker se
+# prijavljuje u /health/ready, ali ne isključuje proces iz saobraćaja
+health_checker.register("artic", artic_client.health, critical=False)
+
 # Registracija ruta
 app.include_router(auth.router)
 app.include_router(korisnici.router)
@@ -80,6 +138,16 @@ app.include_router(izlozbe.router)
 app.include_router(slike.router)
 app.include_router(prijave.router)
 
+# Debug: SQL profil svakog zahteva (X-Request-ID -> /debug/profile/{id})
+if settings.SQL_PROFILER_ENABLED:
+    app.add_middleware(
+        ProfilerMiddleware,
+        store=profile_store,
+        n_plus_one_threshold=settings.SQL_PROFILER_N1_THRESHOLD,
+        exclude_prefixes=("/debug", "/metrics", "/health")
+    )
+    app.include_router(debug.router)
+
 
 @app.get("/", tags=["Root"])
 async def root():
@@ -95,8 +163,52 @@ async def root():
 
 
 @app.get("/health", tags=["Health"])
+@app.get("/health/live", tags=["Health"])
 async def health_check():
     """
-    Health check endpoint za monitoring.
+    Liveness - proces radi i odgovara (bez provere zavisnosti).
     """
     return {"status": "healthy"}
+
+
+@app.get("/health/ready", tags=["Health"])
+async def readiness_check():
+    """
+    Readiness - baza dostupna i pool nije zasićen.
+    
+    Vraća 503 kada proces ne treba da prima saobraćaj. Rezultat se
+    kešira HEALTH_CACHE_SECONDS sekundi.
+    """
+    result = await health_checker.ready()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if result["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "ready" if result["ready"] else "not_ready", **result}
+    )
+
+
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def metrics():
+    """
+    Metrike ovog procesa u Prometheus tekstualnom formatu.
+    """
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/health/db-pool", tags=["Health"])
+async def db_pool_metrics():
+    """
+    Metrike connection pool-a ovog procesa (za podešavanje DB_POOL_SIZE).
+    
+    - **checked_out**: Konekcije trenutno u upotrebi
+    - **overflow**: Konekcije preko DB_POOL_SIZE (negativno - još nisu otvorene)
+    - **wait_seconds**: Kumulativni histogram vremena preuzimanja konekcije
+    - **timeouts**: Zahtevi kojima je isteklo DB_POOL_TIMEOUT čekanje
+    """
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pools": {
+            "async": pool_metrics["async"].snapshot(async_engine.pool),
+            "sync": pool_metrics["sync"].snapshot(engine.pool),
+        }
+    }
@@ -6,5 +6,6 @@ from app.models.lokacija import Lokacija
 from app.models.slika import Slika
 from app.models.izlozba import Izlozba
 from app.models.prijava import Prijava
+from app.models.artic_rad import ArticRad
 
-__all__ = ["Korisnik", "Lokacija", "Slika", "Izlozba", "Prijava"]
+__all__ = ["Korisnik", "Lokacija", "Slika", "Izlozba", "Prijava", "ArticRad"]
@@ -0,0 +1,80 @@
+"""
+Model ArticRad (Artic artwork)
+Lokalna kopija metapodataka umetničkih radova sa Art Institute of Chicago API
+"""
+from datetime import datetime
+from typing import Any, Dict, Optional
+from sqlalchemy import String, Text, Integer, DateTime, event, inspect
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+from app.utils.search import search_document
+
+
+class ArticRad(Base):
+    """
+    Model umetničkog rada iz lokalnog mirror-a Artic API-ja.
+    
+    Atributi:
+        - id_artic: ID rada na Artic API-ju (primarni ključ)
+        - naslov: Naslov rada
+        - umetnik: Umetnik (artist_display)
+        - datum: Datum nastanka (date_display)
+        - image_id: IIIF ID slike (None - rad nema sliku)
+        - opis: Opis rada
+        - dimenzije: Dimenzije
+        - tehnika: Tehnika (medium_display)
+        - sirina / visina: Dimenzije slike u pikselima (iz thumbnail podataka)
+        - lqip: Mala base64 slika za placeholder (iz thumbnail podataka)
+        - poslednja_izmena: last_updated sa Artic API-ja (inkrementalna sinhronizacija)
+        - pretraga: Normalizovan dokument za pretragu (naslov | umetnik | opis)
+    """
+    __tablename__ = "artic_radovi"
+    
+    id_artic: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    naslov: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    umetnik: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    datum: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
+    image_id: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    opis: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    dimenzije: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    tehnika: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    sirina: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    visina: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    lqip: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    poslednja_izmena: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True, index=True)
+    # Koristi se samo u WHERE uslovima pretrage - ne učitava se sa objektom
+    pretraga: Mapped[Optional[str]] = mapped_column(Text, nullable=True, deferred=True)
+    
+    def to_artwork(self) -> Dict[str, Any]:
+        """Rad u formatu Artic API-ja (kao odgovor fetch_artworks/get_artwork_by_id)"""
+        thumbnail = None
+        if self.lqip or self.sirina:
+            thumbnail = {"lqip": self.lqip, "width": self.sirina, "height": self.visina}
+        return {
+            "id": self.id_artic,
+            "title": self.naslov,
+            "artist_display": self.umetnik,
+            "date_display": self.datum,
+            "image_id": self.image_id,
+            "description": self.opis,
+            "dimensions": self.dimenzije,
+            "medium_display": self.tehnika,
+            "thumbnail": thumbnail,
+        }
+    
+    def __repr__(self) -> str:
+        return f"<ArticRad(id={self.id_artic}, naslov='{self.naslov}')>"
+
+
+@event.listens_for(ArticRad, "before_insert")
+@event.listens_for(ArticRad, "before_update")
+def _osvezi_pretragu(mapper, connection, target: ArticRad) -> None:
+    """Održava dokument za pretragu kada se promeni neko od polja koja ga čine"""
+    # pretraga je odložena (deferred) kolona - dodela bez promene polja bi
+    # uvek generisala UPDATE
+    stanje = inspect(target)
+    if stanje.has_identity and not any(
+        stanje.attrs[polje].history.has_changes() for polje in ('naslov', 'umetnik', 'opis')
+    ):
+        return
+    target.pretraga = search_document(target.naslov, target.umetnik, target.opis)
@@ -4,9 +4,11 @@ Predstavlja izložbu fotografija
 """
 from datetime import datetime, date
 from typing import Optional, List, TYPE_CHECKING
-from sqlalchemy import String, Text, Boolean, Integer, Date, DateTime, ForeignKey
+from sqlalchemy import String, Text, Boolean, Integer, Date, DateTime, ForeignKey, event, inspect
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
+from app.utils.etag import url_version
+from app.utils.search import search_document
 
 if TYPE_CHECKING:
     from app.models.lokacija import Lokacija
@@ -28,12 +30,14 @@ class Izlozba(Base):
         - datum_zavrsetka: Datum završetka
         - id_lokacija: FK ka lokaciji
         - kapacitet: Maksimalni broj posetilaca
+        - prodato_karata: Ukupan broj rezervisanih karata (održava se pri prijavi/otkazivanju)
         - thumbnail: URL do thumbnail-a
         - osmislio: Ko je osmislio izložbu
         - aktivan: Da li je izložba aktivna
         - objavljeno: Da li je izložba objavljena
         - datum_kreiranja: Datum kreiranja zapisa
         - datum_izmene: Datum poslednje izmene
+        - pretraga: Normalizovan dokument za pretragu (naslov | kratak opis | opis)
     """
     __tablename__ = "izlozbe"
     
@@ -51,6 +55,7 @@ class Izlozba(Base):
         ForeignKey("lokacije.id_lokacija")
     )
     kapacitet: Mapped[int] = mapped_column(Integer, default=100)
+    prodato_karata: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
     thumbnail: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
     osmislio: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
     aktivan: Mapped[bool] = mapped_column(Boolean, default=True)
@@ -61,6 +66,8 @@ class Izlozba(Base):
     datum_izmene: Mapped[Optional[datetime]] = mapped_column(
         DateTime, nullable=True, onupdate=datetime.utcnow
     )
+    # Koristi se samo u WHERE uslovima pretrage - ne učitava se sa objektom
+    pretraga: Mapped[Optional[str]] = mapped_column(Text, nullable=True, deferred=True)
     
     # Relacije
     lokacija: Mapped["Lokacija"] = relationship(
@@ -92,9 +99,13 @@ class Izlozba(Base):
     
     @property
     def preostali_kapacitet(self) -> int:
-        """Izračunava preostali kapacitet"""
-        ukupno_prijava = sum(p.broj_karata for p in self.prijave)
-        return max(0, self.kapacitet - ukupno_prijava)
+        """Izračunava preostali kapacitet (bez učitavanja prijava)"""
+        return max(0, self.kapacitet - (self.prodato_karata or 0))
+    
+    @property
+    def verzija_thumbnaila(self) -> Optional[str]:
+        """Verzija za /api/izlozbe/{id}/thumbnail?v= (thumbnail ili naslovna slika)"""
+        return url_version(self.thumbnail or (self.slika_naslovna.slika if self.slika_naslovna else None))
     
     @property
     def is_active(self) -> bool:
@@ -105,3 +116,17 @@ class Izlozba(Base):
             self.objavljeno and 
             self.datum_pocetka <= today <= self.datum_zavrsetka
         )
+
+
+@event.listens_for(Izlozba, "before_insert")
+@event.listens_for(Izlozba, "before_update")
+def _osvezi_pretragu(mapper, connection, target: Izlozba) -> None:
+    """Održava dokument za pretragu kada se promeni neko od polja koja ga čine"""
+    # pretraga je odložena (deferred) kolona - dodela bez promene polja bi
+    # uvek generisala UPDATE
+    stanje = inspect(target)
+    if stanje.has_identity and not any(
+        stanje.attrs[polje].history.has_changes() for polje in ('naslov', 'kratak_opis', 'opis')
+    ):
+        return
+    target.pretraga = search_document(target.naslov, target.kratak_opis, target.opis)
@@ -3,9 +3,10 @@ Model Lokacija (Location)
 Predstavlja lokaciju gde se održava izložba
 """
 from typing import Optional, List, TYPE_CHECKING
-from sqlalchemy import String, Text, Float
+from sqlalchemy import String, Text, Float, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
+from app.utils.search import search_key
 
 if TYPE_CHECKING:
     from app.models.izlozba import Izlozba
@@ -23,6 +24,7 @@ class Lokacija(Base):
         - g_duzina: Geografska dužina (longitude)
         - adresa: Puna adresa
         - grad: Grad u kojem se nalazi
+        - grad_kljuc: Normalizovan grad za pretragu (Београд -> beograd)
     """
     __tablename__ = "lokacije"
     
@@ -33,6 +35,7 @@ class Lokacija(Base):
     g_duzina: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     adresa: Mapped[str] = mapped_column(String(300))
     grad: Mapped[str] = mapped_column(String(100), index=True)
+    grad_kljuc: Mapped[Optional[str]] = mapped_column(String(100), nullable=True, index=True)
     
     # Relacija sa izložbama (1:N)
     izlozbe: Mapped[List["Izlozba"]] = relationship(
@@ -43,3 +46,10 @@ class Lokacija(Base):
     
     def __repr__(self) -> str:
         return f"<Lokacija(id={self.id_lokacija}, naziv='{self.naziv}')>"
+
+
+@event.listens_for(Lokacija, "before_insert")
+@event.listens_for(Lokacija, "before_update")
+def _osvezi_kljuc(mapper, connection, target: Lokacija) -> None:
+    """Održava ključ za pretragu pri svakom upisu lokacije"""
+    target.grad_kljuc = search_key(target.grad)
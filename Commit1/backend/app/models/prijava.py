@@ -14,6 +14,13 @@ if TYPE_CHECKING:
     from app.models.slika import Slika
 
 
+# Statusi generisanja QR slike (slika_qr se renderuje u pozadini)
+QR_NA_CEKANJU = "na_cekanju"
+QR_U_OBRADI = "u_obradi"
+QR_SPREMAN = "spreman"
+QR_GRESKA = "greska"
+
+
 class Prijava(Base):
     """
     Model prijave na izložbu.
@@ -24,10 +31,12 @@ class Prijava(Base):
         - id_izlozba: FK ka izložbi
         - id_slika: FK ka slici (opciono, za QR)
         - broj_karata: Broj rezervisanih karata
-        - qr_kod: Sadržaj QR koda (JSON string)
+        - qr_kod: Sadržaj QR koda - HMAC potpisana karta (K1.xxxx; starije prijave: JSON)
         - validirano: Da li je karta validirana
         - datum_registracije: Datum prijave
+        - datum_izmene: Datum poslednje izmene (verzija za ETag)
         - slika_qr: Base64 encoded QR kod slika
+        - status_qr: Status generisanja slike QR koda (na_cekanju/u_obradi/spreman/greska)
         - verifikovan_email: Da li je email verifikovan
         - email_poslat: Da li je email sa kartom poslat
         - datum_slanja_emaila: Kada je email poslat
@@ -50,7 +59,13 @@ class Prijava(Base):
     datum_registracije: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow
     )
+    datum_izmene: Mapped[Optional[datetime]] = mapped_column(
+        DateTime, nullable=True, onupdate=datetime.utcnow
+    )
     slika_qr: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # Base64
+    status_qr: Mapped[str] = mapped_column(
+        String(20), default=QR_NA_CEKANJU, server_default=QR_NA_CEKANJU
+    )
     verifikovan_email: Mapped[bool] = mapped_column(Boolean, default=False)
     email_poslat: Mapped[bool] = mapped_column(Boolean, default=False)
     datum_slanja_emaila: Mapped[Optional[datetime]] = mapped_column(
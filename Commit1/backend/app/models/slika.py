@@ -4,15 +4,24 @@ Predstavlja fotografiju u izložbi - čuva se kao URL link
 """
 from datetime import datetime
 from typing import Optional, List, TYPE_CHECKING
-from sqlalchemy import String, Text, Boolean, Integer, DateTime, ForeignKey
+from sqlalchemy import String, Text, Boolean, Integer, DateTime, ForeignKey, event, inspect
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
+from app.utils.etag import url_version
+from app.utils.search import search_document
 
 if TYPE_CHECKING:
     from app.models.izlozba import Izlozba
     from app.models.prijava import Prijava
 
 
+# Statusi obrade metapodataka slike (dimenzije, boja, BlurHash - u pozadini)
+META_NA_CEKANJU = "na_cekanju"
+META_U_OBRADI = "u_obradi"
+META_SPREMNI = "spremni"
+META_GRESKA = "greska"
+
+
 class Slika(Base):
     """
     Model slike/fotografije.
@@ -29,6 +38,13 @@ class Slika(Base):
         - istaknuta: Da li je slika istaknuta
         - naslovna: Da li je naslovna slika izložbe
         - redosled: Redosled prikazivanja
+        - pretraga: Normalizovan dokument za pretragu (naslov | fotograf | opis)
+        - sirina / visina: Dimenzije slike u pikselima
+        - dominantna_boja: Najzastupljenija boja (#rrggbb)
+        - blurhash: BlurHash placeholder
+        - lqip: Mala base64 slika za placeholder (radovi sa Artic API-ja)
+        - status_metapodataka: Status obrade metapodataka (na_cekanju/u_obradi/spremni/greska)
+        - datum_obrade_metapodataka: Kada je obrada metapodataka preuzeta
     """
     __tablename__ = "slike"
     
@@ -47,6 +63,17 @@ class Slika(Base):
     istaknuta: Mapped[bool] = mapped_column(Boolean, default=False)
     naslovna: Mapped[bool] = mapped_column(Boolean, default=False)
     redosled: Mapped[int] = mapped_column(Integer, default=0)
+    # Koristi se samo u WHERE uslovima pretrage - ne učitava se sa objektom
+    pretraga: Mapped[Optional[str]] = mapped_column(Text, nullable=True, deferred=True)
+    sirina: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    visina: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    dominantna_boja: Mapped[Optional[str]] = mapped_column(String(7), nullable=True)
+    blurhash: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    lqip: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    status_metapodataka: Mapped[str] = mapped_column(
+        String(20), default=META_NA_CEKANJU, server_default=META_NA_CEKANJU
+    )
+    datum_obrade_metapodataka: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     
     # Relacije
     izlozba: Mapped[Optional["Izlozba"]] = relationship(
@@ -68,5 +95,31 @@ class Slika(Base):
         foreign_keys="[Prijava.id_slika]"
     )
     
+    @property
+    def odnos_stranica(self) -> Optional[float]:
+        """Širina / visina - klijent rezerviše prostor pre učitavanja slike"""
+        if self.sirina and self.visina:
+            return round(self.sirina / self.visina, 4)
+        return None
+    
+    @property
+    def verzija_slike(self) -> Optional[str]:
+        """Verzija za /api/slike/{id}/image?v= (dugo keširanje)"""
+        return url_version(self.slika)
+    
     def __repr__(self) -> str:
         return f"<Slika(id={self.id_slika}, naslov='{self.naslov}')>"
+
+
+@event.listens_for(Slika, "before_insert")
+@event.listens_for(Slika, "before_update")
+def _osvezi_pretragu(mapper, connection, target: Slika) -> None:
+    """Održava dokument za pretragu kada se promeni neko od polja koja ga čine"""
+    # pretraga je odložena (deferred) kolona - dodela bez promene polja bi
+    # uvek generisala UPDATE
+    stanje = inspect(target)
+    if stanje.has_identity and not any(
+        stanje.attrs[polje].history.has_changes() for polje in ('naslov', 'fotograf', 'opis')
+    ):
+        return
+    target.pretraga = search_document(target.naslov, target.fotograf, target.opis)
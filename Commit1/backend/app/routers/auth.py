@@ -6,13 +6,15 @@ from datetime import datetime, timedelta
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Response
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models.korisnik import Korisnik
-from app.schemas.korisnik import KorisnikCreate, KorisnikResponse, KorisnikLogin
+from app.schemas.korisnik import KorisnikCreate, KorisnikResponse, KorisnikLogin, TrenutniKorisnik
 from app.schemas.token import Token
-from app.utils.security import verify_password, get_password_hash, create_access_token
+from app.utils.security import password_hasher, create_access_token
 from app.utils.dependencies import get_current_user, get_current_user_required
+from app.utils.user_cache import user_cache
 from app.config import settings
 
 router = APIRouter(prefix="/api/auth", tags=["Autentifikacija"])
@@ -21,7 +23,7 @@ router = APIRouter(prefix="/api/auth", tags=["Autentifikacija"])
 @router.post("/register", response_model=KorisnikResponse, status_code=status.HTTP_201_CREATED)
 async def register(
     korisnik: KorisnikCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Registracija novog korisnika.
@@ -32,29 +34,30 @@ async def register(
     - **ime**: Ime korisnika
     - **prezime**: Prezime korisnika
     """
-    # Provera da li username već postoji (case-insensitive)
-    existing_username = db.query(Korisnik).filter(
-        Korisnik.username.ilike(korisnik.username)
-    ).first()
-    if existing_username:
+    # Provera da li username ili email već postoje (case-insensitive) -
+    # jedan upit nad indeksima lower(username) / lower(email)
+    postojeci = (await db.execute(
+        select(func.lower(Korisnik.username), func.lower(Korisnik.email)).where(or_(
+            func.lower(Korisnik.username) == korisnik.username.lower(),
+            func.lower(Korisnik.email) == korisnik.email.lower()
+        )).limit(2)
+    )).all()
+    
+    if any(username == korisnik.username.lower() for username, _ in postojeci):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Korisničko ime '{korisnik.username}' je već zauzeto. Molimo odaberite drugo."
         )
     
-    # Provera da li email već postoji (case-insensitive)
-    existing_email = db.query(Korisnik).filter(
-        Korisnik.email.ilike(korisnik.email)
-    ).first()
-    if existing_email:
+    if postojeci:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Email adresa '{korisnik.email}' je već registrovana. Pokušajte da se prijavite."
         )
     
     # Kreiranje novog korisnika
+    hashed_password = await password_hasher.hash(korisnik.lozinka)
     try:
-        hashed_password = get_password_hash(korisnik.lozinka)
         db_korisnik = Korisnik(
             username=korisnik.username,
             email=korisnik.email,
@@ -69,13 +72,13 @@ async def register(
         )
         
         db.add(db_korisnik)
-        db.commit()
-        db.refresh(db_korisnik)
+        await db.commit()
+        await db.refresh(db_korisnik)
         
         return db_korisnik
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         # For debugging purposes, exposing the error
         print(f"Registration error: {str(e)}")
         raise HTTPException(
@@ -87,7 +90,7 @@ async def register(
 @router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Prijava korisnika. Vraća JWT token.
@@ -96,11 +99,16 @@ async def login(
     - **password**: Lozinka
     """
     # Pronalaženje korisnika
-    user = db.query(Korisnik).filter(
+    user = await db.scalar(select(Korisnik).where(
         Korisnik.username == form_data.username
-    ).first()
+    ))
+    
+    lozinka_ok, novi_hes = (
+        await password_hasher.verify_and_update(form_data.password, user.lozinka)
+        if user else (False, None)
+    )
     
-    if not user or not verify_password(form_data.password, user.lozinka):
+    if not lozinka_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Pogrešno korisničko ime ili lozinka",
@@ -113,9 +121,12 @@ async def login(
             detail="Korisnički nalog je deaktiviran"
         )
     
-    # Ažuriranje poslednje prijave
+    # Ažuriranje poslednje prijave (i heša, ako su parametri bcrypt-a promenjeni)
     user.poslednja_prijava = datetime.utcnow()
-    db.commit()
+    if novi_hes:
+        user.lozinka = novi_hes
+    await db.commit()
+    user_cache.invalidate(user.id_korisnik)
     
     # Kreiranje tokena
     access_token = create_access_token(
@@ -127,7 +138,7 @@ async def login(
 
 @router.post("/logout")
 async def logout(
-    current_user: Korisnik = Depends(get_current_user_required)
+    current_user: TrenutniKorisnik = Depends(get_current_user_required)
 ):
     """
     Odjava korisnika.
@@ -139,7 +150,7 @@ async def logout(
 
 @router.get("/me", response_model=KorisnikResponse)
 async def get_me(
-    current_user: Korisnik = Depends(get_current_user_required)
+    current_user: TrenutniKorisnik = Depends(get_current_user_required)
 ):
     """
     Vraća podatke o trenutno prijavljenom korisniku.
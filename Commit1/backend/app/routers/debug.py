@@ -0,0 +1,37 @@
+"""
+Debug Router - SQL profili zahteva
+Uključuje se samo uz SQL_PROFILER_ENABLED
+"""
+from typing import Any, Dict, List
+from fastapi import APIRouter, HTTPException, status, Query
+from app.utils.profiler import profile_store
+
+router = APIRouter(prefix="/debug", tags=["Debug"])
+
+
+@router.get("/profile")
+async def list_profiles(limit: int = Query(50, ge=1, le=200)) -> List[Dict[str, Any]]:
+    """
+    Poslednji profilisani zahtevi, najnoviji prvi (bez liste SQL naredbi).
+    
+    - **limit**: Maksimalni broj rezultata
+    """
+    return profile_store.recent(limit)
+
+
+@router.get("/profile/{request_id}")
+async def get_profile(request_id: str) -> Dict[str, Any]:
+    """
+    SQL profil zahteva po X-Request-ID headeru odgovora.
+    
+    Sadrži sve naredbe grupisane po obliku i N+1 kandidate.
+    """
+    profile = profile_store.get(request_id)
+    
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profil nije pronađen"
+        )
+    
+    return profile
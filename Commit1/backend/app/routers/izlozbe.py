@@ -3,24 +3,85 @@ Izlozbe Router - Upravljanje izložbama
 CRUD operacije sa filterima i paginacijom
 """
 from typing import List, Optional
-from datetime import date
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_
+from datetime import date, datetime
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload, raiseload, defer
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import inspect, select, func
 from app.database import get_db
 from app.models.izlozba import Izlozba
 from app.models.lokacija import Lokacija
-from app.models.korisnik import Korisnik
+from app.models.slika import Slika
+from app.schemas.korisnik import TrenutniKorisnik
 from app.schemas.izlozba import (
-    IzlozbaCreate, IzlozbaUpdate, IzlozbaResponse, IzlozbaListResponse
+    IzlozbaCreate, IzlozbaUpdate, IzlozbaResponse, IzlozbaKarticaResponse,
+    IzlozbaUBliziniResponse, IzlozbaListResponse
 )
 from app.utils.dependencies import get_current_admin
+from app.utils.pagination import apply_cursor, next_cursor
+from app.utils.cache import response_cache, cache_key
+from app.utils.profiler import query_budget
+from app.utils.etag import make_etag, etag_matches, not_modified, url_version
+from app.services.search_service import search_izlozbe
+from app.services.geo_service import nearby_lokacije
+from app.services.image_proxy import (
+    image_proxy, image_response, negotiate_format, ImageUnavailable
+)
+from app.services.metadata_worker import metadata_worker
+from app.utils.search import search_key
 
 router = APIRouter(prefix="/api/izlozbe", tags=["Izložbe"])
 
+# Ključ sortiranja liste (i kursora): najnovije izložbe prve
+SORT_KLJUC = (Izlozba.datum_pocetka, Izlozba.id_izlozba)
+
+# Broj najbližih lokacija po upitu za izložbe (IN lista) u pretrazi po blizini
+NEARBY_BATCH = 500
+
+
+def _izlozba_options():
+    """Relacije koje IzlozbaResponse serijalizuje (async sesija ne radi lazy load)"""
+    return (
+        joinedload(Izlozba.lokacija),
+        joinedload(Izlozba.slika_naslovna),
+        selectinload(Izlozba.slike),
+    )
+
+
+def _kartica_options(sa_slikama: bool = False):
+    """
+    Relacije i kolone kartice (IzlozbaKarticaResponse): pun opis se ne
+    učitava, galerija samo kada je tražena
+    """
+    return (
+        defer(Izlozba.opis),
+        joinedload(Izlozba.lokacija),
+        joinedload(Izlozba.slika_naslovna),
+        selectinload(Izlozba.slike) if sa_slikama else raiseload(Izlozba.slike),
+    )
+
+
+def _kartica(izlozba: Izlozba) -> IzlozbaKarticaResponse:
+    """Kartica izložbe; neučitana galerija je prazna lista (bez upita)"""
+    if "slike" in inspect(izlozba).unloaded:
+        set_committed_value(izlozba, "slike", [])
+    return IzlozbaKarticaResponse.model_validate(izlozba)
+
+
+async def _load_izlozba(db: AsyncSession, izlozba_id: int) -> Optional[Izlozba]:
+    """Učitava izložbu sa svim relacijama potrebnim za odgovor"""
+    return await db.scalar(
+        select(Izlozba)
+        .options(*_izlozba_options())
+        .where(Izlozba.id_izlozba == izlozba_id)
+    )
+
 
 @router.get("/", response_model=IzlozbaListResponse)
+@query_budget(4)
 async def list_izlozbe(
+    request: Request,
     page: int = Query(1, ge=1),
     per_page: int = Query(12, ge=1, le=50),
     search: Optional[str] = None,
@@ -29,87 +90,191 @@ async def list_izlozbe(
     objavljeno: Optional[bool] = True,
     od_datuma: Optional[date] = None,
     do_datuma: Optional[date] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    include: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Lista izložbi sa filterima i paginacijom (javno dostupno).
     
     - **page**: Broj stranice
     - **per_page**: Broj rezultata po stranici
-    - **search**: Pretraga po naslovu ili opisu
-    - **grad**: Filter po gradu
+    - **search**: Pretraga po naslovu ili opisu (rangirano po relevantnosti, bez razlike ćirilica/latinica i č/c)
+    - **grad**: Filter po početku naziva grada (bez razlike ćirilica/latinica i č/c)
     - **aktivan**: Filter po aktivnosti
     - **objavljeno**: Filter po objavljenosti (default: True)
     - **od_datuma**: Izložbe koje počinju od ovog datuma
     - **do_datuma**: Izložbe koje se završavaju do ovog datuma
+    - **cursor**: Kursor iz `next_cursor` prethodnog odgovora (zamenjuje `page`, ne uz `search`)
+    - **include_total**: Da li se računa ukupan broj rezultata (default: True)
+    - **include**: Dodatne relacije u odgovoru, npr. `slike` za galeriju svake izložbe
     """
-    query = db.query(Izlozba).options(
-        joinedload(Izlozba.lokacija),
-        joinedload(Izlozba.slika_naslovna),
-        joinedload(Izlozba.slike)
-    )
+    # Rezultati pretrage su sortirani po relevantnosti, koja nije keyset ključ
+    if search and cursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Pretraga ne podržava kursor - koristite page"
+        )
+    
+    kes_kljuc = cache_key(request)
+    cached, verzija = await response_cache.get("izlozbe", kes_kljuc)
+    if cached is not None:
+        etag = cached.headers.get("etag")
+        return not_modified(etag) if etag_matches(request, etag) else cached
+    
+    ukljuceno = {deo.strip() for deo in include.split(",")} if include else set()
+    sa_slikama = "slike" in ukljuceno
+    
+    query = select(Izlozba)
     
     # Filteri
+    rang = None
     if search:
-        query = query.filter(
-            or_(
-                Izlozba.naslov.ilike(f"%{search}%"),
-                Izlozba.opis.ilike(f"%{search}%"),
-                Izlozba.kratak_opis.ilike(f"%{search}%")
-            )
-        )
+        query, rang = await search_izlozbe(db, query, search)
+    # Rezultati pretrage se sortiraju po relevantnosti
+    po_relevantnosti = rang is not None
     
     if grad:
-        query = query.join(Lokacija).filter(Lokacija.grad.ilike(f"%{grad}%"))
+        query = query.join(Lokacija).where(
+            Lokacija.grad_kljuc.startswith(search_key(grad), autoescape=True)
+        )
     
     if aktivan is not None:
-        query = query.filter(Izlozba.aktivan == aktivan)
+        query = query.where(Izlozba.aktivan == aktivan)
     
     if objavljeno is not None:
-        query = query.filter(Izlozba.objavljeno == objavljeno)
+        query = query.where(Izlozba.objavljeno == objavljeno)
     
     if od_datuma:
-        query = query.filter(Izlozba.datum_pocetka >= od_datuma)
+        query = query.where(Izlozba.datum_pocetka >= od_datuma)
     
     if do_datuma:
-        query = query.filter(Izlozba.datum_zavrsetka <= do_datuma)
-    
-    # Ukupan broj
-    total = query.count()
-    
-    # Paginacija
-    skip = (page - 1) * per_page
-    izlozbe = query.order_by(Izlozba.datum_pocetka.desc()).offset(skip).limit(per_page).all()
-    
-    # Dodavanje preostali_kapacitet
-    items = []
-    for izlozba in izlozbe:
-        izlozba_dict = IzlozbaResponse.model_validate(izlozba).model_dump()
-        izlozba_dict["preostali_kapacitet"] = izlozba.preostali_kapacitet
-        items.append(IzlozbaResponse(**izlozba_dict))
-    
-    return IzlozbaListResponse(
+        query = query.where(Izlozba.datum_zavrsetka <= do_datuma)
+    
+    # Ukupan broj (opciono - COUNT prolazi kroz sve rezultate filtera)
+    total = None
+    if include_total:
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
+    
+    # Paginacija - kursor (keyset) ili klasičan OFFSET
+    if po_relevantnosti:
+        query = query.order_by(rang.desc(), *[c.desc() for c in SORT_KLJUC])
+    else:
+        query = apply_cursor(query, SORT_KLJUC, cursor, descending=True)
+    if not cursor:
+        query = query.offset((page - 1) * per_page)
+    query = query.limit(per_page)
+    
+    # ETag iz verzija redova stranice - laki upit bez relacija, pa se za
+    # nepromenjene podatke vraća 304 bez učitavanja i serijalizacije
+    verzije = (await db.execute(query.with_only_columns(
+        Izlozba.id_izlozba,
+        func.coalesce(Izlozba.datum_izmene, Izlozba.datum_kreiranja),
+        Izlozba.prodato_karata
+    ))).all()
+    etag = make_etag(kes_kljuc, total, [tuple(red) for red in verzije])
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    # Kartice: lokacija i naslovna slika u istom upitu, galerija (jedan
+    # batch SELECT ... IN za celu stranu) samo kada je tražena
+    izlozbe = (await db.scalars(query.options(*_kartica_options(sa_slikama)))).all()
+    
+    # preostali_kapacitet se čita iz brojača prodato_karata, bez upita po izložbi
+    items = [_kartica(izlozba) for izlozba in izlozbe]
+    
+    rezultat = IzlozbaListResponse(
         items=items,
         total=total,
         page=page,
         per_page=per_page,
-        pages=(total + per_page - 1) // per_page
+        pages=(total + per_page - 1) // per_page if total is not None else None,
+        next_cursor=None if search else next_cursor(izlozbe, SORT_KLJUC, per_page)
+    )
+    return await response_cache.store(
+        "izlozbe", kes_kljuc, verzija, rezultat, IzlozbaListResponse, {"ETag": etag}
+    )
+
+
+@router.get("/nearby", response_model=List[IzlozbaUBliziniResponse])
+@query_budget(3)
+async def list_izlozbe_nearby(
+    request: Request,
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(10, gt=0, le=500),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Aktivne izložbe u blizini tačke, najbliže prve (javno dostupno).
+    
+    - **lat**: Geografska širina
+    - **lng**: Geografska dužina
+    - **radius_km**: Radijus pretrage u kilometrima (default: 10)
+    - **limit**: Maksimalni broj rezultata
+    """
+    kes_kljuc = cache_key(request)
+    cached, verzija = await response_cache.get("izlozbe", kes_kljuc)
+    if cached is not None:
+        return cached
+    
+    # Lokacije u radijusu iz prostornog indeksa, sortirane po udaljenosti
+    lokacije = await nearby_lokacije(db, lat, lng, radius_km)
+    udaljenosti = dict(lokacije)
+    
+    # Izložbe se učitavaju za najbliže lokacije u grupama, dok se ne
+    # popuni limit - svaka grupa je dalja od prethodne
+    izlozbe: List[Izlozba] = []
+    for start in range(0, len(lokacije), NEARBY_BATCH):
+        grupa = [id_lokacija for id_lokacija, _ in lokacije[start:start + NEARBY_BATCH]]
+        izlozbe.extend((await db.scalars(
+            select(Izlozba)
+            .options(*_kartica_options())
+            .where(
+                Izlozba.id_lokacija.in_(grupa),
+                Izlozba.aktivan.is_(True),
+                Izlozba.objavljeno.is_(True),
+                Izlozba.datum_zavrsetka >= date.today()
+            )
+        )).all())
+        if len(izlozbe) >= limit:
+            break
+    
+    izlozbe.sort(key=lambda izlozba: (
+        udaljenosti[izlozba.id_lokacija], izlozba.datum_pocetka, izlozba.id_izlozba
+    ))
+    items = [
+        IzlozbaUBliziniResponse(**{
+            **dict(_kartica(izlozba)),
+            "udaljenost_km": round(udaljenosti[izlozba.id_lokacija], 3)
+        })
+        for izlozba in izlozbe[:limit]
+    ]
+    return await response_cache.store(
+        "izlozbe", kes_kljuc, verzija, items, List[IzlozbaUBliziniResponse]
     )
 
 
 @router.get("/slug/{slug}", response_model=IzlozbaResponse)
+@query_budget(2)
 async def get_izlozba_by_slug(
     slug: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Vraća izložbu po slugu (javno dostupno).
     """
-    izlozba = db.query(Izlozba).options(
-        joinedload(Izlozba.lokacija),
-        joinedload(Izlozba.slika_naslovna),
-        joinedload(Izlozba.slike)
-    ).filter(Izlozba.slug == slug).first()
+    kes_kljuc = cache_key(request)
+    cached, verzija = await response_cache.get("izlozbe", kes_kljuc)
+    if cached is not None:
+        return cached
+    
+    izlozba = await db.scalar(
+        select(Izlozba).options(*_izlozba_options()).where(Izlozba.slug == slug)
+    )
     
     if not izlozba:
         raise HTTPException(
@@ -117,25 +282,25 @@ async def get_izlozba_by_slug(
             detail="Izložba nije pronađena"
         )
     
-    response = IzlozbaResponse.model_validate(izlozba)
-    response_dict = response.model_dump()
-    response_dict["preostali_kapacitet"] = izlozba.preostali_kapacitet
-    
-    return IzlozbaResponse(**response_dict)
-    
+    return await response_cache.store("izlozbe", kes_kljuc, verzija, izlozba, IzlozbaResponse)
+
+
 @router.get("/{izlozba_id}", response_model=IzlozbaResponse)
+@query_budget(2)
 async def get_izlozba(
     izlozba_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Vraća izložbu po ID-u (javno dostupno).
     """
-    izlozba = db.query(Izlozba).options(
-        joinedload(Izlozba.lokacija),
-        joinedload(Izlozba.slika_naslovna),
-        joinedload(Izlozba.slike)
-    ).filter(Izlozba.id_izlozba == izlozba_id).first()
+    kes_kljuc = cache_key(request)
+    cached, verzija = await response_cache.get("izlozbe", kes_kljuc)
+    if cached is not None:
+        return cached
+    
+    izlozba = await _load_izlozba(db, izlozba_id)
     
     if not izlozba:
         raise HTTPException(
@@ -143,26 +308,73 @@ async def get_izlozba(
             detail="Izložba nije pronađena"
         )
     
-    response = IzlozbaResponse.model_validate(izlozba)
-    response_dict = response.model_dump()
-    response_dict["preostali_kapacitet"] = izlozba.preostali_kapacitet
+    return await response_cache.store("izlozbe", kes_kljuc, verzija, izlozba, IzlozbaResponse)
+
+
+@router.get("/{izlozba_id}/thumbnail", response_class=Response)
+@query_budget(1)
+async def get_izlozba_thumbnail(
+    izlozba_id: int,
+    request: Request,
+    w: int = Query(320, ge=1, le=4096),
+    format: Optional[str] = Query(None, pattern="^(avif|webp|jpeg)$"),
+    v: Optional[str] = Query(None, max_length=32),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Umanjen thumbnail izložbe (javno dostupno).
+    
+    Thumbnail izložbe je često URL pune slike - kartice u listi dobijaju
+    verziju zadate širine umesto originala. Bez thumbnail-a se koristi
+    naslovna slika.
+    
+    - **w**: Širina u pikselima (zaokružuje se naviše na dozvoljenu)
+    - **format**: avif, webp ili jpeg (podrazumevano po Accept headeru)
+    - **v**: `verzija_thumbnaila` iz odgovora izložbe - uz nju se slika kešira dugo
+    """
+    red = (await db.execute(
+        select(Izlozba.thumbnail, Slika.slika)
+        .outerjoin(Slika, Slika.id_slika == Izlozba.id_slika)
+        .where(Izlozba.id_izlozba == izlozba_id)
+    )).first()
+    
+    if not red:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Izložba nije pronađena"
+        )
+    
+    url = red.thumbnail or red.slika
+    if not url:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Izložba nema thumbnail"
+        )
     
-    return IzlozbaResponse(**response_dict)
+    fmt = negotiate_format(format, request.headers.get("accept"))
+    try:
+        image = await image_proxy.get(url, w, fmt)
+    except ImageUnavailable:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Originalna slika nije dostupna"
+        )
+    return image_response(
+        request, image, negotiated=format is None, versioned=v is not None and v == url_version(url)
+    )
 
 
 @router.post("/", response_model=IzlozbaResponse, status_code=status.HTTP_201_CREATED)
 async def create_izlozba(
     izlozba: IzlozbaCreate,
-    db: Session = Depends(get_db),
-    current_user: Korisnik = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_db),
+    current_user: TrenutniKorisnik = Depends(get_current_admin)
 ):
     """
     Kreira novu izložbu (samo admin).
     """
     # Provera da li lokacija postoji
-    lokacija = db.query(Lokacija).filter(
-        Lokacija.id_lokacija == izlozba.id_lokacija
-    ).first()
+    lokacija = await db.get(Lokacija, izlozba.id_lokacija)
     
     if not lokacija:
         raise HTTPException(
@@ -171,7 +383,7 @@ async def create_izlozba(
         )
     
     # Provera sluga
-    existing_slug = db.query(Izlozba).filter(Izlozba.slug == izlozba.slug).first()
+    existing_slug = await db.scalar(select(Izlozba).where(Izlozba.slug == izlozba.slug))
     if existing_slug:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -183,11 +395,10 @@ async def create_izlozba(
     
     db_izlozba = Izlozba(**izlozba_data)
     db.add(db_izlozba)
-    db.commit()
-    db.refresh(db_izlozba)
+    await db.commit()
     
     # Dodavanje slika
-    from app.models.slika import Slika
+    nove_slike = []
     for url in slike_urls:
         if url.strip():
             nova_slika = Slika(
@@ -197,27 +408,27 @@ async def create_izlozba(
                 naslov=db_izlozba.naslov
             )
             db.add(nova_slika)
+            nove_slike.append(nova_slika)
     
     if slike_urls:
-        db.commit()
-        db.refresh(db_izlozba)
+        await db.commit()
+    await response_cache.invalidate("izlozbe")
+    metadata_worker.submit_many(s.id_slika for s in nove_slike)
     
-    return db_izlozba
+    return await _load_izlozba(db, db_izlozba.id_izlozba)
 
 
 @router.put("/{izlozba_id}", response_model=IzlozbaResponse)
 async def update_izlozba(
     izlozba_id: int,
     izlozba_update: IzlozbaUpdate,
-    db: Session = Depends(get_db),
-    current_user: Korisnik = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_db),
+    current_user: TrenutniKorisnik = Depends(get_current_admin)
 ):
     """
     Ažurira izložbu (samo admin).
     """
-    izlozba = db.query(Izlozba).filter(
-        Izlozba.id_izlozba == izlozba_id
-    ).first()
+    izlozba = await _load_izlozba(db, izlozba_id)
     
     if not izlozba:
         raise HTTPException(
@@ -230,7 +441,9 @@ async def update_izlozba(
     
     # Provera sluga
     if "slug" in update_data and update_data["slug"] != izlozba.slug:
-        existing_slug = db.query(Izlozba).filter(Izlozba.slug == update_data["slug"]).first()
+        existing_slug = await db.scalar(
+            select(Izlozba).where(Izlozba.slug == update_data["slug"])
+        )
         if existing_slug:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -239,35 +452,39 @@ async def update_izlozba(
 
     # Validacija kapaciteta
     if "kapacitet" in update_data:
-        ukupno_prijava = sum(p.broj_karata for p in izlozba.prijave)
-        if update_data["kapacitet"] < ukupno_prijava:
+        if update_data["kapacitet"] < izlozba.prodato_karata:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Kapacitet ne može biti manji od broja prijava ({ukupno_prijava})"
+                detail=f"Kapacitet ne može biti manji od broja prijava ({izlozba.prodato_karata})"
             )
     
     for field, value in update_data.items():
         setattr(izlozba, field, value)
+    # Eksplicitno, jer zamena slika ne menja sam red izložbe (ETag)
+    izlozba.datum_izmene = datetime.utcnow()
     
     # Ažuriranje slika ako je poslato
     if slike_urls is not None:
-        from app.models.slika import Slika
         # Brišemo stare slike koje nisu naslovne (ako želimo da ih zamenimo sve)
         # Ili samo dodajemo nove. Uzet ćemo pristup zamene.
-        db.query(Slika).filter(Slika.id_izlozba == izlozba_id).delete()
-        
-        for url in slike_urls:
-            if url.strip():
-                nova_slika = Slika(
-                    slika=url,
-                    thumbnail=url,
-                    id_izlozba=izlozba_id,
-                    naslov=izlozba.naslov
-                )
-                db.add(nova_slika)
+        # Kolekcija je već učitana, pa zamena preko relacije (delete-orphan)
+        # briše stare slike bez zasebnog DELETE upita koji bi ostavio
+        # obrisane objekte u kolekciji
+        izlozba.slike = [
+            Slika(
+                slika=url,
+                thumbnail=url,
+                id_izlozba=izlozba_id,
+                naslov=izlozba.naslov
+            )
+            for url in slike_urls
+            if url.strip()
+        ]
 
-    db.commit()
-    db.refresh(izlozba)
+    await db.commit()
+    await response_cache.invalidate("izlozbe")
+    if slike_urls is not None:
+        metadata_worker.submit_many(s.id_slika for s in izlozba.slike)
     
     return izlozba
 
@@ -275,15 +492,13 @@ async def update_izlozba(
 @router.delete("/{izlozba_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_izlozba(
     izlozba_id: int,
-    db: Session = Depends(get_db),
-    current_user: Korisnik = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_db),
+    current_user: TrenutniKorisnik = Depends(get_current_admin)
 ):
     """
     Briše izložbu (samo admin).
     """
-    izlozba = db.query(Izlozba).filter(
-        Izlozba.id_izlozba == izlozba_id
-    ).first()
+    izlozba = await db.get(Izlozba, izlozba_id)
     
     if not izlozba:
         raise HTTPException(
@@ -291,7 +506,8 @@ async def delete_izlozba(
             detail="Izložba nije pronađena"
         )
     
-    db.delete(izlozba)
-    db.commit()
+    await db.delete(izlozba)
+    await db.commit()
+    await response_cache.invalidate("izlozbe")
     
     return None
@@ -3,24 +3,32 @@ Korisnici Router - Upravljanje korisnicima
 CRUD operacije za korisnike (admin pristup)
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models.korisnik import Korisnik
-from app.schemas.korisnik import KorisnikResponse, KorisnikUpdate
+from app.models.izlozba import Izlozba
+from app.models.prijava import Prijava
+from app.schemas.korisnik import KorisnikResponse, KorisnikUpdate, TrenutniKorisnik
 from app.utils.dependencies import get_current_admin, get_current_user_required
 from app.utils.security import get_password_hash
+from app.utils.pagination import NEXT_CURSOR_HEADER, apply_cursor, next_cursor
+from app.utils.cache import response_cache
+from app.utils.user_cache import user_cache
 
 router = APIRouter(prefix="/api/korisnici", tags=["Korisnici"])
 
 
 @router.get("/", response_model=List[KorisnikResponse])
 async def list_korisnici(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     aktivan: Optional[bool] = None,
-    db: Session = Depends(get_db),
-    current_user: Korisnik = Depends(get_current_admin)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: TrenutniKorisnik = Depends(get_current_admin)
 ):
     """
     Lista svih korisnika (samo admin).
@@ -28,21 +36,31 @@ async def list_korisnici(
     - **skip**: Broj preskočenih rezultata
     - **limit**: Maksimalni broj rezultata
     - **aktivan**: Filter po aktivnosti
+    - **cursor**: Kursor iz `X-Next-Cursor` headera prethodnog odgovora (zamenjuje `skip`)
     """
-    query = db.query(Korisnik)
+    query = select(Korisnik)
     
     if aktivan is not None:
-        query = query.filter(Korisnik.aktivan == aktivan)
+        query = query.where(Korisnik.aktivan == aktivan)
     
-    korisnici = query.offset(skip).limit(limit).all()
+    kljuc = (Korisnik.id_korisnik,)
+    query = apply_cursor(query, kljuc, cursor)
+    if not cursor:
+        query = query.offset(skip)
+    
+    korisnici = (await db.scalars(query.limit(limit))).all()
+    
+    sledeci = next_cursor(korisnici, kljuc, limit)
+    if sledeci:
+        response.headers[NEXT_CURSOR_HEADER] = sledeci
     return korisnici
 
 
 @router.get("/{korisnik_id}", response_model=KorisnikResponse)
 async def get_korisnik(
     korisnik_id: int,
-    db: Session = Depends(get_db),
-    current_user: Korisnik = Depends(get_current_user_required)
+    db: AsyncSession = Depends(get_db),
+    current_user: TrenutniKorisnik = Depends(get_current_user_required)
 ):
     """
     Vraća podatke o korisniku po ID-u.
@@ -56,9 +74,7 @@ async def get_korisnik(
             detail="Nemate pravo pristupa podacima ovog korisnika"
         )
     
-    korisnik = db.query(Korisnik).filter(
-        Korisnik.id_korisnik == korisnik_id
-    ).first()
+    korisnik = await db.get(Korisnik, korisnik_id)
     
     if not korisnik:
         raise HTTPException(
@@ -73,8 +89,8 @@ async def get_korisnik(
 async def update_korisnik(
     korisnik_id: int,
     korisnik_update: KorisnikUpdate,
-    db: Session = Depends(get_db),
-    current_user: Korisnik = Depends(get_current_user_required)
+    db: AsyncSession = Depends(get_db),
+    current_user: TrenutniKorisnik = Depends(get_current_user_required)
 ):
     """
     Ažurira podatke o korisniku.
@@ -82,9 +98,7 @@ async def update_korisnik(
     Korisnik može ažurirati samo svoje podatke (osim super_korisnik).
     Admin može ažurirati sve podatke.
     """
-    korisnik = db.query(Korisnik).filter(
-        Korisnik.id_korisnik == korisnik_id
-    ).first()
+    korisnik = await db.get(Korisnik, korisnik_id)
     
     if not korisnik:
         raise HTTPException(
@@ -118,8 +132,9 @@ async def update_korisnik(
     for field, value in update_data.items():
         setattr(korisnik, field, value)
     
-    db.commit()
-    db.refresh(korisnik)
+    await db.commit()
+    await db.refresh(korisnik)
+    user_cache.invalidate(korisnik_id)
     
     return korisnik
 
@@ -127,15 +142,13 @@ async def update_korisnik(
 @router.delete("/{korisnik_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_korisnik(
     korisnik_id: int,
-    db: Session = Depends(get_db),
-    current_user: Korisnik = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_db),
+    current_user: TrenutniKorisnik = Depends(get_current_admin)
 ):
     """
     Briše korisnika (samo admin).
     """
-    korisnik = db.query(Korisnik).filter(
-        Korisnik.id_korisnik == korisnik_id
-    ).first()
+    korisnik = await db.get(Korisnik, korisnik_id)
     
     if not korisnik:
         raise HTTPException(
@@ -150,7 +163,27 @@ async def delete_korisnik(
             detail="Ne možete obrisati svoj nalog"
         )
     
-    db.delete(korisnik)
-    db.commit()
+    # Prijave korisnika se brišu kaskadno - vraćamo njihove karte u kapacitet izložbi
+    karte_korisnika = (
+        select(func.coalesce(func.sum(Prijava.broj_karata), 0))
+        .where(
+            Prijava.id_izlozba == Izlozba.id_izlozba,
+            Prijava.id_korisnik == korisnik_id
+        )
+        .scalar_subquery()
+    )
+    await db.execute(
+        update(Izlozba)
+        .where(Izlozba.id_izlozba.in_(
+            select(Prijava.id_izlozba).where(Prijava.id_korisnik == korisnik_id)
+        ))
+        .values(prodato_karata=Izlozba.prodato_karata - karte_korisnika)
+        .execution_options(synchronize_session=False)
+    )
+    
+    await db.delete(korisnik)
+    await db.commit()
+    user_cache.invalidate(korisnik_id)
+    await response_cache.invalidate("izlozbe")
     
     return None
@@ -3,51 +3,75 @@ Lokacije Router - Upravljanje lokacijama
 CRUD operacije za lokacije izložbi
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models.lokacija import Lokacija
-from app.models.korisnik import Korisnik
+from app.models.izlozba import Izlozba
+from app.schemas.korisnik import TrenutniKorisnik
 from app.schemas.lokacija import LokacijaCreate, LokacijaUpdate, LokacijaResponse
 from app.utils.dependencies import get_current_admin
+from app.utils.pagination import NEXT_CURSOR_HEADER, apply_cursor, next_cursor
+from app.utils.cache import response_cache, cache_key
+from app.utils.profiler import query_budget
+from app.utils.search import search_key
 
 router = APIRouter(prefix="/api/lokacije", tags=["Lokacije"])
 
 
 @router.get("/", response_model=List[LokacijaResponse])
+@query_budget(1)
 async def list_lokacije(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     grad: Optional[str] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Lista svih lokacija (javno dostupno).
     
     - **skip**: Broj preskočenih rezultata
     - **limit**: Maksimalni broj rezultata
-    - **grad**: Filter po gradu
+    - **grad**: Filter po početku naziva grada (bez razlike ćirilica/latinica i č/c)
+    - **cursor**: Kursor iz `X-Next-Cursor` headera prethodnog odgovora (zamenjuje `skip`)
     """
-    query = db.query(Lokacija)
+    kes_kljuc = cache_key(request)
+    cached, verzija = await response_cache.get("lokacije", kes_kljuc)
+    if cached is not None:
+        return cached
+    
+    query = select(Lokacija)
     
     if grad:
-        query = query.filter(Lokacija.grad.ilike(f"%{grad}%"))
+        query = query.where(Lokacija.grad_kljuc.startswith(search_key(grad), autoescape=True))
+    
+    kljuc = (Lokacija.id_lokacija,)
+    query = apply_cursor(query, kljuc, cursor)
+    if not cursor:
+        query = query.offset(skip)
+    
+    lokacije = (await db.scalars(query.limit(limit))).all()
     
-    lokacije = query.offset(skip).limit(limit).all()
-    return lokacije
+    sledeci = next_cursor(lokacije, kljuc, limit)
+    headers = {NEXT_CURSOR_HEADER: sledeci} if sledeci else {}
+    return await response_cache.store(
+        "lokacije", kes_kljuc, verzija, lokacije, List[LokacijaResponse], headers
+    )
 
 
 @router.get("/{lokacija_id}", response_model=LokacijaResponse)
 async def get_lokacija(
     lokacija_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Vraća lokaciju po ID-u (javno dostupno).
     """
-    lokacija = db.query(Lokacija).filter(
-        Lokacija.id_lokacija == lokacija_id
-    ).first()
+    lokacija = await db.get(Lokacija, lokacija_id)
     
     if not lokacija:
         raise HTTPException(
@@ -61,8 +85,8 @@ async def get_lokacija(
 @router.post("/", response_model=LokacijaResponse, status_code=status.HTTP_201_CREATED)
 async def create_lokacija(
     lokacija: LokacijaCreate,
-    db: Session = Depends(get_db),
-    current_user: Korisnik = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_db),
+    current_user: TrenutniKorisnik = Depends(get_current_admin)
 ):
     """
     Kreira novu lokaciju (samo admin).
@@ -70,8 +94,9 @@ async def create_lokacija(
     db_lokacija = Lokacija(**lokacija.model_dump())
     
     db.add(db_lokacija)
-    db.commit()
-    db.refresh(db_lokacija)
+    await db.commit()
+    await response_cache.invalidate("lokacije", "izlozbe")
+    await db.refresh(db_lokacija)
     
     return db_lokacija
 
@@ -80,15 +105,13 @@ async def create_lokacija(
 async def update_lokacija(
     lokacija_id: int,
     lokacija_update: LokacijaUpdate,
-    db: Session = Depends(get_db),
-    current_user: Korisnik = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_db),
+    current_user: TrenutniKorisnik = Depends(get_current_admin)
 ):
     """
     Ažurira lokaciju (samo admin).
     """
-    lokacija = db.query(Lokacija).filter(
-        Lokacija.id_lokacija == lokacija_id
-    ).first()
+    lokacija = await db.get(Lokacija, lokacija_id)
     
     if not lokacija:
         raise HTTPException(
@@ -101,8 +124,16 @@ async def update_lokacija(
     for field, value in update_data.items():
         setattr(lokacija, field, value)
     
-    db.commit()
-    db.refresh(lokacija)
+    # Izložbe ugrađuju lokaciju u odgovor - menjamo im verziju (ETag)
+    await db.execute(
+        update(Izlozba)
+        .where(Izlozba.id_lokacija == lokacija_id)
+        .values(datum_izmene=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    await response_cache.invalidate("lokacije", "izlozbe")
+    await db.refresh(lokacija)
     
     return lokacija
 
@@ -110,17 +141,15 @@ async def update_lokacija(
 @router.delete("/{lokacija_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_lokacija(
     lokacija_id: int,
-    db: Session = Depends(get_db),
-    current_user: Korisnik = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_db),
+    current_user: TrenutniKorisnik = Depends(get_current_admin)
 ):
     """
     Briše lokaciju (samo admin).
     
     Neće uspeti ako postoje izložbe na toj lokaciji.
     """
-    lokacija = db.query(Lokacija).filter(
-        Lokacija.id_lokacija == lokacija_id
-    ).first()
+    lokacija = await db.get(Lokacija, lokacija_id)
     
     if not lokacija:
         raise HTTPException(
@@ -129,13 +158,17 @@ async def delete_lokacija(
         )
     
     # Provera da li postoje izložbe na ovoj lokaciji
-    if lokacija.izlozbe:
+    ima_izlozbi = await db.scalar(
+        select(Izlozba.id_izlozba).where(Izlozba.id_lokacija == lokacija_id).limit(1)
+    )
+    if ima_izlozbi is not None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Ne možete obrisati lokaciju koja ima izložbe"
         )
     
-    db.delete(lokacija)
-    db.commit()
+    await db.delete(lokacija)
+    await db.commit()
+    await response_cache.invalidate("lokacije", "izlozbe")
     
     return None
@@ -4,28 +4,121 @@ Registracija na izložbe, QR kodovi, validacija
 """
 from typing import List, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, update, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload, defer
+from sqlalchemy.orm.attributes import set_committed_value
 from app.database import get_db
 from app.models.prijava import Prijava
 from app.models.izlozba import Izlozba
-from app.models.korisnik import Korisnik
-from app.schemas.prijava import PrijavaCreate, PrijavaUpdate, PrijavaResponse, PrijavaValidate
+from app.schemas.korisnik import TrenutniKorisnik
+from app.schemas.prijava import (
+    PrijavaCreate, PrijavaUpdate, PrijavaResponse, PrijavaValidate, KartaResponse,
+    PrijavaBatchValidate, ValidacijaRezultat, BatchValidacijaResponse
+)
 from app.utils.dependencies import get_current_user_required, get_current_admin
-from app.services.qr_service import generate_qr_code, decode_qr_data
-from app.services.email_service import send_registration_email
+from app.services.qr_service import (
+    generate_qr_data, decode_qr_data, verify_ticket, render_qr_png, render_qr_svg
+)
+from app.services.qr_worker import qr_worker
+from app.utils.pagination import NEXT_CURSOR_HEADER, apply_cursor, next_cursor
+from app.utils.cache import response_cache
+from app.utils.profiler import query_budget
+from app.utils.etag import make_etag, etag_matches, not_modified
 
 router = APIRouter(prefix="/api/prijave", tags=["Prijave"])
 
+# Ključ sortiranja liste (i kursora): najnovije prijave prve
+SORT_KLJUC = (Prijava.datum_registracije, Prijava.id_prijava)
+
+# Slike QR koda se renderuju iz qr_kod, pa ih klijent može keširati
+QR_CACHE_CONTROL = "private, max-age=86400"
+
+# Ishodi grupne validacije karata
+VALIDNA = "validna"
+VEC_ISKORISCENA = "vec_iskoriscena"
+NEPOZNATA = "nepoznata"
+POGRESNA_IZLOZBA = "pogresna_izlozba"
+NEISPRAVNA = "neispravna"
+
+
+def _prijava_options():
+    """Relacije koje PrijavaResponse serijalizuje (async sesija ne radi lazy load)"""
+    izlozba = joinedload(Prijava.izlozba)
+    return (
+        izlozba.joinedload(Izlozba.lokacija),
+        izlozba.joinedload(Izlozba.slika_naslovna),
+        izlozba.selectinload(Izlozba.slike),
+    )
+
+
+async def _rezervisi_karte(db: AsyncSession, izlozba: Izlozba, broj_karata: int) -> bool:
+    """
+    Atomski rezerviše karte uslovnim UPDATE-om.
+    
+    Uslov prodato_karata + n <= kapacitet proverava baza u istom upitu koji
+    povećava brojač, pa istovremene prijave ne mogu prodati više karata od
+    kapaciteta. Red izložbe ostaje zaključan do commit-a transakcije.
+    
+    Returns:
+        True ako je rezervacija uspela, False ako nema dovoljno mesta
+    """
+    prodato = await db.scalar(
+        update(Izlozba)
+        .where(
+            Izlozba.id_izlozba == izlozba.id_izlozba,
+            Izlozba.prodato_karata + broj_karata <= Izlozba.kapacitet
+        )
+        .values(prodato_karata=Izlozba.prodato_karata + broj_karata)
+        .returning(Izlozba.prodato_karata)
+        .execution_options(synchronize_session=False)
+    )
+    if prodato is None:
+        return False
+    
+    # Osvežavamo učitani objekat bez označavanja izmene (da flush ne bi prepisao brojač)
+    set_committed_value(izlozba, "prodato_karata", prodato)
+    return True
+
+
+def _sa_slikom_qr(include: Optional[str]) -> bool:
+    """Da li lista vraća base64 sliku QR koda (`include=slika_qr`)"""
+    return include is not None and "slika_qr" in {deo.strip() for deo in include.split(",")}
+
+
+def _bez_slike_qr(prijave) -> None:
+    """
+    Prazni slika_qr na prijavama učitanim sa defer(Prijava.slika_qr),
+    bez upita za odloženu kolonu (async sesija ne radi lazy load).
+    """
+    for prijava in prijave:
+        set_committed_value(prijava, "slika_qr", None)
+
+
+async def _load_prijava(db: AsyncSession, prijava_id: int) -> Optional[Prijava]:
+    """Učitava prijavu sa svim relacijama potrebnim za odgovor"""
+    return await db.scalar(
+        select(Prijava)
+        .options(*_prijava_options())
+        .where(Prijava.id_prijava == prijava_id)
+    )
+
 
 @router.get("/", response_model=List[PrijavaResponse])
+@query_budget(3)
 async def list_prijave(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     id_izlozba: Optional[int] = None,
     validirano: Optional[bool] = None,
-    db: Session = Depends(get_db),
-    current_user: Korisnik = Depends(get_current_admin)
+    cursor: Optional[str] = None,
+    include: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: TrenutniKorisnik = Depends(get_current_admin)
 ):
     """
     Lista svih prijava (samo admin).
@@ -34,50 +127,93 @@ async def list_prijave(
     - **limit**: Maksimalni broj rezultata
     - **id_izlozba**: Filter po izložbi
     - **validirano**: Filter po validaciji
+    - **cursor**: Kursor iz `X-Next-Cursor` headera prethodnog odgovora (zamenjuje `skip`)
+    - **include**: `slika_qr` za base64 sliku QR koda (inače videti `/{id}/qr.png`)
     """
-    query = db.query(Prijava).options(joinedload(Prijava.izlozba))
+    sa_slikom_qr = _sa_slikom_qr(include)
+    query = select(Prijava).options(*_prijava_options())
+    if not sa_slikom_qr:
+        query = query.options(defer(Prijava.slika_qr))
     
     if id_izlozba:
-        query = query.filter(Prijava.id_izlozba == id_izlozba)
+        query = query.where(Prijava.id_izlozba == id_izlozba)
     
     if validirano is not None:
-        query = query.filter(Prijava.validirano == validirano)
+        query = query.where(Prijava.validirano == validirano)
+    
+    query = apply_cursor(query, SORT_KLJUC, cursor, descending=True)
+    if not cursor:
+        query = query.offset(skip)
+    
+    prijave = (await db.scalars(query.limit(limit))).all()
+    if not sa_slikom_qr:
+        _bez_slike_qr(prijave)
     
-    prijave = query.order_by(Prijava.datum_registracije.desc()).offset(skip).limit(limit).all()
+    sledeci = next_cursor(prijave, SORT_KLJUC, limit)
+    if sledeci:
+        response.headers[NEXT_CURSOR_HEADER] = sledeci
     return prijave
 
 
 @router.get("/moje", response_model=List[PrijavaResponse])
+@query_budget(4)
 async def list_moje_prijave(
-    db: Session = Depends(get_db),
-    current_user: Korisnik = Depends(get_current_user_required)
+    request: Request,
+    response: Response,
+    include: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: TrenutniKorisnik = Depends(get_current_user_required)
 ):
     """
     Lista prijava trenutnog korisnika.
+    
+    Podržava uslovni GET: uz `If-None-Match` sa ETag-om prethodnog odgovora
+    vraća 304 ako se ni prijave ni njihove izložbe nisu menjale.
+    
+    - **include**: `slika_qr` za base64 sliku QR koda (inače videti `/{id}/qr.png`)
     """
-    prijave = db.query(Prijava).options(
-        joinedload(Prijava.izlozba).joinedload(Izlozba.lokacija)
-    ).filter(
+    sa_slikom_qr = _sa_slikom_qr(include)
+    query = select(Prijava).where(
         Prijava.id_korisnik == current_user.id_korisnik
-    ).order_by(Prijava.datum_registracije.desc()).all()
-    
+    ).order_by(Prijava.datum_registracije.desc(), Prijava.id_prijava.desc())
+    
+    # Verzije prijava i izložbi koje odgovor ugrađuje (bez QR slika i relacija)
+    verzije = (await db.execute(
+        query.join(Prijava.izlozba).with_only_columns(
+            Prijava.id_prijava,
+            func.coalesce(Prijava.datum_izmene, Prijava.datum_registracije),
+            func.coalesce(Izlozba.datum_izmene, Izlozba.datum_kreiranja),
+            Izlozba.prodato_karata
+        )
+    )).all()
+    etag = make_etag(current_user.id_korisnik, sa_slikom_qr, [tuple(red) for red in verzije])
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    query = query.options(*_prijava_options())
+    if not sa_slikom_qr:
+        query = query.options(defer(Prijava.slika_qr))
+    prijave = (await db.scalars(query)).all()
+    if not sa_slikom_qr:
+        _bez_slike_qr(prijave)
+    
+    response.headers["ETag"] = etag
     return prijave
 
 
 @router.get("/{prijava_id}", response_model=PrijavaResponse)
+@query_budget(3)
 async def get_prijava(
     prijava_id: int,
-    db: Session = Depends(get_db),
-    current_user: Korisnik = Depends(get_current_user_required)
+    db: AsyncSession = Depends(get_db),
+    current_user: TrenutniKorisnik = Depends(get_current_user_required)
 ):
     """
     Vraća prijavu po ID-u.
     
     Korisnik može videti samo svoje prijave, admin sve.
     """
-    prijava = db.query(Prijava).options(
-        joinedload(Prijava.izlozba).joinedload(Izlozba.lokacija)
-    ).filter(Prijava.id_prijava == prijava_id).first()
+    prijava = await _load_prijava(db, prijava_id)
     
     if not prijava:
         raise HTTPException(
@@ -98,21 +234,105 @@ async def get_prijava(
     return prijava
 
 
+async def _qr_odgovor(
+    request: Request,
+    db: AsyncSession,
+    current_user: TrenutniKorisnik,
+    prijava_id: int,
+    format: str,
+    render,
+    media_type: str
+) -> Response:
+    """
+    Renderuje (ili iz LRU keša vraća) sliku QR koda prijave.
+    
+    Učitavaju se samo vlasnik i qr_kod; slika se ne čita iz baze.
+    """
+    red = (await db.execute(
+        select(Prijava.id_korisnik, Prijava.qr_kod).where(Prijava.id_prijava == prijava_id)
+    )).first()
+    
+    if not red:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Prijava nije pronađena"
+        )
+    
+    if red.id_korisnik != current_user.id_korisnik and not current_user.super_korisnik:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Nemate pravo pristupa ovoj prijavi"
+        )
+    
+    if not red.qr_kod:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="QR kod nije generisan"
+        )
+    
+    headers = {"Cache-Control": QR_CACHE_CONTROL, "ETag": make_etag(format, red.qr_kod)}
+    if etag_matches(request, headers["ETag"]):
+        response = not_modified(headers["ETag"])
+        response.headers["Cache-Control"] = QR_CACHE_CONTROL
+        return response
+    
+    # Renderovanje je CPU posao - van event loop-a
+    content = await run_in_threadpool(render, red.qr_kod)
+    return Response(content=content, media_type=media_type, headers=headers)
+
+
+@router.get("/{prijava_id}/qr.png", response_class=Response)
+async def get_prijava_qr_png(
+    prijava_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: TrenutniKorisnik = Depends(get_current_user_required)
+):
+    """
+    QR kod prijave kao PNG slika (vlasnik prijave ili admin).
+    """
+    return await _qr_odgovor(
+        request, db, current_user, prijava_id, "png", render_qr_png, "image/png"
+    )
+
+
+@router.get("/{prijava_id}/qr.svg", response_class=Response)
+async def get_prijava_qr_svg(
+    prijava_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: TrenutniKorisnik = Depends(get_current_user_required)
+):
+    """
+    QR kod prijave kao SVG slika (vlasnik prijave ili admin).
+    """
+    return await _qr_odgovor(
+        request, db, current_user, prijava_id, "svg", render_qr_svg, "image/svg+xml"
+    )
+
+
 @router.post("/", response_model=PrijavaResponse, status_code=status.HTTP_201_CREATED)
+@query_budget(7)
 async def create_prijava(
     prijava: PrijavaCreate,
-    db: Session = Depends(get_db),
-    current_user: Korisnik = Depends(get_current_user_required)
+    db: AsyncSession = Depends(get_db),
+    current_user: TrenutniKorisnik = Depends(get_current_user_required)
 ):
     """
     Kreira novu prijavu na izložbu.
     
-    Automatski generiše QR kod i šalje email sa potvrdom.
+    Odgovor se vraća odmah posle rezervacije; QR slika se generiše u
+    pozadini (`status_qr`: na_cekanju -> u_obradi -> spreman), posle čega se šalje
+    email sa potvrdom.
     """
     # Provera da li izložba postoji i da li je dostupna
-    izlozba = db.query(Izlozba).options(
-        joinedload(Izlozba.lokacija)
-    ).filter(Izlozba.id_izlozba == prijava.id_izlozba).first()
+    izlozba = await db.scalar(
+        select(Izlozba).options(
+            joinedload(Izlozba.lokacija),
+            joinedload(Izlozba.slika_naslovna),
+            selectinload(Izlozba.slike)
+        ).where(Izlozba.id_izlozba == prijava.id_izlozba)
+    )
     
     if not izlozba:
         raise HTTPException(
@@ -126,7 +346,7 @@ async def create_prijava(
             detail="Izložba nije dostupna za prijavu"
         )
     
-    # Provera kapaciteta
+    # Brza provera kapaciteta (konačnu odluku donosi _rezervisi_karte)
     if prijava.broj_karata > izlozba.preostali_kapacitet:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -134,10 +354,10 @@ async def create_prijava(
         )
     
     # Provera da li je korisnik već prijavljen
-    existing = db.query(Prijava).filter(
+    existing = await db.scalar(select(Prijava).where(
         Prijava.id_korisnik == current_user.id_korisnik,
         Prijava.id_izlozba == prijava.id_izlozba
-    ).first()
+    ))
     
     if existing:
         raise HTTPException(
@@ -145,46 +365,46 @@ async def create_prijava(
             detail="Već ste prijavljeni na ovu izložbu"
         )
     
-    # Kreiranje prijave
+    # Rezervacija karata
+    if not await _rezervisi_karte(db, izlozba, prijava.broj_karata):
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Nema dovoljno mesta"
+        )
+    
+    # Kreiranje prijave (u istoj transakciji sa rezervacijom)
     db_prijava = Prijava(
         id_korisnik=current_user.id_korisnik,
-        id_izlozba=prijava.id_izlozba,
+        izlozba=izlozba,
         broj_karata=prijava.broj_karata,
         datum_registracije=datetime.utcnow()
     )
     
     db.add(db_prijava)
-    db.commit()
-    db.refresh(db_prijava)
-    
-    # Generisanje QR koda
-    qr_result = generate_qr_code(
-        prijava_id=db_prijava.id_prijava,
-        korisnik_id=current_user.id_korisnik,
-        izlozba_id=prijava.id_izlozba,
-        broj_karata=prijava.broj_karata
-    )
-    
-    db_prijava.qr_kod = qr_result["qr_data"]
-    db_prijava.slika_qr = qr_result["qr_image"]
-    
-    # Simulacija slanja emaila
-    email_sent = send_registration_email(
-        email=current_user.email,
-        korisnik_ime=current_user.puno_ime,
-        izlozba_naslov=izlozba.naslov,
-        qr_image=qr_result["qr_image"],
-        broj_karata=prijava.broj_karata,
-        datum_izlozbe=f"{izlozba.datum_pocetka} - {izlozba.datum_zavrsetka}",
-        lokacija=f"{izlozba.lokacija.naziv}, {izlozba.lokacija.adresa}" if izlozba.lokacija else None
-    )
+    try:
+        await db.flush()
+        # Sadržaj QR koda (jeftin JSON) ide u istu transakciju; slika kasnije
+        db_prijava.qr_kod = generate_qr_data(
+            prijava_id=db_prijava.id_prijava,
+            korisnik_id=current_user.id_korisnik,
+            izlozba_id=prijava.id_izlozba,
+            broj_karata=prijava.broj_karata
+        )
+        await db.commit()
+    except IntegrityError:
+        # Istovremena duplikat prijava - rollback vraća i rezervisane karte
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Već ste prijavljeni na ovu izložbu"
+        )
     
-    if email_sent:
-        db_prijava.email_poslat = True
-        db_prijava.datum_slanja_emaila = datetime.utcnow()
+    # Promenjen je preostali kapacitet izložbe
+    await response_cache.invalidate("izlozbe")
     
-    db.commit()
-    db.refresh(db_prijava)
+    # QR slika i email - u pozadini
+    qr_worker.submit(db_prijava.id_prijava)
     
     return db_prijava
 
@@ -192,13 +412,15 @@ async def create_prijava(
 @router.post("/validate", response_model=PrijavaResponse)
 async def validate_prijava(
     validation: PrijavaValidate,
-    db: Session = Depends(get_db),
-    current_user: Korisnik = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_db),
+    current_user: TrenutniKorisnik = Depends(get_current_admin)
 ):
     """
     Validira QR kod prijave (samo admin).
     
-    Koristi se na ulazu u izložbu za proveru karata.
+    Koristi se na ulazu u izložbu za proveru karata. Potpis karte se
+    proverava bez baze; baza se koristi samo za atomsko označavanje
+    karte kao iskorišćene.
     """
     try:
         qr_data = decode_qr_data(validation.qr_kod)
@@ -208,45 +430,163 @@ async def validate_prijava(
             detail=str(e)
         )
     
-    prijava = db.query(Prijava).options(
-        joinedload(Prijava.izlozba),
-        joinedload(Prijava.korisnik)
-    ).filter(Prijava.id_prijava == qr_data["prijava_id"]).first()
-    
-    if not prijava:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Prijava nije pronađena"
-        )
+    # Uslovni UPDATE: karta mora biti trenutni qr_kod prijave (ponovo izdate
+    # i nepotpisane stare karte se proveravaju istim uslovom) i neiskorišćena
+    karta = (Prijava.id_prijava == qr_data["prijava_id"], Prijava.qr_kod == validation.qr_kod)
+    validirana = await db.scalar(
+        update(Prijava)
+        .where(*karta, Prijava.validirano.is_(False))
+        .values(validirano=True, datum_izmene=datetime.utcnow())
+        .returning(Prijava.id_prijava)
+        .execution_options(synchronize_session=False)
+    )
     
-    if prijava.validirano:
+    if validirana is None:
+        postoji = await db.scalar(select(Prijava.id_prijava).where(*karta))
+        if not postoji:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Prijava nije pronađena"
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Karta je već validirana"
         )
     
-    # Validacija
-    prijava.validirano = True
-    db.commit()
-    db.refresh(prijava)
+    await db.commit()
     
-    return prijava
+    return await _load_prijava(db, validirana)
+
+
+@router.post("/validate/batch", response_model=BatchValidacijaResponse)
+@query_budget(3)
+async def validate_prijave_batch(
+    validation: PrijavaBatchValidate,
+    db: AsyncSession = Depends(get_db),
+    current_user: TrenutniKorisnik = Depends(get_current_admin)
+):
+    """
+    Grupna validacija QR kodova (samo admin).
+    
+    Za skenere koji na otvaranju izložbe šalju stotine karata odjednom:
+    potpisi se proveravaju bez baze, a sve karte se označavaju jednim
+    uslovnim `UPDATE ... RETURNING` - karta ne može biti validirana dva
+    puta ni kada je istovremeno skeniraju dva ulaza.
+    
+    - **qr_kodovi**: Skenirani QR kodovi (do 500)
+    - **id_izlozba**: Izložba na čijem je ulazu skenirano (opciono)
+    """
+    rezultati = [ValidacijaRezultat(qr_kod=qr_kod, status=NEISPRAVNA) for qr_kod in validation.qr_kodovi]
+    # qr_kod -> rezultat prvog pojavljivanja; ponovljeni kodovi se razrešavaju na kraju
+    prvi = {}
+    ponovljeni = []
+    kandidati = {}
+    
+    for rezultat in rezultati:
+        if rezultat.qr_kod in prvi:
+            ponovljeni.append(rezultat)
+            continue
+        prvi[rezultat.qr_kod] = rezultat
+        try:
+            qr_data = decode_qr_data(rezultat.qr_kod)
+            rezultat.id_prijava = int(qr_data["prijava_id"])
+        except (ValueError, TypeError):
+            continue
+        
+        # Potpisana karta nosi izložbu - pogrešan ulaz se odbija bez baze
+        if (qr_data["potpisan"] and validation.id_izlozba is not None
+                and qr_data["izlozba_id"] != validation.id_izlozba):
+            rezultat.status = POGRESNA_IZLOZBA
+            continue
+        
+        kandidati[rezultat.qr_kod] = rezultat
+    
+    if kandidati:
+        uslovi = [
+            Prijava.id_prijava.in_({r.id_prijava for r in kandidati.values()}),
+            Prijava.qr_kod.in_(kandidati.keys()),
+        ]
+        if validation.id_izlozba is not None:
+            uslovi.append(Prijava.id_izlozba == validation.id_izlozba)
+        
+        validirane = (await db.execute(
+            update(Prijava)
+            .where(*uslovi, Prijava.validirano.is_(False))
+            .values(validirano=True, datum_izmene=datetime.utcnow())
+            .returning(Prijava.qr_kod, Prijava.broj_karata)
+            .execution_options(synchronize_session=False)
+        )).all()
+        await db.commit()
+        
+        for qr_kod, broj_karata in validirane:
+            rezultat = kandidati.pop(qr_kod)
+            rezultat.status = VALIDNA
+            rezultat.broj_karata = broj_karata
+    
+    # Preostale karte - jedan upit da se razlikuje razlog odbijanja
+    if kandidati:
+        postojece = {
+            red.qr_kod: red for red in (await db.execute(
+                select(Prijava.qr_kod, Prijava.id_izlozba).where(
+                    Prijava.id_prijava.in_({r.id_prijava for r in kandidati.values()}),
+                    Prijava.qr_kod.in_(kandidati.keys())
+                )
+            )).all()
+        }
+        for qr_kod, rezultat in kandidati.items():
+            red = postojece.get(qr_kod)
+            if red is None:
+                rezultat.status = NEPOZNATA
+            elif validation.id_izlozba is not None and red.id_izlozba != validation.id_izlozba:
+                rezultat.status = POGRESNA_IZLOZBA
+            else:
+                rezultat.status = VEC_ISKORISCENA
+    
+    # Ponovljen kod je ista karta kao prvo pojavljivanje - već iskorišćena
+    # ako je prva prošla, inače odbijena iz istog razloga
+    for rezultat in ponovljeni:
+        original = prvi[rezultat.qr_kod]
+        rezultat.id_prijava = original.id_prijava
+        rezultat.status = VEC_ISKORISCENA if original.status == VALIDNA else original.status
+    
+    return BatchValidacijaResponse(
+        rezultati=rezultati,
+        validno=sum(1 for r in rezultati if r.status == VALIDNA)
+    )
+
+
+@router.post("/verify", response_model=KartaResponse)
+async def verify_karta(
+    validation: PrijavaValidate,
+    current_user: TrenutniKorisnik = Depends(get_current_admin)
+):
+    """
+    Proverava potpis karte bez pristupa bazi i bez validacije (samo admin).
+    
+    Za skenere koji rade van mreže ili pre-proveru na ulazu; karta se
+    označava kao iskorišćena tek kroz `/validate`.
+    """
+    try:
+        return verify_ticket(validation.qr_kod)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
 
 
 @router.delete("/{prijava_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_prijava(
     prijava_id: int,
-    db: Session = Depends(get_db),
-    current_user: Korisnik = Depends(get_current_user_required)
+    db: AsyncSession = Depends(get_db),
+    current_user: TrenutniKorisnik = Depends(get_current_user_required)
 ):
     """
     Otkazuje prijavu.
     
     Korisnik može otkazati samo svoje prijave, admin sve.
     """
-    prijava = db.query(Prijava).filter(
-        Prijava.id_prijava == prijava_id
-    ).first()
+    prijava = await db.get(Prijava, prijava_id)
     
     if not prijava:
         raise HTTPException(
@@ -270,7 +610,13 @@ async def delete_prijava(
             detail="Ne možete otkazati već validiranu prijavu"
         )
     
-    db.delete(prijava)
-    db.commit()
+    await db.delete(prijava)
+    await db.execute(
+        update(Izlozba)
+        .where(Izlozba.id_izlozba == prijava.id_izlozba)
+        .values(prodato_karata=Izlozba.prodato_karata - prijava.broj_karata)
+    )
+    await db.commit()
+    await response_cache.invalidate("izlozbe")
     
     return None
@@ -3,24 +3,78 @@ Slike Router - Upravljanje slikama
 CRUD operacije za slike/fotografije
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import select, update, or_, false
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
-from app.models.slika import Slika
-from app.models.korisnik import Korisnik
-from app.schemas.slika import SlikaCreate, SlikaUpdate, SlikaResponse
+from app.models.slika import Slika, META_NA_CEKANJU
+from app.models.izlozba import Izlozba
+from app.schemas.korisnik import TrenutniKorisnik
+from app.schemas.slika import (
+    SlikaCreate, SlikaUpdate, SlikaResponse, ArticImport, ArticImportResponse
+)
 from app.utils.dependencies import get_current_admin
-from app.services import artic_service
+from app.services import artic_service, artic_mirror, import_service
+from app.services.image_proxy import (
+    image_proxy, image_response, negotiate_format, ImageUnavailable
+)
+from app.services.metadata_worker import metadata_worker
+from app.utils.pagination import NEXT_CURSOR_HEADER, apply_cursor, next_cursor
+from app.utils.cache import response_cache, cache_key
+from app.utils.etag import url_version
+from app.utils.profiler import query_budget
+from app.utils.search import tokenize
 
 router = APIRouter(prefix="/api/slike", tags=["Slike"])
 
 
+async def _oznaci_izmenu_izlozbi(
+    db: AsyncSession, slika: Slika, prethodna_izlozba: Optional[int] = None
+) -> None:
+    """
+    Menja verziju (ETag) izložbi koje ugrađuju sliku u odgovor.
+    
+    Args:
+        db: Sesija baze
+        slika: Slika
+        prethodna_izlozba: Izložba iz čije je galerije slika premeštena
+    """
+    izlozbe = {slika.id_izlozba, prethodna_izlozba} - {None}
+    await db.execute(
+        update(Izlozba)
+        .where(or_(
+            Izlozba.id_izlozba.in_(izlozbe),
+            Izlozba.id_slika == slika.id_slika
+        ))
+        .values(datum_izmene=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _proveri_izlozbu(db: AsyncSession, id_izlozba: Optional[int]) -> None:
+    """Izložba u čiju se galeriju slika dodaje mora postojati"""
+    if id_izlozba is not None and not await db.get(Izlozba, id_izlozba):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Izložba nije pronađena"
+        )
+
+
+# Ključ sortiranja liste (i kursora)
+SORT_KLJUC = (Slika.redosled, Slika.id_slika)
+
+
 @router.get("/", response_model=List[SlikaResponse])
+@query_budget(1)
 async def list_slike(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
     istaknuta: Optional[bool] = None,
-    db: Session = Depends(get_db)
+    search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Lista svih slika (javno dostupno).
@@ -28,30 +82,60 @@ async def list_slike(
     - **skip**: Broj preskočenih rezultata
     - **limit**: Maksimalni broj rezultata
     - **istaknuta**: Filter po istaknutim slikama
+    - **search**: Pretraga po naslovu, fotografu ili opisu (bez razlike ćirilica/latinica i č/c)
+    - **cursor**: Kursor iz `X-Next-Cursor` headera prethodnog odgovora (zamenjuje `skip`)
     """
-    query = db.query(Slika)
+    kes_kljuc = cache_key(request)
+    cached, verzija = await response_cache.get("slike", kes_kljuc)
+    if cached is not None:
+        return cached
+    
+    query = select(Slika)
     
     if istaknuta is not None:
-        query = query.filter(Slika.istaknuta == istaknuta)
+        query = query.where(Slika.istaknuta == istaknuta)
     
-    slike = query.order_by(Slika.redosled).offset(skip).limit(limit).all()
-    return slike
+    # Sve reči upita u normalizovanom dokumentu (trigram indeks na PostgreSQL-u)
+    if search:
+        reci = tokenize(search)
+        if not reci:
+            query = query.where(false())
+        for rec in reci:
+            query = query.where(Slika.pretraga.contains(rec, autoescape=True))
+    
+    query = apply_cursor(query, SORT_KLJUC, cursor)
+    if not cursor:
+        query = query.offset(skip)
+    
+    slike = (await db.scalars(query.limit(limit))).all()
+    
+    sledeci = next_cursor(slike, SORT_KLJUC, limit)
+    headers = {NEXT_CURSOR_HEADER: sledeci} if sledeci else {}
+    return await response_cache.store(
+        "slike", kes_kljuc, verzija, slike, List[SlikaResponse], headers
+    )
 
 
 @router.get("/artic")
 async def list_artic_artworks(
     page: int = Query(1, ge=1),
     limit: int = Query(12, ge=1, le=50),
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Dohvata slike sa Art Institute of Chicago API.
     
+    Služi se iz lokalnog mirror-a (sync_artic.py) kada ima podataka,
+    inače direktno sa API-ja.
+    
     - **page**: Broj stranice
     - **limit**: Broj rezultata po stranici
     - **search**: Termin za pretragu
     """
-    data = await artic_service.fetch_artworks(page=page, limit=limit, search=search)
+    data = await artic_mirror.list_artworks(db, page=page, limit=limit, search=search)
+    if data is None:
+        data = await artic_service.fetch_artworks(page=page, limit=limit, search=search)
     
     # Formatiranje rezultata
     artworks = []
@@ -76,12 +160,12 @@ async def list_artic_artworks(
 @router.get("/{slika_id}", response_model=SlikaResponse)
 async def get_slika(
     slika_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Vraća sliku po ID-u (javno dostupno).
     """
-    slika = db.query(Slika).filter(Slika.id_slika == slika_id).first()
+    slika = await db.get(Slika, slika_id)
     
     if not slika:
         raise HTTPException(
@@ -92,22 +176,70 @@ async def get_slika(
     return slika
 
 
+@router.get("/{slika_id}/image", response_class=Response)
+@query_budget(1)
+async def get_slika_image(
+    slika_id: int,
+    request: Request,
+    w: int = Query(640, ge=1, le=4096),
+    format: Optional[str] = Query(None, pattern="^(avif|webp|jpeg)$"),
+    v: Optional[str] = Query(None, max_length=32),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Umanjena verzija slike (javno dostupno).
+    
+    - **w**: Širina u pikselima (zaokružuje se naviše na 160, 320, 640, 960, 1280 ili 1920)
+    - **format**: avif, webp ili jpeg (podrazumevano po Accept headeru)
+    - **v**: `verzija_slike` iz odgovora slike - uz nju se slika kešira dugo
+    
+    Original se preuzima jednom; verzije se čuvaju u kešu na disku.
+    """
+    url = await db.scalar(select(Slika.slika).where(Slika.id_slika == slika_id))
+    
+    if not url:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Slika nije pronađena"
+        )
+    
+    fmt = negotiate_format(format, request.headers.get("accept"))
+    try:
+        image = await image_proxy.get(url, w, fmt)
+    except ImageUnavailable:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Originalna slika nije dostupna"
+        )
+    return image_response(
+        request, image, negotiated=format is None, versioned=v is not None and v == url_version(url)
+    )
+
+
 @router.post("/", response_model=SlikaResponse, status_code=status.HTTP_201_CREATED)
 async def create_slika(
     slika: SlikaCreate,
-    db: Session = Depends(get_db),
-    current_user: Korisnik = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_db),
+    current_user: TrenutniKorisnik = Depends(get_current_admin)
 ):
     """
     Kreira novu sliku (samo admin).
     
     Slika se čuva kao URL link, ne kao fajl.
+    
+    - **id_izlozba**: Izložba u čiju galeriju se slika dodaje (opciono)
     """
+    await _proveri_izlozbu(db, slika.id_izlozba)
     db_slika = Slika(**slika.model_dump())
     
     db.add(db_slika)
-    db.commit()
-    db.refresh(db_slika)
+    if db_slika.id_izlozba is not None:
+        await db.flush()
+        await _oznaci_izmenu_izlozbi(db, db_slika)
+    await db.commit()
+    await response_cache.invalidate("slike", "izlozbe")
+    await db.refresh(db_slika)
+    metadata_worker.submit(db_slika.id_slika)
     
     return db_slika
 
@@ -115,13 +247,20 @@ async def create_slika(
 @router.post("/from-artic", response_model=SlikaResponse, status_code=status.HTTP_201_CREATED)
 async def create_slika_from_artic(
     artwork_id: int,
-    db: Session = Depends(get_db),
-    current_user: Korisnik = Depends(get_current_admin)
+    id_izlozba: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: TrenutniKorisnik = Depends(get_current_admin)
 ):
     """
     Kreira sliku iz Art Institute of Chicago API (samo admin).
+    
+    - **id_izlozba**: Izložba u čiju galeriju se slika dodaje (opciono)
     """
-    artwork = await artic_service.get_artwork_by_id(artwork_id)
+    await _proveri_izlozbu(db, id_izlozba)
+    artwork = (
+        await artic_mirror.get_artwork(db, artwork_id)
+        or await artic_service.get_artwork_by_id(artwork_id)
+    )
     
     if not artwork:
         raise HTTPException(
@@ -130,26 +269,72 @@ async def create_slika_from_artic(
         )
     
     slika_data = artic_service.format_artwork_to_slika(artwork)
-    db_slika = Slika(**slika_data)
+    db_slika = Slika(**slika_data, id_izlozba=id_izlozba)
     
     db.add(db_slika)
-    db.commit()
-    db.refresh(db_slika)
+    if db_slika.id_izlozba is not None:
+        await db.flush()
+        await _oznaci_izmenu_izlozbi(db, db_slika)
+    await db.commit()
+    await response_cache.invalidate("slike", "izlozbe")
+    await db.refresh(db_slika)
+    metadata_worker.submit(db_slika.id_slika)
     
     return db_slika
 
 
+@router.post("/from-artic/bulk", response_model=ArticImportResponse)
+async def import_slike_from_artic(
+    zahtev: ArticImport,
+    db: AsyncSession = Depends(get_db),
+    current_user: TrenutniKorisnik = Depends(get_current_admin)
+):
+    """
+    Grupni uvoz radova sa Art Institute of Chicago API (samo admin).
+    
+    - **artwork_ids**: ID-jevi radova (do 500) ili
+    - **search**: Termin za pretragu (uvozi prvih **limit** rezultata)
+    - **id_izlozba**: Izložba u čiju galeriju se slike dodaju (opciono)
+    
+    Slike čiji URL već postoji se preskaču (status `duplikat`).
+    """
+    await _proveri_izlozbu(db, zahtev.id_izlozba)
+    
+    try:
+        rezultati = await import_service.import_artworks(
+            db,
+            artwork_ids=zahtev.artwork_ids,
+            search=zahtev.search,
+            limit=zahtev.limit,
+            id_izlozba=zahtev.id_izlozba
+        )
+    except artic_service.ArticUnavailable:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Artic API trenutno nije dostupan"
+        )
+    
+    uvezeno = sum(1 for r in rezultati if r["status"] == import_service.UVEZENA)
+    if uvezeno:
+        await response_cache.invalidate("slike", "izlozbe")
+        metadata_worker.submit_many(
+            r["id_slika"] for r in rezultati if r["status"] == import_service.UVEZENA
+        )
+    
+    return ArticImportResponse(rezultati=rezultati, uvezeno=uvezeno)
+
+
 @router.put("/{slika_id}", response_model=SlikaResponse)
 async def update_slika(
     slika_id: int,
     slika_update: SlikaUpdate,
-    db: Session = Depends(get_db),
-    current_user: Korisnik = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_db),
+    current_user: TrenutniKorisnik = Depends(get_current_admin)
 ):
     """
     Ažurira sliku (samo admin).
     """
-    slika = db.query(Slika).filter(Slika.id_slika == slika_id).first()
+    slika = await db.get(Slika, slika_id)
     
     if not slika:
         raise HTTPException(
@@ -158,12 +343,28 @@ async def update_slika(
         )
     
     update_data = slika_update.model_dump(exclude_unset=True)
+    if "id_izlozba" in update_data:
+        await _proveri_izlozbu(db, update_data["id_izlozba"])
+    # Premeštena slika menja galeriju i izložbe iz koje je uklonjena
+    prethodna_izlozba = slika.id_izlozba
+    
+    # Nova slika - stari metapodaci ne važe, računaju se ponovo
+    nov_url = "slika" in update_data and update_data["slika"] != slika.slika
+    if nov_url:
+        update_data.update(
+            sirina=None, visina=None, dominantna_boja=None, blurhash=None, lqip=None,
+            status_metapodataka=META_NA_CEKANJU
+        )
     
     for field, value in update_data.items():
         setattr(slika, field, value)
     
-    db.commit()
-    db.refresh(slika)
+    await _oznaci_izmenu_izlozbi(db, slika, prethodna_izlozba)
+    await db.commit()
+    await response_cache.invalidate("slike", "izlozbe")
+    await db.refresh(slika)
+    if nov_url:
+        metadata_worker.submit(slika.id_slika)
     
     return slika
 
@@ -171,13 +372,13 @@ async def update_slika(
 @router.delete("/{slika_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_slika(
     slika_id: int,
-    db: Session = Depends(get_db),
-    current_user: Korisnik = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_db),
+    current_user: TrenutniKorisnik = Depends(get_current_admin)
 ):
     """
     Briše sliku (samo admin).
     """
-    slika = db.query(Slika).filter(Slika.id_slika == slika_id).first()
+    slika = await db.get(Slika, slika_id)
     
     if not slika:
         raise HTTPException(
@@ -185,7 +386,9 @@ async def delete_slika(
             detail="Slika nije pronađena"
         )
     
-    db.delete(slika)
-    db.commit()
+    await _oznaci_izmenu_izlozbi(db, slika)
+    await db.delete(slika)
+    await db.commit()
+    await response_cache.invalidate("slike", "izlozbe")
     
     return None
@@ -2,18 +2,21 @@
 Schemas paket - Pydantic šeme za validaciju
 """
 from app.schemas.korisnik import (
-    KorisnikCreate, KorisnikUpdate, KorisnikResponse, KorisnikLogin
+    KorisnikCreate, KorisnikUpdate, KorisnikResponse, KorisnikLogin, TrenutniKorisnik
 )
 from app.schemas.lokacija import (
     LokacijaCreate, LokacijaUpdate, LokacijaResponse
 )
 from app.schemas.slika import (
-    SlikaCreate, SlikaUpdate, SlikaResponse
+    SlikaCreate, SlikaUpdate, SlikaResponse,
+    ArticImport, ArticImportRezultat, ArticImportResponse
 )
 from app.schemas.izlozba import (
-    IzlozbaCreate, IzlozbaUpdate, IzlozbaResponse, IzlozbaListResponse
+    IzlozbaCreate, IzlozbaUpdate, IzlozbaResponse, IzlozbaKarticaResponse,
+    IzlozbaUBliziniResponse, IzlozbaListResponse
 )
 from app.schemas.prijava import (
-    PrijavaCreate, PrijavaUpdate, PrijavaResponse
+    PrijavaCreate, PrijavaUpdate, PrijavaResponse, KartaResponse,
+    PrijavaBatchValidate, ValidacijaRezultat, BatchValidacijaResponse
 )
 from app.schemas.token import Token, TokenData
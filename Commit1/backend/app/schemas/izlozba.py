@@ -66,15 +66,53 @@ class IzlozbaResponse(IzlozbaBase):
     slika_naslovna: Optional[SlikaResponse] = None
     slike: List[SlikaResponse] = []
     preostali_kapacitet: Optional[int] = None
+    # ?v= za /api/izlozbe/{id}/thumbnail - adresa sa verzijom se kešira dugo
+    verzija_thumbnaila: Optional[str] = None
     
     class Config:
         from_attributes = True
 
 
+class IzlozbaKarticaResponse(BaseModel):
+    """
+    Šema izložbe u listi (kartica) - bez punog opisa.
+    Galerija slika se puni samo uz ?include=slike, inače je prazna lista.
+    """
+    id_izlozba: int
+    naslov: str
+    slug: str
+    kratak_opis: Optional[str] = None
+    datum_pocetka: date
+    datum_zavrsetka: date
+    id_lokacija: int
+    kapacitet: int
+    thumbnail: Optional[str] = None
+    osmislio: Optional[str] = None
+    aktivan: bool
+    objavljeno: bool
+    id_slika: Optional[int] = None
+    datum_kreiranja: datetime
+    datum_izmene: Optional[datetime] = None
+    lokacija: Optional[LokacijaResponse] = None
+    slika_naslovna: Optional[SlikaResponse] = None
+    slike: List[SlikaResponse] = []
+    preostali_kapacitet: Optional[int] = None
+    verzija_thumbnaila: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class IzlozbaUBliziniResponse(IzlozbaKarticaResponse):
+    """Šema izložbe u pretrazi po blizini - sa udaljenošću od tražene tačke"""
+    udaljenost_km: float
+
+
 class IzlozbaListResponse(BaseModel):
     """Šema za listu izložbi sa paginacijom"""
-    items: List[IzlozbaResponse]
-    total: int
+    items: List[IzlozbaKarticaResponse]
+    total: Optional[int] = None
     page: int
     per_page: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
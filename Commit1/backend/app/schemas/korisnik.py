@@ -47,6 +47,43 @@ class KorisnikResponse(KorisnikBase):
         from_attributes = True
 
 
+class TrenutniKorisnik(BaseModel):
+    """
+    Prijavljeni korisnik iz JWT tokena (bez heša lozinke).
+
+    Samo za čitanje i nije vezan za sesiju baze - isti objekat se deli
+    između zahteva preko user_cache. Za izmenu korisnika učitava se
+    Korisnik iz baze.
+    """
+    id_korisnik: int
+    username: str
+    email: str
+    ime: str
+    prezime: str
+    telefon: Optional[str] = None
+    grad: Optional[str] = None
+    adresa: Optional[str] = None
+    profilna_slika: Optional[str] = None
+    aktivan: bool
+    super_korisnik: bool
+    datum_pridruzivanja: datetime
+    poslednja_prijava: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+        frozen = True
+    
+    @property
+    def puno_ime(self) -> str:
+        """Vraća puno ime korisnika"""
+        return f"{self.ime} {self.prezime}"
+    
+    @property
+    def is_admin(self) -> bool:
+        """Proverava da li je korisnik administrator"""
+        return self.super_korisnik
+
+
 class KorisnikLogin(BaseModel):
     """Šema za prijavu korisnika"""
     username: str
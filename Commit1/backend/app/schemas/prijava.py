@@ -2,7 +2,7 @@
 Pydantic šeme za Prijava (Registration)
 """
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field
 from app.schemas.izlozba import IzlozbaResponse
 
@@ -35,6 +35,7 @@ class PrijavaResponse(BaseModel):
     validirano: bool
     datum_registracije: datetime
     slika_qr: Optional[str] = None
+    status_qr: str = "na_cekanju"
     verifikovan_email: bool
     email_poslat: bool
     datum_slanja_emaila: Optional[datetime] = None
@@ -47,3 +48,32 @@ class PrijavaResponse(BaseModel):
 class PrijavaValidate(BaseModel):
     """Šema za validaciju QR koda"""
     qr_kod: str
+
+
+class PrijavaBatchValidate(BaseModel):
+    """Šema za grupnu validaciju QR kodova (skeneri na ulazu)"""
+    qr_kodovi: List[str] = Field(..., min_length=1, max_length=500)
+    id_izlozba: Optional[int] = None
+
+
+class ValidacijaRezultat(BaseModel):
+    """Ishod validacije jedne karte"""
+    qr_kod: str
+    status: str  # validna, vec_iskoriscena, nepoznata, pogresna_izlozba, neispravna
+    id_prijava: Optional[int] = None
+    broj_karata: Optional[int] = None
+
+
+class BatchValidacijaResponse(BaseModel):
+    """Šema odgovora grupne validacije"""
+    rezultati: List[ValidacijaRezultat]
+    validno: int
+
+
+class KartaResponse(BaseModel):
+    """Podaci potpisane karte (provera bez baze)"""
+    prijava_id: int
+    korisnik_id: int
+    izlozba_id: int
+    broj_karata: int
+    datum_generisanja: datetime
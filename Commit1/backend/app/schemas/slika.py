@@ -2,8 +2,8 @@
 Pydantic šeme za Slika (Image)
 """
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, Field, HttpUrl
+from typing import List, Optional
+from pydantic import BaseModel, Field, HttpUrl, model_validator
 
 
 class SlikaBase(BaseModel):
@@ -20,7 +20,7 @@ class SlikaBase(BaseModel):
 
 class SlikaCreate(SlikaBase):
     """Šema za kreiranje slike"""
-    pass
+    id_izlozba: Optional[int] = None
 
 
 class SlikaUpdate(BaseModel):
@@ -33,12 +33,51 @@ class SlikaUpdate(BaseModel):
     istaknuta: Optional[bool] = None
     naslovna: Optional[bool] = None
     redosled: Optional[int] = None
+    # Premeštanje u drugu galeriju (null uklanja sliku iz izložbe)
+    id_izlozba: Optional[int] = None
 
 
 class SlikaResponse(SlikaBase):
     """Šema za odgovor sa podacima slike"""
     id_slika: int
     datum_otpremanja: datetime
+    # Placeholder pre učitavanja slike (popunjava se u pozadini)
+    sirina: Optional[int] = None
+    visina: Optional[int] = None
+    odnos_stranica: Optional[float] = None
+    dominantna_boja: Optional[str] = None
+    blurhash: Optional[str] = None
+    lqip: Optional[str] = None
+    # ?v= za /api/slike/{id}/image - adresa sa verzijom se kešira dugo
+    verzija_slike: Optional[str] = None
     
     class Config:
         from_attributes = True
+
+
+class ArticImport(BaseModel):
+    """Šema za grupni uvoz radova sa Artic API-ja (lista ID-jeva ili pretraga)"""
+    artwork_ids: List[int] = Field(default_factory=list, max_length=500)
+    search: Optional[str] = Field(None, min_length=1, max_length=200)
+    limit: int = Field(default=100, ge=1, le=500)  # broj rezultata pretrage
+    id_izlozba: Optional[int] = None
+    
+    @model_validator(mode='after')
+    def ids_ili_pretraga(self):
+        """Zadaje se tačno jedno: artwork_ids ili search"""
+        if bool(self.artwork_ids) == bool(self.search):
+            raise ValueError('Zadajte artwork_ids ili search')
+        return self
+
+
+class ArticImportRezultat(BaseModel):
+    """Ishod uvoza jednog rada"""
+    artwork_id: int
+    status: str  # uvezena, duplikat, bez_slike, nije_pronadjena, greska
+    id_slika: Optional[int] = None
+
+
+class ArticImportResponse(BaseModel):
+    """Šema odgovora grupnog uvoza"""
+    rezultati: List[ArticImportRezultat]
+    uvezeno: int
@@ -0,0 +1,309 @@
+"""
+Artic mirror servis
+Lokalna kopija radova sa Art Institute of Chicago API: sinhronizacija
+(API ili data dump) i pretraga bez poziva ka spoljnom API-ju
+"""
+import asyncio
+import json
+import logging
+import os
+import tarfile
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from sqlalchemy import select, func, false, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.artic_rad import ArticRad
+from app.services.artic_service import (
+    artic_client, ARTWORK_DETAIL_FIELDS, ARTIC_PAGE_LIMIT
+)
+from app.utils.search import search_document, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Broj radova po jednom upsert-u
+BATCH_SIZE = 500
+# Search API ne vraća rezultate posle 10000. pozicije (page * limit)
+SEARCH_WINDOW = 10000
+
+# Da li mirror ima podatke (jednom popunjen ostaje popunjen)
+_has_data = False
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """ISO vreme sa Artic API-ja -> naivno UTC (kao ostale kolone u bazi)"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def artwork_row(artwork: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Red tabele artic_radovi iz rada u formatu Artic API-ja (ili data dump-a).
+
+    Returns:
+        Dict kolona ili None ako rad nema ID
+    """
+    if not artwork.get("id"):
+        return None
+    thumbnail = artwork.get("thumbnail") or {}
+    naslov = (artwork.get("title") or "")[:500] or None
+    return {
+        "id_artic": artwork["id"],
+        "naslov": naslov,
+        "umetnik": artwork.get("artist_display"),
+        "datum": (artwork.get("date_display") or "")[:200] or None,
+        "image_id": artwork.get("image_id"),
+        "opis": artwork.get("description"),
+        "dimenzije": artwork.get("dimensions"),
+        "tehnika": artwork.get("medium_display"),
+        "sirina": thumbnail.get("width"),
+        "visina": thumbnail.get("height"),
+        "lqip": thumbnail.get("lqip"),
+        "poslednja_izmena": _parse_timestamp(artwork.get("last_updated")),
+        # Upsert zaobilazi mapper evente - dokument za pretragu se računa ovde
+        "pretraga": search_document(naslov, artwork.get("artist_display"), artwork.get("description")),
+    }
+
+
+async def upsert_artworks(db: AsyncSession, artworks: Iterable[Dict[str, Any]]) -> int:
+    """
+    Upisuje radove jednim INSERT ... ON CONFLICT naredbom po grupi.
+
+    Postojeći red se menja samo ako je last_updated noviji.
+
+    Args:
+        db: Sesija baze
+        artworks: Radovi u formatu Artic API-ja
+
+    Returns:
+        Broj obrađenih radova
+    """
+    global _has_data
+    # Isti rad više puta u grupi (dump sa istorijom) - ostaje najnoviji zapis
+    po_id: Dict[int, Dict[str, Any]] = {}
+    for row in map(artwork_row, artworks):
+        if not row:
+            continue
+        prethodni = po_id.get(row["id_artic"])
+        if (
+            prethodni is not None
+            and row["poslednja_izmena"] is not None
+            and prethodni["poslednja_izmena"] is not None
+            and row["poslednja_izmena"] < prethodni["poslednja_izmena"]
+        ):
+            continue
+        po_id[row["id_artic"]] = row
+    rows = list(po_id.values())
+    if not rows:
+        return 0
+
+    dialect = db.bind.dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    for start in range(0, len(rows), BATCH_SIZE):
+        stmt = insert(ArticRad).values(rows[start:start + BATCH_SIZE])
+        izmene = {
+            column: stmt.excluded[column]
+            for column in rows[0] if column != "id_artic"
+        }
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[ArticRad.id_artic],
+            set_=izmene,
+            where=or_(
+                ArticRad.poslednja_izmena.is_(None),
+                stmt.excluded.poslednja_izmena.is_(None),
+                stmt.excluded.poslednja_izmena > ArticRad.poslednja_izmena
+            )
+        ))
+    await db.commit()
+    _has_data = True
+    return len(rows)
+
+
+def iter_dump(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Čita radove iz Artic data dump-a.
+
+    Podržano: direktorijum JSON fajlova (json/artworks/*.json iz zvaničnog
+    dump-a), tar arhiva (.tar, .tar.gz, .tar.bz2) sa istom strukturom i
+    JSON Lines fajl (jedan rad po liniji).
+    """
+    if os.path.isdir(path):
+        for root, _, files in os.walk(path):
+            for name in sorted(files):
+                if name.endswith(".json"):
+                    with open(os.path.join(root, name), encoding="utf-8") as f:
+                        yield json.load(f)
+    elif tarfile.is_tarfile(path):
+        with tarfile.open(path) as archive:
+            for member in archive:
+                if member.isfile() and member.name.endswith(".json") and "artworks" in member.name:
+                    yield json.load(archive.extractfile(member))
+    else:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+async def ingest_dump(db: AsyncSession, path: str) -> int:
+    """
+    Popunjava mirror iz data dump-a (bez mreže).
+
+    Returns:
+        Broj obrađenih radova
+    """
+    total = 0
+    batch: List[Dict[str, Any]] = []
+    for artwork in iter_dump(path):
+        batch.append(artwork)
+        if len(batch) >= BATCH_SIZE:
+            total += await upsert_artworks(db, batch)
+            batch = []
+    total += await upsert_artworks(db, batch)
+    return total
+
+
+async def sync_from_api(db: AsyncSession, full: bool = False) -> int:
+    """
+    Sinhronizacija sa Artic API-jem.
+
+    Inkrementalno (podrazumevano): radovi sa last_updated od najnovijeg
+    u mirror-u (uključivo - radovi izmenjeni u istoj sekundi kao poslednji
+    sinhronizovani se ne preskaču; upsert ne menja već upisane), preko
+    search API-ja sortiranog po last_updated. Puna
+    sinhronizacija prolazi kroz sve stranice /artworks (sporo - za prvo
+    punjenje je bolji data dump).
+
+    Args:
+        db: Sesija baze
+        full: Puna sinhronizacija
+
+    Returns:
+        Broj obrađenih radova
+
+    Raises:
+        ArticUnavailable: Ako API nije dostupan
+    """
+    fields = f"{ARTWORK_DETAIL_FIELDS},last_updated"
+    total = 0
+
+    if full:
+        page, pages = 1, 1
+        while page <= pages:
+            data = await artic_client.get_json(
+                "/artworks", {"page": page, "limit": ARTIC_PAGE_LIMIT, "fields": fields}, cache=False
+            ) or {}
+            total += await upsert_artworks(db, data.get("data", []))
+            pages = (data.get("pagination") or {}).get("total_pages", 0)
+            page += 1
+        return total
+
+    watermark = await db.scalar(select(func.max(ArticRad.poslednja_izmena)))
+    while True:
+        params: Dict[str, Any] = {
+            "limit": ARTIC_PAGE_LIMIT,
+            "fields": fields,
+            "sort[last_updated][order]": "asc",
+        }
+        if watermark is not None:
+            params["query[range][last_updated][gte]"] = watermark.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        # Stranice do granice search API-ja; posle nje se nastavlja od novog watermark-a
+        page, poslednji = 1, []
+        while page * ARTIC_PAGE_LIMIT <= SEARCH_WINDOW:
+            data = await artic_client.get_json(
+                "/artworks/search", {**params, "page": page}, cache=False
+            ) or {}
+            poslednji = data.get("data", [])
+            total += await upsert_artworks(db, poslednji)
+            if len(poslednji) < ARTIC_PAGE_LIMIT:
+                return total
+            page += 1
+
+        novi = await db.scalar(select(func.max(ArticRad.poslednja_izmena)))
+        if novi is None or novi == watermark:
+            return total
+        watermark = novi
+
+
+async def has_data(db: AsyncSession) -> bool:
+    """Da li mirror ima bar jedan rad"""
+    global _has_data
+    if not _has_data:
+        _has_data = await db.scalar(select(ArticRad.id_artic).limit(1)) is not None
+    return _has_data
+
+
+async def list_artworks(
+    db: AsyncSession,
+    page: int = 1,
+    limit: int = 12,
+    search: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Radovi sa slikom iz mirror-a, u formatu odgovora Artic API-ja.
+
+    Args:
+        db: Sesija baze
+        page: Broj stranice
+        limit: Broj rezultata po stranici
+        search: Termin za pretragu (sve reči, bez razlike ćirilica/latinica i č/c)
+
+    Returns:
+        Dict sa "data" i "pagination" ili None ako mirror nema podatke
+    """
+    if not settings.ARTIC_MIRROR_ENABLED or not await has_data(db):
+        return None
+
+    query = select(ArticRad).where(ArticRad.image_id.is_not(None))
+    if search:
+        reci = tokenize(search)
+        if not reci:
+            query = query.where(false())
+        for rec in reci:
+            query = query.where(ArticRad.pretraga.contains(rec, autoescape=True))
+
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
+    radovi = (await db.scalars(
+        query.order_by(ArticRad.id_artic).offset((page - 1) * limit).limit(limit)
+    )).all()
+
+    return {
+        "data": [rad.to_artwork() for rad in radovi],
+        "pagination": {
+            "total": total,
+            "limit": limit,
+            "offset": (page - 1) * limit,
+            "total_pages": (total + limit - 1) // limit,
+            "current_page": page,
+        },
+    }
+
+
+async def get_artwork(db: AsyncSession, artwork_id: int) -> Optional[Dict[str, Any]]:
+    """Rad iz mirror-a u formatu Artic API-ja (None ako ga nema)"""
+    if not settings.ARTIC_MIRROR_ENABLED:
+        return None
+    rad = await db.get(ArticRad, artwork_id)
+    return rad.to_artwork() if rad else None
+
+
+async def run_periodic_sync(interval_minutes: int) -> None:
+    """Pozadinska inkrementalna sinhronizacija (pokreće se iz lifespan-a)"""
+    while True:
+        await asyncio.sleep(interval_minutes * 60)
+        try:
+            async with AsyncSessionLocal() as db:
+                total = await sync_from_api(db)
+            logger.info(f"Artic mirror sinhronizovan: {total} radova")
+        except Exception as e:
+            logger.error(f"Greška pri sinhronizaciji Artic mirror-a: {str(e)}")
@@ -2,15 +2,228 @@
 Art Institute of Chicago API servis
 Dohvatanje slika sa javnog API-ja
 """
+import asyncio
+import importlib.util
+import json
+import time
 import httpx
-from typing import List, Dict, Any, Optional
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlencode
 from app.config import settings
+from app.utils.cache import MemoryCacheBackend
 import logging
 
 logger = logging.getLogger(__name__)
 
 # Bazni URL za slike
 IIIF_BASE_URL = "https://www.artic.edu/iiif/2"
+# Širina slike koju čuvamo (Artic preporučuje 843px za pune prikaze)
+IIIF_SIRINA = 843
+
+ARTWORK_LIST_FIELDS = "id,title,artist_display,date_display,image_id,thumbnail,description"
+ARTWORK_DETAIL_FIELDS = (
+    "id,title,artist_display,date_display,image_id,thumbnail,description,dimensions,medium_display"
+)
+# Najveći broj rezultata po zahtevu (limit / ids=) koji Artic API prihvata
+ARTIC_PAGE_LIMIT = 100
+
+
+class ArticUnavailable(Exception):
+    """Artic API nije dostupan (greška, timeout ili otvoren circuit breaker)"""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker za spoljni API.
+    
+    Posle failure_threshold uzastopnih grešaka se otvara i odmah odbija
+    pozive; posle reset_seconds propušta jedan probni poziv (half-open)
+    čiji uspeh ga zatvara, a greška ponovo otvara. Probni poziv koji se
+    završi bez ishoda (prekid, neočekivana greška) oslobađa mesto sledećem.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        # Izvor vremena (zamenljiv u testovima)
+        self.clock = clock
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+    
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if self.clock() - self._opened_at >= self.reset_seconds:
+            return self.HALF_OPEN
+        return self.OPEN
+    
+    def allow(self) -> bool:
+        """Da li se poziv sme izvršiti"""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+    
+    def record_success(self) -> None:
+        self.failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+    
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_in_flight = False
+        if self._opened_at is not None or self.failures >= self.failure_threshold:
+            self._opened_at = self.clock()
+    
+    def release(self) -> None:
+        """Završava probni poziv (i kada nije zabeležen ni uspeh ni greška)"""
+        self._probe_in_flight = False
+
+
+class ArticClient:
+    """
+    Deljeni HTTP klijent za Artic API.
+    
+    - jedan dugoživeći httpx.AsyncClient (keep-alive, HTTP/2 ako je h2 instaliran)
+    - TTL/LRU keš odgovora (stranice pretrage i detalji radova)
+    - istovetni istovremeni zahtevi čekaju isti poziv (coalescing)
+    - kratki timeout-i i circuit breaker
+    
+    transport omogućava testiranje bez mreže (npr. httpx.MockTransport);
+    lokalni stub server se zadaje preko ARTIC_API_BASE_URL.
+    """
+    
+    def __init__(
+        self,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        self.transport = transport
+        self.breaker = breaker or CircuitBreaker(
+            settings.ARTIC_BREAKER_FAILURES, settings.ARTIC_BREAKER_RESET_SECONDS
+        )
+        self._cache = MemoryCacheBackend(max_entries=settings.ARTIC_CACHE_MAX_ENTRIES)
+        self._inflight: Dict[str, "asyncio.Task[Any]"] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    async def start(self) -> None:
+        """Kreira HTTP klijent (poziva se iz lifespan-a)"""
+        if self._client is not None:
+            return
+        http2 = settings.ARTIC_HTTP2 and importlib.util.find_spec("h2") is not None
+        if settings.ARTIC_HTTP2 and not http2:
+            logger.info("Paket h2 nije instaliran - Artic klijent koristi HTTP/1.1")
+        self._client = httpx.AsyncClient(
+            base_url=settings.ARTIC_API_BASE_URL,
+            http2=http2,
+            transport=self.transport,
+            timeout=httpx.Timeout(
+                settings.ARTIC_TIMEOUT, connect=settings.ARTIC_CONNECT_TIMEOUT
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.ARTIC_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.ARTIC_MAX_CONNECTIONS,
+                keepalive_expiry=60.0
+            ),
+            headers={"AIC-User-Agent": "galerija-izlozbi"},
+        )
+    
+    async def close(self) -> None:
+        """Zatvara HTTP klijent i njegove konekcije"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def get_json(
+        self, path: str, params: Dict[str, Any], cache: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """
+        GET zahtev ka Artic API-ju sa kešom i spajanjem istovetnih zahteva.
+        
+        Args:
+            path: Putanja u odnosu na ARTIC_API_BASE_URL (npr. /artworks)
+            params: Query parametri
+            cache: Da li se odgovor čita iz keša i upisuje u keš (sinhronizacija ne koristi keš)
+            
+        Returns:
+            JSON odgovor ili None ako resurs ne postoji (404)
+            
+        Raises:
+            ArticUnavailable: Ako API nije dostupan
+        """
+        key = f"{path}?{urlencode(sorted(params.items()))}"
+        if cache:
+            cached = await self._cache.get(key)
+            if cached is not None:
+                return json.loads(cached)
+        else:
+            key = f"nocache:{key}"
+        
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(key, path, params, cache))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        # shield - prekid jednog klijenta ne prekida poziv koji čekaju ostali
+        return await asyncio.shield(task)
+    
+    def _done(self, key: str, task: "asyncio.Task[Any]") -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # greška je preuzeta i kada niko više ne čeka
+    
+    async def _fetch(
+        self, key: str, path: str, params: Dict[str, Any], cache: bool
+    ) -> Optional[Dict[str, Any]]:
+        if not self.breaker.allow():
+            raise ArticUnavailable("Circuit breaker je otvoren")
+        try:
+            if self._client is None:
+                await self.start()
+            response = await self._client.get(path, params=params)
+        except httpx.HTTPError as e:
+            self.breaker.record_failure()
+            raise ArticUnavailable(str(e) or type(e).__name__) from e
+        finally:
+            # Prekinut probni poziv inače trajno blokira sve pozive
+            self.breaker.release()
+        
+        if response.status_code >= 500 or response.status_code == 429:
+            self.breaker.record_failure()
+            raise ArticUnavailable(f"Artic API je vratio {response.status_code}")
+        self.breaker.record_success()
+        
+        if response.status_code == 404:
+            return None
+        if response.is_error:
+            raise ArticUnavailable(f"Artic API je vratio {response.status_code}")
+        
+        if cache:
+            await self._cache.set(key, response.content, settings.ARTIC_CACHE_TTL_SECONDS)
+        return response.json()
+    
+    async def health(self) -> Dict[str, Any]:
+        """Stanje circuit breaker-a (provera spremnosti)"""
+        state = self.breaker.state
+        return {"ok": state != CircuitBreaker.OPEN, "state": state, "failures": self.breaker.failures}
+
+
+# Globalna instanca Artic klijenta
+artic_client = ArticClient()
 
 
 async def fetch_artworks(
@@ -29,32 +242,28 @@ async def fetch_artworks(
     Returns:
         Dict sa podacima o umetničkim radovima
     """
+    params = {
+        "page": page,
+        "limit": limit,
+        "fields": ARTWORK_LIST_FIELDS
+    }
+    
+    if search:
+        path = "/artworks/search"
+        params["q"] = search
+    else:
+        path = "/artworks"
+    
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            params = {
-                "page": page,
-                "limit": limit,
-                "fields": "id,title,artist_display,date_display,image_id,thumbnail,description"
-            }
-            
-            if search:
-                url = f"{settings.ARTIC_API_BASE_URL}/artworks/search"
-                params["q"] = search
-            else:
-                url = f"{settings.ARTIC_API_BASE_URL}/artworks"
-            
-            response = await client.get(url, params=params)
-            response.raise_for_status()
+        data = await artic_client.get_json(path, params)
+        return data or {"data": [], "pagination": {}}
             
-            data = response.json()
-            return data
-            
-    except httpx.HTTPError as e:
+    except ArticUnavailable as e:
         logger.error(f"Greška pri dohvatanju sa Artic API: {str(e)}")
         return {"data": [], "pagination": {}}
 
 
-def get_image_url(image_id: str, size: str = "843,") -> str:
+def get_image_url(image_id: str, size: str = f"{IIIF_SIRINA},") -> str:
     """
     Generiše URL za sliku na osnovu IIIF standarda.
     
@@ -96,23 +305,87 @@ async def get_artwork_by_id(artwork_id: int) -> Optional[Dict[str, Any]]:
         Dict sa podacima o umetničkom radu ili None
     """
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            url = f"{settings.ARTIC_API_BASE_URL}/artworks/{artwork_id}"
-            params = {
-                "fields": "id,title,artist_display,date_display,image_id,thumbnail,description,dimensions,medium_display"
-            }
-            
-            response = await client.get(url, params=params)
-            response.raise_for_status()
+        data = await artic_client.get_json(
+            f"/artworks/{artwork_id}", {"fields": ARTWORK_DETAIL_FIELDS}
+        )
+        return data.get("data") if data else None
             
-            data = response.json()
-            return data.get("data")
-            
-    except httpx.HTTPError as e:
+    except ArticUnavailable as e:
         logger.error(f"Greška pri dohvatanju umetničkog rada {artwork_id}: {str(e)}")
         return None
 
 
+async def fetch_artworks_by_ids(artwork_ids: List[int]) -> Tuple[Dict[int, Dict[str, Any]], Set[int]]:
+    """
+    Dohvata više radova preko ids= parametra, u grupama od ARTIC_PAGE_LIMIT
+    sa najviše ARTIC_IMPORT_CONCURRENCY istovremenih zahteva.
+    
+    Args:
+        artwork_ids: ID-jevi umetničkih radova
+        
+    Returns:
+        (radovi po ID-u, ID-jevi čije dohvatanje nije uspelo)
+    """
+    semaphore = asyncio.Semaphore(settings.ARTIC_IMPORT_CONCURRENCY)
+    
+    async def fetch_chunk(chunk: List[int]) -> Tuple[List[int], List[Dict[str, Any]], bool]:
+        async with semaphore:
+            try:
+                data = await artic_client.get_json("/artworks", {
+                    "ids": ",".join(str(artwork_id) for artwork_id in chunk),
+                    "limit": len(chunk),
+                    "fields": ARTWORK_DETAIL_FIELDS
+                })
+                return chunk, (data or {}).get("data", []), True
+            except ArticUnavailable as e:
+                logger.error(f"Greška pri dohvatanju radova {chunk[0]}..{chunk[-1]}: {str(e)}")
+                return chunk, [], False
+    
+    chunks = [
+        artwork_ids[i:i + ARTIC_PAGE_LIMIT]
+        for i in range(0, len(artwork_ids), ARTIC_PAGE_LIMIT)
+    ]
+    artworks: Dict[int, Dict[str, Any]] = {}
+    failed: Set[int] = set()
+    for chunk, data, ok in await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks)):
+        if not ok:
+            failed.update(chunk)
+        artworks.update((artwork["id"], artwork) for artwork in data if artwork)
+    return artworks, failed
+
+
+async def search_artworks(search: str, limit: int) -> List[Dict[str, Any]]:
+    """
+    Pretraga radova sa punim poljima - stranice se dohvataju istovremeno.
+    
+    Args:
+        search: Termin za pretragu
+        limit: Najveći broj rezultata
+        
+    Returns:
+        Lista radova po relevantnosti
+        
+    Raises:
+        ArticUnavailable: Ako API nije dostupan
+    """
+    semaphore = asyncio.Semaphore(settings.ARTIC_IMPORT_CONCURRENCY)
+    per_page = min(limit, ARTIC_PAGE_LIMIT)
+    
+    async def fetch_page(page: int) -> List[Dict[str, Any]]:
+        async with semaphore:
+            data = await artic_client.get_json("/artworks/search", {
+                "q": search,
+                "page": page,
+                "limit": per_page,
+                "fields": ARTWORK_DETAIL_FIELDS
+            })
+            return (data or {}).get("data", [])
+    
+    pages = (limit + per_page - 1) // per_page
+    results = await asyncio.gather(*(fetch_page(page) for page in range(1, pages + 1)))
+    return [artwork for page in results for artwork in page][:limit]
+
+
 def format_artwork_to_slika(artwork: Dict[str, Any]) -> Dict[str, Any]:
     """
     Formatira podatke o umetničkom radu u format Slika modela.
@@ -124,11 +397,22 @@ def format_artwork_to_slika(artwork: Dict[str, Any]) -> Dict[str, Any]:
         Dict formatiran za Slika model
     """
     image_id = artwork.get("image_id", "")
+    # Artic daje dimenzije originala i LQIP - placeholder je dostupan odmah,
+    # pre obrade; dimenzije se skaliraju na širinu IIIF slike koja se čuva
+    thumbnail = artwork.get("thumbnail") or {}
+    sirina, visina = thumbnail.get("width"), thumbnail.get("height")
+    if sirina and visina:
+        sirina, visina = IIIF_SIRINA, max(1, round(visina * IIIF_SIRINA / sirina))
+    else:
+        sirina = visina = None
     
     return {
         "slika": get_image_url(image_id),
         "thumbnail": get_thumbnail_url(image_id),
-        "naslov": artwork.get("title", "Bez naslova"),
+        "naslov": (artwork.get("title") or "Bez naslova")[:300],
         "opis": artwork.get("description", ""),
-        "fotograf": artwork.get("artist_display", "Nepoznat umetnik"),
+        "fotograf": (artwork.get("artist_display") or "Nepoznat umetnik")[:200],
+        "sirina": sirina,
+        "visina": visina,
+        "lqip": thumbnail.get("lqip"),
     }
@@ -0,0 +1,196 @@
+"""
+Geo servis
+Pretraga lokacija u radijusu: PostGIS (GiST indeks) ili in-process grid indeks
+"""
+import asyncio
+import math
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event, func, literal_column, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+from app.models.lokacija import Lokacija
+
+# Srednji poluprečnik Zemlje
+RADIJUS_ZEMLJE_KM = 6371.0088
+# Veličina ćelije grid indeksa u stepenima (~22 km po geografskoj širini)
+VELICINA_CELIJE = 0.2
+_KM_PO_STEPENU = math.pi * RADIJUS_ZEMLJE_KM / 180
+# Ključ u Session.info: sesija je upisala lokaciju (indeks zastareva tek posle commit-a)
+_IZMENJENE_LOKACIJE = "lokacije_index_dirty"
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """
+    Udaljenost dve tačke na Zemlji po velikom krugu.
+
+    Returns:
+        Udaljenost u kilometrima
+    """
+    fi1, fi2 = math.radians(lat1), math.radians(lat2)
+    d_fi = fi2 - fi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_fi / 2) ** 2 + math.cos(fi1) * math.cos(fi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * RADIJUS_ZEMLJE_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def lokacija_geography():
+    """
+    PostGIS geography tačka lokacije.
+
+    SRID je literal (ne parametar), pa se izraz poklapa sa GiST indeksom
+    ix_lokacije_geografija iz migracije 009.
+    """
+    return func.geography(
+        func.ST_SetSRID(
+            func.ST_MakePoint(Lokacija.g_duzina, Lokacija.g_sirina),
+            literal_column("4326")
+        )
+    )
+
+
+class GeoGridIndex:
+    """
+    Grid indeks lokacija u memoriji procesa (ćelije VELICINA_CELIJE stepeni).
+
+    Upit pregleda samo ćelije u pravougaoniku oko radijusa i filtrira
+    haversine udaljenošću. Upis lokacije označava indeks zastarelim;
+    max_age ograničava zastarelost kada lokacije menja drugi proces.
+    """
+
+    def __init__(self, max_age: float = 60.0):
+        self.max_age = max_age
+        self._cells: Dict[Tuple[int, int], List[Tuple[int, float, float]]] = {}
+        self._built_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def mark_dirty(self) -> None:
+        """Označava indeks zastarelim"""
+        self._built_at = None
+
+    def _is_stale(self) -> bool:
+        return self._built_at is None or time.monotonic() - self._built_at > self.max_age
+
+    @staticmethod
+    def _cell(lat: float, lng: float) -> Tuple[int, int]:
+        return (
+            math.floor((lat + 90) / VELICINA_CELIJE),
+            math.floor(((lng + 180) % 360) / VELICINA_CELIJE)
+        )
+
+    async def ensure(self, db: AsyncSession) -> None:
+        """Gradi indeks iz baze ako je zastareo"""
+        if not self._is_stale():
+            return
+        async with self._lock:
+            if not self._is_stale():
+                return
+            self._built_at = time.monotonic()
+            rows = (await db.execute(
+                select(Lokacija.id_lokacija, Lokacija.g_sirina, Lokacija.g_duzina).where(
+                    Lokacija.g_sirina.is_not(None), Lokacija.g_duzina.is_not(None)
+                )
+            )).all()
+            cells: Dict[Tuple[int, int], List[Tuple[int, float, float]]] = defaultdict(list)
+            for id_lokacija, lat, lng in rows:
+                cells[self._cell(lat, lng)].append((id_lokacija, lat, lng))
+            self._cells = dict(cells)
+
+    def within(self, lat: float, lng: float, radius_km: float) -> Dict[int, float]:
+        """
+        Lokacije u radijusu oko tačke.
+
+        Returns:
+            Dict id_lokacija -> udaljenost u km
+        """
+        d_lat = radius_km / _KM_PO_STEPENU
+        cos_lat = math.cos(math.radians(min(89.9, abs(lat) + d_lat)))
+        d_lng = min(180.0, d_lat / max(cos_lat, 1e-6))
+
+        broj_kolona = math.ceil(360 / VELICINA_CELIJE)
+        i_min, j_min = self._cell(max(-90.0, lat - d_lat), lng - d_lng)
+        i_max, _ = self._cell(min(90.0, lat + d_lat), lng)
+        sirina = min(broj_kolona, math.ceil(2 * d_lng / VELICINA_CELIJE) + 1)
+
+        result: Dict[int, float] = {}
+        for i in range(i_min, i_max + 1):
+            for dj in range(sirina + 1):
+                for id_lokacija, l_lat, l_lng in self._cells.get((i, (j_min + dj) % broj_kolona), ()):
+                    udaljenost = haversine_km(lat, lng, l_lat, l_lng)
+                    if udaljenost <= radius_km:
+                        result[id_lokacija] = udaljenost
+        return result
+
+
+# Globalni rezervni indeks
+lokacije_index = GeoGridIndex()
+
+# Da li baza ima PostGIS (proverava se jednom po procesu)
+_postgis: Optional[bool] = None
+
+
+@event.listens_for(Lokacija, "after_insert")
+@event.listens_for(Lokacija, "after_update")
+@event.listens_for(Lokacija, "after_delete")
+def _zapamti_izmenu(mapper, connection, target) -> None:
+    # Flush još nije commit - indeks izgrađen pre commit-a (ili posle
+    # rollback-a) bi video stanje koje druge sesije ne vide
+    sesija = object_session(target)
+    if sesija is not None:
+        sesija.info[_IZMENJENE_LOKACIJE] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _zastareo_indeks(session) -> None:
+    if session.info.pop(_IZMENJENE_LOKACIJE, False):
+        lokacije_index.mark_dirty()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _odbaci_izmene(session, previous_transaction) -> None:
+    if previous_transaction.parent is None:
+        session.info.pop(_IZMENJENE_LOKACIJE, None)
+
+
+async def has_postgis(db: AsyncSession) -> bool:
+    """Proverava (jednom) da li je PostGIS instaliran u bazi"""
+    global _postgis
+    if _postgis is None:
+        _postgis = db.bind.dialect.name == "postgresql" and bool(await db.scalar(
+            text("SELECT 1 FROM pg_extension WHERE extname = 'postgis'")
+        ))
+    return _postgis
+
+
+async def nearby_lokacije(
+    db: AsyncSession, lat: float, lng: float, radius_km: float
+) -> List[Tuple[int, float]]:
+    """
+    Lokacije u radijusu oko tačke, sa udaljenošću.
+
+    Na PostgreSQL-u sa PostGIS-om koristi ST_DWithin nad GiST indeksom,
+    inače in-process grid indeks.
+
+    Args:
+        db: Sesija baze
+        lat: Geografska širina
+        lng: Geografska dužina
+        radius_km: Radijus u kilometrima
+
+    Returns:
+        Lista (id_lokacija, udaljenost u km), najbliže prve
+    """
+    if await has_postgis(db):
+        tacka = func.geography(func.ST_SetSRID(func.ST_MakePoint(lng, lat), literal_column("4326")))
+        geografija = lokacija_geography()
+        udaljenost = func.ST_Distance(geografija, tacka) / 1000.0
+        rows = (await db.execute(
+            select(Lokacija.id_lokacija, udaljenost)
+            .where(func.ST_DWithin(geografija, tacka, radius_km * 1000.0))
+            .order_by(udaljenost)
+        )).all()
+        return [(id_lokacija, float(km)) for id_lokacija, km in rows]
+
+    await lokacije_index.ensure(db)
+    return sorted(lokacije_index.within(lat, lng, radius_km).items(), key=lambda par: par[1])
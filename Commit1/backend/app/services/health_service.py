@@ -0,0 +1,108 @@
+"""
+Health servis
+Provere spremnosti (readiness) sa keširanim rezultatom
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from sqlalchemy import text
+from app.config import settings
+from app.database import async_engine
+
+# Provera vraća detalje; "ok" označava da zavisnost radi
+Check = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+async def check_pool() -> Dict[str, Any]:
+    """Zauzetost connection pool-a - zasićen pool znači da novi zahtevi čekaju"""
+    pool = async_engine.pool
+    capacity = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    checked_out = pool.checkedout()
+    saturation = checked_out / capacity if capacity else 1.0
+    return {
+        "ok": saturation < settings.HEALTH_POOL_SATURATION,
+        "checked_out": checked_out,
+        "capacity": capacity,
+        "saturation": round(saturation, 3),
+    }
+
+
+async def check_database() -> Dict[str, Any]:
+    """SELECT 1 sa kratkim timeout-om (ne čeka ceo DB_POOL_TIMEOUT)"""
+    start = time.perf_counter()
+
+    async def ping() -> None:
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.wait_for(ping(), timeout=settings.HEALTH_CHECK_TIMEOUT)
+    return {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 2)}
+
+
+class HealthChecker:
+    """
+    Skup provera spremnosti.
+
+    Rezultat se kešira cache_seconds sekundi, a istovremeni zahtevi čekaju
+    istu proveru - česti probe-ovi load balancer-a ne opterećuju bazu.
+    """
+
+    def __init__(self, cache_seconds: float = 2.0):
+        self.cache_seconds = cache_seconds
+        self._checks: Dict[str, Tuple[Check, bool]] = {}
+        self._result: Optional[Dict[str, Any]] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def register(self, name: str, check: Check, critical: bool = True) -> None:
+        """
+        Dodaje proveru.
+
+        Args:
+            name: Ime provere u odgovoru
+            check: Async funkcija koja vraća dict sa "ok"
+            critical: Da li neuspeh čini proces nespremnim (spoljni API
+                koji ima rezervno ponašanje se samo prijavljuje)
+        """
+        self._checks[name] = (check, critical)
+
+    async def _run(self, check: Check) -> Dict[str, Any]:
+        try:
+            return await check()
+        except asyncio.TimeoutError:
+            return {"ok": False, "error": "timeout"}
+        except Exception as e:
+            return {"ok": False, "error": str(e) or type(e).__name__}
+
+    async def ready(self) -> Dict[str, Any]:
+        """
+        Pokreće provere (ili vraća keširan rezultat).
+
+        Returns:
+            Dict sa "ready" i rezultatom svake provere
+        """
+        if self._result is not None and time.monotonic() - self._checked_at < self.cache_seconds:
+            return self._result
+
+        async with self._lock:
+            if self._result is not None and time.monotonic() - self._checked_at < self.cache_seconds:
+                return self._result
+
+            checks, ready = {}, True
+            for name, (check, critical) in self._checks.items():
+                checks[name] = await self._run(check)
+                if critical and not checks[name]["ok"]:
+                    ready = False
+                # Zasićen pool - SELECT 1 bi samo čekao u redu
+                if name == "pool" and not checks[name]["ok"]:
+                    break
+
+            self._result = {"ready": ready, "checks": checks}
+            self._checked_at = time.monotonic()
+            return self._result
+
+
+# Globalna instanca provera spremnosti
+health_checker = HealthChecker(settings.HEALTH_CACHE_SECONDS)
+health_checker.register("pool", check_pool)
+health_checker.register("database", check_database)
@@ -0,0 +1,465 @@
+"""
+Image proxy servis
+Umanjene verzije slika (WebP/AVIF/JPEG) sa content-addressed keširanjem na disku
+"""
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+import httpx
+from fastapi import Request, Response
+from PIL import Image, ImageOps, features
+from app.config import settings
+from app.utils.etag import etag_matches, not_modified
+from app.utils import blurhash
+
+logger = logging.getLogger(__name__)
+
+# Dozvoljene širine - proizvoljna širina se zaokružuje naviše, pa je broj
+# verzija po slici ograničen (i keš se ne može puniti nasumičnim širinama)
+SIRINE = (160, 320, 640, 960, 1280, 1920)
+
+# Broj URL -> hash referenci u memoriji (ostale su u kešu na disku)
+REFS_U_MEMORIJI = 4096
+
+MEDIA_TYPES = {"avif": "image/avif", "webp": "image/webp", "jpeg": "image/jpeg"}
+# AVIF enkoder postoji samo u novijim Pillow build-ovima (libavif)
+FORMATI = tuple(
+    fmt for fmt in ("avif", "webp", "jpeg")
+    if fmt == "jpeg" or features.check(fmt)
+)
+
+
+class ImageUnavailable(Exception):
+    """Originalna slika nije dostupna ili nije ispravna slika"""
+
+
+def pick_width(width: int) -> int:
+    """Najmanja dozvoljena širina >= tražene (najveća ako je tražena veća od svih)"""
+    return next((sirina for sirina in SIRINE if sirina >= width), SIRINE[-1])
+
+
+def negotiate_format(format: Optional[str], accept: Optional[str]) -> str:
+    """
+    Format odgovora: eksplicitno zadat ili najbolji koji klijent prihvata.
+
+    Args:
+        format: Format iz query parametra (avif, webp, jpeg) ili None
+        accept: Accept header zahteva
+
+    Returns:
+        Format koji server ume da napravi
+    """
+    if format in FORMATI:
+        return format
+    accept = accept or ""
+    for fmt in FORMATI:
+        if MEDIA_TYPES[fmt] in accept:
+            return fmt
+    return "jpeg"
+
+
+def render_derivative(original: bytes, width: int, format: str, quality: int) -> bytes:
+    """
+    Umanjuje sliku na zadatu širinu (bez uvećavanja) i enkoduje je.
+
+    Izvršava se u pool-u - funkcija je na nivou modula da bi radila i u
+    process pool-u.
+    """
+    with Image.open(io.BytesIO(original)) as img:
+        # JPEG se dekodira direktno u manjoj rezoluciji (DCT scaling); obe
+        # dimenzije >= width jer EXIF rotacija može zameniti širinu i visinu
+        img.draft("RGB", (width, width))
+        img = ImageOps.exif_transpose(img)
+        if img.width > width:
+            img = img.resize(
+                (width, max(1, round(img.height * width / img.width))),
+                Image.Resampling.LANCZOS
+            )
+
+        alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        if format == "jpeg" and alpha:
+            rgba = img.convert("RGBA")
+            img = Image.new("RGB", rgba.size, (255, 255, 255))
+            img.paste(rgba, mask=rgba.getchannel("A"))
+        elif img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if alpha else "RGB")
+
+        out = io.BytesIO()
+        if format == "jpeg":
+            img.save(out, "JPEG", quality=quality, optimize=True, progressive=True)
+        elif format == "webp":
+            img.save(out, "WEBP", quality=quality, method=4)
+        else:
+            img.save(out, "AVIF", quality=quality, speed=6)
+        return out.getvalue()
+
+
+def analyze_image(original: bytes) -> Dict[str, Any]:
+    """
+    Metapodaci za placeholder: dimenzije, dominantna boja i BlurHash.
+
+    Dekodira se umanjena slika (JPEG draft), pa je analiza jeftina i za
+    velike originale. Izvršava se u pool-u kao render_derivative.
+
+    Returns:
+        Dict sa sirina, visina, dominantna_boja (#rrggbb) i blurhash
+    """
+    with Image.open(io.BytesIO(original)) as img:
+        sirina, visina = img.size
+        # EXIF orijentacija 5-8 - slika se prikazuje rotirana za 90°
+        if img.getexif().get(0x0112) in (5, 6, 7, 8):
+            sirina, visina = visina, sirina
+        img.draft("RGB", (64, 64))
+        mala = ImageOps.exif_transpose(img).convert("RGB")
+        mala.thumbnail((64, 64), Image.Resampling.BILINEAR)
+
+    # Najzastupljenija boja posle svođenja na 5 boja (median cut)
+    paleta = mala.quantize(colors=5, method=Image.Quantize.MEDIANCUT)
+    _, indeks = max(paleta.getcolors())
+    r, g, b = paleta.getpalette()[indeks * 3:indeks * 3 + 3]
+
+    mala.thumbnail((32, 32), Image.Resampling.BILINEAR)
+    data = mala.tobytes()
+    pikseli = list(zip(data[0::3], data[1::3], data[2::3]))
+    x, y = (4, 3) if mala.width >= mala.height else (3, 4)
+    return {
+        "sirina": sirina,
+        "visina": visina,
+        "dominantna_boja": f"#{r:02x}{g:02x}{b:02x}",
+        "blurhash": blurhash.encode(pikseli, mala.width, mala.height, x, y),
+    }
+
+
+class DiskCache:
+    """
+    Content-addressed keš na disku sa LRU izbacivanjem po ukupnoj veličini.
+
+    Fajl se upisuje atomski (privremeni fajl + os.replace); pogodak osvežava
+    mtime fajla, pa se LRU redosled obnavlja i posle restarta.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._size = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key[2:])
+
+    def _load(self) -> None:
+        """Učitava postojeće fajlove (najstariji prvi) pri prvom pristupu"""
+        if self._loaded:
+            return
+        files = []
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if name.startswith("."):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                key = os.path.basename(directory) + name
+                files.append((stat.st_mtime, key, stat.st_size))
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._size += size
+        self._loaded = True
+
+    @property
+    def size(self) -> int:
+        """Ukupna veličina keša u bajtovima"""
+        return self._size
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            self._load()
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._size -= self._entries.pop(key, 0)
+            return None
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+        with self._lock:
+            self._load()
+            self._size += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                stari, size = self._entries.popitem(last=False)
+                self._size -= size
+                try:
+                    os.unlink(self._path(stari))
+                except FileNotFoundError:
+                    pass
+
+
+class ProxiedImage:
+    """Umanjena slika spremna za odgovor"""
+
+    __slots__ = ("data", "media_type", "etag")
+
+    def __init__(self, data: bytes, media_type: str, etag: str):
+        self.data = data
+        self.media_type = media_type
+        self.etag = etag
+
+
+class ImageProxy:
+    """
+    Dohvata originalnu sliku jednom i pravi umanjene verzije.
+
+    - original se čuva po SHA-256 sadržaja, a URL -> hash kao mali unos u
+      istom kešu (atomski upis, LRU izbacivanje kao i ostali fajlovi)
+    - verzija se čuva po hash-u (original, širina, format, kvalitet), pa
+      ista slika sa dva URL-a deli verzije, a ETag je stabilan
+    - Pillow radi u thread ili process pool-u, istovetni istovremeni zahtevi
+      čekaju isti posao
+
+    Proxy dohvata samo URL-ove sačuvane u bazi (slike i izložbe), ne URL iz
+    zahteva - nije otvoren proxy ka proizvoljnim adresama.
+    """
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.transport = transport
+        self.cache = DiskCache(
+            os.path.join(settings.IMAGE_CACHE_DIR, "objects"),
+            settings.IMAGE_CACHE_MAX_MB * 1024 * 1024
+        )
+        self._refs: "OrderedDict[str, str]" = OrderedDict()
+        self._inflight: Dict[Tuple[Any, ...], "asyncio.Task[Any]"] = {}
+        self._executor: Optional[Executor] = None
+        self._semaphore = asyncio.Semaphore(settings.IMAGE_WORKERS)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_executor(self) -> Executor:
+        """Lenjo kreira pool (process pool se ne pravi pri importu)"""
+        if self._executor is None:
+            pool_class = ProcessPoolExecutor if settings.IMAGE_WORKER_PROCESSES else ThreadPoolExecutor
+            self._executor = pool_class(max_workers=settings.IMAGE_WORKERS)
+        return self._executor
+
+    async def start(self) -> None:
+        """Kreira HTTP klijent za originalne slike (poziva se iz lifespan-a)"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                transport=self.transport,
+                follow_redirects=True,
+                timeout=httpx.Timeout(
+                    settings.IMAGE_FETCH_TIMEOUT, connect=settings.ARTIC_CONNECT_TIMEOUT
+                ),
+                headers={"AIC-User-Agent": "galerija-izlozbi"},
+            )
+
+    async def close(self) -> None:
+        """Zatvara HTTP klijent i pool"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    @staticmethod
+    def _ref_key(url: str) -> str:
+        # Prefiks odvaja ključ reference od hash-eva sadržaja
+        return hashlib.sha256(f"ref|{url}".encode("utf-8")).hexdigest()
+
+    def _read_ref(self, url: str) -> Optional[str]:
+        data = self.cache.get(self._ref_key(url))
+        return data.decode("ascii") if data else None
+
+    def _write_ref(self, url: str, digest: str) -> None:
+        self.cache.put(self._ref_key(url), digest.encode("ascii"))
+
+    def _remember(self, url: str, digest: str) -> None:
+        """URL -> hash u memoriji, najviše REFS_U_MEMORIJI (LRU)"""
+        self._refs[url] = digest
+        self._refs.move_to_end(url)
+        if len(self._refs) > REFS_U_MEMORIJI:
+            self._refs.popitem(last=False)
+
+    async def _digest(self, url: str) -> Optional[str]:
+        """Hash sadržaja poznatog URL-a (memorija, pa keš na disku)"""
+        digest = self._refs.get(url)
+        if digest is not None:
+            self._refs.move_to_end(url)
+        else:
+            digest = await asyncio.to_thread(self._read_ref, url)
+            if digest:
+                self._remember(url, digest)
+        return digest
+
+    async def _coalesce(self, key: Tuple[Any, ...], factory) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        # shield - prekid jednog klijenta ne prekida posao koji čekaju ostali
+        return await asyncio.shield(task)
+
+    def _done(self, key: Tuple[Any, ...], task: "asyncio.Task[Any]") -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()
+
+    async def run(self, func, *args) -> Any:
+        """Izvršava Pillow posao u pool-u (najviše IMAGE_WORKERS istovremeno)"""
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+
+    async def original(self, url: str) -> Tuple[str, bytes]:
+        """
+        Originalna slika iz keša ili sa izvora (jedno dohvatanje po URL-u).
+
+        Returns:
+            (SHA-256 sadržaja, sadržaj)
+
+        Raises:
+            ImageUnavailable: Ako izvor nije dostupan
+        """
+        digest = await self._digest(url)
+        if digest:
+            data = await asyncio.to_thread(self.cache.get, digest)
+            if data is not None:
+                return digest, data
+        return await self._coalesce(("original", url), lambda: self._fetch(url))
+
+    async def _fetch(self, url: str) -> Tuple[str, bytes]:
+        if not url.startswith(("http://", "https://")):
+            raise ImageUnavailable("Podržani su samo http(s) URL-ovi")
+        if self._client is None:
+            await self.start()
+
+        limit = settings.IMAGE_MAX_ORIGIN_MB * 1024 * 1024
+        start = time.perf_counter()
+        try:
+            async with self._client.stream("GET", url) as response:
+                if response.status_code != 200:
+                    raise ImageUnavailable(f"Izvor je vratio {response.status_code}")
+                chunks, size = [], 0
+                async for chunk in response.aiter_bytes():
+                    size += len(chunk)
+                    if size > limit:
+                        raise ImageUnavailable("Originalna slika je prevelika")
+                    chunks.append(chunk)
+        except httpx.HTTPError as e:
+            raise ImageUnavailable(str(e) or type(e).__name__) from e
+
+        data = b"".join(chunks)
+        digest = hashlib.sha256(data).hexdigest()
+        await asyncio.to_thread(self.cache.put, digest, data)
+        await asyncio.to_thread(self._write_ref, url, digest)
+        self._remember(url, digest)
+        logger.info(f"Originalna slika preuzeta ({size} B, {time.perf_counter() - start:.2f}s): {url}")
+        return digest, data
+
+    async def get(self, url: str, width: int, format: str) -> ProxiedImage:
+        """
+        Umanjena verzija slike sa URL-a.
+
+        Args:
+            url: URL originalne slike (iz baze)
+            width: Širina (zaokružuje se na dozvoljenu)
+            format: avif, webp ili jpeg
+
+        Returns:
+            ProxiedImage sa sadržajem, media type-om i ETag-om
+
+        Raises:
+            ImageUnavailable: Ako izvor nije dostupan ili sadržaj nije slika
+        """
+        width = pick_width(width)
+        quality = settings.IMAGE_QUALITY
+
+        def derivative_key(digest: str) -> str:
+            return hashlib.sha256(f"{digest}|{width}|{format}|{quality}".encode("ascii")).hexdigest()
+
+        digest = await self._digest(url)
+        if digest:
+            key = derivative_key(digest)
+            data = await asyncio.to_thread(self.cache.get, key)
+            if data is not None:
+                return ProxiedImage(data, MEDIA_TYPES[format], f'"{key[:32]}"')
+
+        async def render() -> ProxiedImage:
+            digest, original = await self.original(url)
+            key = derivative_key(digest)
+            data = await asyncio.to_thread(self.cache.get, key)
+            if data is None:
+                try:
+                    data = await self.run(render_derivative, original, width, format, quality)
+                except (OSError, ValueError, Image.DecompressionBombError) as e:
+                    raise ImageUnavailable(f"Neispravna slika: {e}") from e
+                await asyncio.to_thread(self.cache.put, key, data)
+            return ProxiedImage(data, MEDIA_TYPES[format], f'"{key[:32]}"')
+
+        return await self._coalesce((url, width, format), render)
+
+
+def image_response(
+    request: Request, image: ProxiedImage, negotiated: bool, versioned: bool
+) -> Response:
+    """
+    Odgovor sa ETag-om za uslovni GET.
+
+    Adresa bez verzije (?v=) uvek pokazuje na trenutnu sliku, pa se
+    proverava pri svakom korišćenju (no-cache, 304 ako se nije menjala);
+    adresa sa važećom verzijom se ne menja i kešira se dugo (public, CDN).
+
+    Args:
+        request: Zahtev (If-None-Match)
+        image: Umanjena slika
+        negotiated: Da li je format izabran po Accept headeru (Vary: Accept)
+        versioned: Da li zahtev nosi trenutnu verziju slike (?v=)
+    """
+    if versioned:
+        cache_control = f"public, max-age={settings.IMAGE_CACHE_MAX_AGE}, immutable"
+    else:
+        cache_control = "public, no-cache"
+    headers = {"Cache-Control": cache_control, "ETag": image.etag}
+    if negotiated:
+        headers["Vary"] = "Accept"
+    if etag_matches(request, image.etag):
+        response = not_modified(image.etag)
+        response.headers.update(headers)
+        return response
+    return Response(content=image.data, media_type=image.media_type, headers=headers)
+
+
+# Globalna instanca image proxy-ja
+image_proxy = ImageProxy()
@@ -0,0 +1,123 @@
+"""
+Import servis
+Grupni uvoz umetničkih radova sa Artic API-ja u slike
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import select, insert, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.slika import Slika
+from app.models.izlozba import Izlozba
+from app.services import artic_service
+from app.utils.search import search_document
+
+# Statusi uvoza jednog rada
+UVEZENA = "uvezena"
+DUPLIKAT = "duplikat"
+BEZ_SLIKE = "bez_slike"
+NIJE_PRONADJENA = "nije_pronadjena"
+GRESKA = "greska"
+
+
+async def import_artworks(
+    db: AsyncSession,
+    artwork_ids: Optional[List[int]] = None,
+    search: Optional[str] = None,
+    limit: int = 100,
+    id_izlozba: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Uvozi radove kao slike: dohvatanje u grupama (ids=), provera duplikata
+    po URL-u slike jednim upitom i jedan grupni INSERT.
+
+    Args:
+        db: Sesija baze
+        artwork_ids: ID-jevi radova (ili search)
+        search: Termin za pretragu na Artic API-ju
+        limit: Najveći broj radova iz pretrage
+        id_izlozba: Izložba kojoj se slike dodaju (opciono)
+
+    Returns:
+        Lista {artwork_id, status, id_slika} u redosledu ulaza
+
+    Raises:
+        ArticUnavailable: Ako pretraga na Artic API-ju nije uspela
+    """
+    if search:
+        found = await artic_service.search_artworks(search, limit)
+        artworks = {artwork["id"]: artwork for artwork in found}
+        artwork_ids, failed = list(artworks), set()
+    else:
+        artwork_ids = list(dict.fromkeys(artwork_ids or []))
+        artworks, failed = await artic_service.fetch_artworks_by_ids(artwork_ids)
+
+    rezultati: Dict[int, Dict[str, Any]] = {}
+    kandidati: Dict[int, Dict[str, Any]] = {}
+    for artwork_id in artwork_ids:
+        artwork = artworks.get(artwork_id)
+        if artwork_id in failed:
+            status = GRESKA
+        elif artwork is None:
+            status = NIJE_PRONADJENA
+        elif not artwork.get("image_id"):
+            status = BEZ_SLIKE
+        else:
+            kandidati[artwork_id] = artic_service.format_artwork_to_slika(artwork)
+            continue
+        rezultati[artwork_id] = {"artwork_id": artwork_id, "status": status, "id_slika": None}
+
+    # Duplikati - slike sa istim URL-om (u bazi ili ranije u istom uvozu)
+    postojece: Dict[str, int] = {}
+    if kandidati:
+        rows = await db.execute(
+            select(Slika.slika, Slika.id_slika).where(
+                Slika.slika.in_({data["slika"] for data in kandidati.values()})
+            )
+        )
+        postojece = {url: id_slika for url, id_slika in rows.all()}
+
+    redosled = 0
+    if id_izlozba is not None:
+        redosled = await db.scalar(
+            select(func.coalesce(func.max(Slika.redosled) + 1, 0))
+            .where(Slika.id_izlozba == id_izlozba)
+        )
+
+    novi: List[int] = []
+    values: List[Dict[str, Any]] = []
+    u_uvozu = set()
+    for artwork_id, data in kandidati.items():
+        if data["slika"] in postojece or data["slika"] in u_uvozu:
+            rezultati[artwork_id] = {
+                "artwork_id": artwork_id, "status": DUPLIKAT, "id_slika": postojece.get(data["slika"])
+            }
+            continue
+        # Grupni INSERT zaobilazi mapper evente - dokument za pretragu se računa ovde
+        values.append({
+            **data,
+            "id_izlozba": id_izlozba,
+            "redosled": redosled + len(values),
+            "pretraga": search_document(data["naslov"], data["fotograf"], data["opis"]),
+        })
+        novi.append(artwork_id)
+        u_uvozu.add(data["slika"])
+
+    if values:
+        ids = (await db.scalars(
+            insert(Slika).returning(Slika.id_slika, sort_by_parameter_order=True),
+            values
+        )).all()
+        for artwork_id, id_slika in zip(novi, ids):
+            rezultati[artwork_id] = {"artwork_id": artwork_id, "status": UVEZENA, "id_slika": id_slika}
+
+        if id_izlozba is not None:
+            # Galerija izložbe je deo odgovora - nova verzija (ETag)
+            await db.execute(
+                update(Izlozba)
+                .where(Izlozba.id_izlozba == id_izlozba)
+                .values(datum_izmene=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+        await db.commit()
+
+    return [rezultati[artwork_id] for artwork_id in artwork_ids]
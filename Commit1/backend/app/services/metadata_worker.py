@@ -0,0 +1,208 @@
+"""
+Metadata worker
+Pozadinska obrada slika: dimenzije, dominantna boja i BlurHash placeholder
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Set, Tuple
+from sqlalchemy import select, update, func, and_, or_
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.slika import Slika, META_NA_CEKANJU, META_U_OBRADI, META_SPREMNI, META_GRESKA
+from app.models.izlozba import Izlozba
+from app.services.image_proxy import image_proxy, analyze_image
+from app.utils.cache import response_cache
+
+# Konfigurisanje logging-a
+logger = logging.getLogger(__name__)
+
+
+class MetadataWorker:
+    """
+    Lokalni (in-process) red poslova za metapodatke slika.
+
+    Red je sama tabela slika: jedan pozadinski task po procesu preuzima
+    slike na čekanju u grupama, uslovnim UPDATE-om (na_cekanju -> u_obradi),
+    pa svaku sliku obrađuje samo jedan uvicorn worker. Original se dohvata
+    preko image proxy-ja (isti keš na disku kao umanjene verzije), analiza
+    radi u njegovom Pillow pool-u, a rezultat se upisuje u zasebnoj sesiji.
+    Izložbe i keš odgovora se osvežavaju jednom, kada se red isprazni.
+    """
+
+    def __init__(self, concurrency: int = 4, batch_size: int = 20):
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+        # Slika je zakazana dok task već prazni red - proverava se ponovo
+        self._wake = False
+        # Ograničava broj istovremenih preuzimanja originala
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    def submit(self, slika_id: int) -> None:
+        """
+        Zakazuje obradu slike.
+        Poziva se tek posle commit-a slike.
+
+        Args:
+            slika_id: ID slike
+        """
+        self._start()
+
+    def submit_many(self, slika_ids: Iterable[int]) -> None:
+        """Zakazuje obradu više slika"""
+        self._start()
+
+    def _start(self) -> None:
+        """Pokreće pražnjenje reda (ili budi task koji ga već prazni)"""
+        if not settings.IMAGE_METADATA_ENABLED:
+            return
+        self._wake = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._drain())
+
+    @staticmethod
+    def _claimable():
+        """Slike na čekanju i napuštene slike u obradi (proces je pao)"""
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.IMAGE_METADATA_CLAIM_TIMEOUT_SECONDS)
+        return or_(
+            Slika.status_metapodataka == META_NA_CEKANJU,
+            and_(
+                Slika.status_metapodataka == META_U_OBRADI,
+                Slika.datum_obrade_metapodataka < cutoff
+            )
+        )
+
+    async def _claim(self) -> List[Tuple[int, str]]:
+        """
+        Preuzima sledeću grupu slika jednim uslovnim UPDATE-om.
+
+        Returns:
+            Lista (id_slika, url) slika koje je preuzeo ovaj proces
+        """
+        async with AsyncSessionLocal() as db:
+            grupa = (
+                select(Slika.id_slika)
+                .where(self._claimable())
+                .order_by(Slika.id_slika)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            rows = (await db.execute(
+                update(Slika)
+                .where(Slika.id_slika.in_(grupa), self._claimable())
+                .values(status_metapodataka=META_U_OBRADI, datum_obrade_metapodataka=datetime.utcnow())
+                .returning(Slika.id_slika, Slika.slika)
+                .execution_options(synchronize_session=False)
+            )).all()
+            await db.commit()
+        return [tuple(row) for row in rows]
+
+    async def _drain(self) -> None:
+        """Obrađuje slike dok ih ima na čekanju"""
+        izlozbe: Set[int] = set()
+        obradjeno = 0
+        try:
+            while True:
+                self._wake = False
+                slike = await self._claim()
+                if slike:
+                    rezultati = await asyncio.gather(
+                        *(self._process(slika_id, url) for slika_id, url in slike)
+                    )
+                    for upisano, id_izlozba in rezultati:
+                        obradjeno += upisano
+                        if id_izlozba is not None:
+                            izlozbe.add(id_izlozba)
+                    continue
+
+                if obradjeno:
+                    await self._publish(izlozbe)
+                    izlozbe, obradjeno = set(), 0
+                # Nova slika je commit-ovana posle poslednjeg preuzimanja
+                if not self._wake:
+                    return
+        except Exception:
+            # Preuzete slike se ponovo obrađuju posle IMAGE_METADATA_CLAIM_TIMEOUT_SECONDS
+            logger.exception("Greška u obradi metapodataka slika")
+
+    async def _process(self, slika_id: int, url: str) -> Tuple[bool, Optional[int]]:
+        """
+        Dohvata original, računa metapodatke i upisuje ih.
+
+        Returns:
+            (da li je rezultat upisan, ID izložbe kojoj slika pripada)
+        """
+        # Mrežni poziv i Pillow van sesije - konekcija se ne drži dok traje obrada
+        async with self._semaphore:
+            try:
+                _, original = await image_proxy.original(url)
+                values = await image_proxy.run(analyze_image, original)
+                values["status_metapodataka"] = META_SPREMNI
+            except Exception as e:
+                logger.warning(f"Metapodaci slike {slika_id} nisu izračunati: {str(e)}")
+                values = {"status_metapodataka": META_GRESKA}
+
+        async with AsyncSessionLocal() as db:
+            # URL je mogao biti promenjen u međuvremenu - slika je ponovo na čekanju
+            result = await db.execute(
+                update(Slika)
+                .where(
+                    Slika.id_slika == slika_id,
+                    Slika.slika == url,
+                    Slika.status_metapodataka == META_U_OBRADI
+                )
+                .values(**values)
+                .returning(Slika.id_izlozba)
+                .execution_options(synchronize_session=False)
+            )
+            row = result.first()
+            await db.commit()
+        return (row is not None, row[0] if row is not None else None)
+
+    @staticmethod
+    async def _publish(izlozbe: Set[int]) -> None:
+        """Nova verzija (ETag) izložbi čije su slike obrađene i čišćenje keša"""
+        if izlozbe:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(Izlozba)
+                    .where(Izlozba.id_izlozba.in_(izlozbe))
+                    .values(datum_izmene=datetime.utcnow())
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+        await response_cache.invalidate("slike", "izlozbe")
+
+    async def resume_pending(self) -> int:
+        """
+        Pokreće obradu slika bez metapodataka (nove, posle restarta ili
+        migracije). Svaki worker pokreće jedan task; slike deli preuzimanje.
+
+        Returns:
+            Broj slika na čekanju
+        """
+        if not settings.IMAGE_METADATA_ENABLED:
+            return 0
+        async with AsyncSessionLocal() as db:
+            pending = await db.scalar(
+                select(func.count()).select_from(Slika).where(self._claimable())
+            )
+
+        if pending:
+            self._start()
+        return pending
+
+    async def shutdown(self) -> None:
+        """Prekida obradu - preuzete slike se ponovo obrađuju posle isteka preuzimanja"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        # Semafor se vezuje za event loop - novi za sledeće pokretanje
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+
+# Globalna instanca metadata worker-a
+metadata_worker = MetadataWorker(concurrency=settings.IMAGE_METADATA_CONCURRENCY)
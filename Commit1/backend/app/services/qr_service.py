@@ -5,9 +5,69 @@ Generisanje QR kodova za prijave na izložbe
 import qrcode
 import json
 import base64
+import hashlib
+import hmac
+import struct
+import time
+from functools import lru_cache
 from io import BytesIO
 from datetime import datetime
 from typing import Dict, Any
+from qrcode.image.svg import SvgPathImage
+from app.config import settings
+
+# Potpisana karta: "K1." + base32(payload + HMAC-SHA256[:16]).
+# Base32 (A-Z, 2-7) koristi alfanumerički režim QR koda - manji kod.
+TICKET_PREFIX = "K1."
+# prijava_id, korisnik_id, izlozba_id, broj_karata, izdato (unix vreme)
+_TICKET_PAYLOAD = struct.Struct(">IIIBI")
+_TICKET_SIGNATURE_SIZE = 16
+
+
+def _ticket_signature(payload: bytes) -> bytes:
+    """HMAC-SHA256 potpis payload-a (skraćen na 128 bita)"""
+    key = (settings.QR_SIGNING_KEY or settings.SECRET_KEY).encode("utf-8")
+    return hmac.new(key, payload, hashlib.sha256).digest()[:_TICKET_SIGNATURE_SIZE]
+
+
+def verify_ticket(token: str) -> Dict[str, Any]:
+    """
+    Proverava potpis karte i vraća njene podatke - bez pristupa bazi.
+    
+    Args:
+        token: Sadržaj QR koda (K1.xxxx)
+        
+    Returns:
+        Dict sa podacima karte
+        
+    Raises:
+        ValueError: Ako karta nije ispravna ili potpis ne odgovara
+    """
+    if not token.startswith(TICKET_PREFIX):
+        raise ValueError("Neispravan format QR koda")
+    
+    encoded = token[len(TICKET_PREFIX):]
+    try:
+        raw = base64.b32decode(encoded + "=" * (-len(encoded) % 8))
+    except (ValueError, TypeError):
+        raise ValueError("Neispravan format QR koda")
+    
+    if len(raw) != _TICKET_PAYLOAD.size + _TICKET_SIGNATURE_SIZE:
+        raise ValueError("Neispravan format QR koda")
+    
+    payload, signature = raw[:_TICKET_PAYLOAD.size], raw[_TICKET_PAYLOAD.size:]
+    if not hmac.compare_digest(signature, _ticket_signature(payload)):
+        raise ValueError("Neispravan potpis QR koda")
+    
+    prijava_id, korisnik_id, izlozba_id, broj_karata, izdato = _TICKET_PAYLOAD.unpack(payload)
+    return {
+        "prijava_id": prijava_id,
+        "korisnik_id": korisnik_id,
+        "izlozba_id": izlozba_id,
+        "broj_karata": broj_karata,
+        "datum_generisanja": datetime.utcfromtimestamp(izdato),
+        "potpisan": True
+    }
 
 
 def generate_qr_data(
@@ -17,7 +77,10 @@ def generate_qr_data(
     broj_karata: int
 ) -> str:
     """
-    Generiše JSON string sa podacima za QR kod.
+    Generiše potpisanu kartu za QR kod.
+    
+    Podaci su binarno spakovani i potpisani HMAC-om, pa skener na ulazu
+    može proveriti autentičnost bez baze (videti verify_ticket).
     
     Args:
         prijava_id: ID prijave
@@ -26,17 +89,17 @@ def generate_qr_data(
         broj_karata: Broj rezervisanih karata
         
     Returns:
-        JSON string sa podacima prijave
+        Potpisana karta (K1.xxxx)
     """
-    data = {
-        "prijava_id": prijava_id,
-        "korisnik_id": korisnik_id,
-        "izlozba_id": izlozba_id,
-        "broj_karata": broj_karata,
-        "datum_generisanja": datetime.utcnow().isoformat(),
-        "verzija": "1.0"
-    }
-    return json.dumps(data)
+    payload = _TICKET_PAYLOAD.pack(
+        prijava_id,
+        korisnik_id,
+        izlozba_id,
+        broj_karata,
+        int(time.time())
+    )
+    encoded = base64.b32encode(payload + _ticket_signature(payload)).decode("ascii")
+    return TICKET_PREFIX + encoded.rstrip("=")
 
 
 def generate_qr_code(
@@ -55,12 +118,19 @@ def generate_qr_code(
         broj_karata: Broj rezervisanih karata
         
     Returns:
-        Dict sa 'qr_data' (JSON string) i 'qr_image' (base64 string)
+        Dict sa 'qr_data' (potpisana karta K1.xxxx) i 'qr_image' (base64 string)
     """
     # Generisanje podataka za QR kod
     qr_data = generate_qr_data(prijava_id, korisnik_id, izlozba_id, broj_karata)
     
-    # Kreiranje QR koda
+    return {
+        "qr_data": qr_data,
+        "qr_image": render_qr_image(qr_data)
+    }
+
+
+def _build_qr(qr_data: str) -> qrcode.QRCode:
+    """Kreira QR kod za dati sadržaj (isti parametri za sve formate)"""
     qr = qrcode.QRCode(
         version=1,
         error_correction=qrcode.constants.ERROR_CORRECT_L,
@@ -69,43 +139,96 @@ def generate_qr_code(
     )
     qr.add_data(qr_data)
     qr.make(fit=True)
+    return qr
+
+
+@lru_cache(maxsize=settings.QR_CACHE_SIZE)
+def render_qr_png(qr_data: str) -> bytes:
+    """
+    Renderuje QR kod kao PNG.
     
+    Rezultat zavisi samo od sadržaja, pa se čuva u ograničenom LRU kešu
+    (ponovljeni zahtevi za istu kartu ne renderuju ponovo).
+    
+    Args:
+        qr_data: Sadržaj QR koda
+        
+    Returns:
+        PNG bajtovi
+    """
     # Generisanje slike (crno-beli dizajn)
-    img = qr.make_image(fill_color="black", back_color="white")
+    img = _build_qr(qr_data).make_image(fill_color="black", back_color="white")
     
-    # Konvertovanje u base64
     buffer = BytesIO()
     img.save(buffer, format="PNG")
-    buffer.seek(0)
-    img_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=settings.QR_CACHE_SIZE)
+def render_qr_svg(qr_data: str) -> bytes:
+    """
+    Renderuje QR kod kao SVG (vektorski, bez PIL-a).
     
-    return {
-        "qr_data": qr_data,
-        "qr_image": f"data:image/png;base64,{img_base64}"
-    }
+    Args:
+        qr_data: Sadržaj QR koda
+        
+    Returns:
+        SVG dokument u bajtovima
+    """
+    img = _build_qr(qr_data).make_image(image_factory=SvgPathImage)
+    
+    buffer = BytesIO()
+    img.save(buffer)
+    return buffer.getvalue()
+
+
+def render_qr_image(qr_data: str) -> str:
+    """
+    Renderuje QR kod za dati sadržaj kao base64 PNG.
+    
+    CPU-intenzivno (PIL), bez deljenog stanja - može se izvršavati
+    u thread/process pool-u (videti qr_worker).
+    
+    Args:
+        qr_data: Sadržaj QR koda
+        
+    Returns:
+        Data URL slike (data:image/png;base64,...)
+    """
+    img_base64 = base64.b64encode(render_qr_png(qr_data)).decode('utf-8')
+    return f"data:image/png;base64,{img_base64}"
 
 
 def decode_qr_data(qr_data: str) -> Dict[str, Any]:
     """
     Dekoduje podatke iz QR koda.
     
+    Potpisane karte se proveravaju kriptografski; stare JSON karte (bez
+    potpisa) se prihvataju samo ako se poklapaju sa sačuvanim qr_kod.
+    
     Args:
-        qr_data: JSON string iz QR koda
+        qr_data: Potpisana karta ili JSON string iz QR koda
         
     Returns:
-        Dict sa podacima prijave
+        Dict sa podacima prijave ("potpisan" označava proverenu kartu)
         
     Raises:
         ValueError: Ako je format QR koda neispravan
     """
+    if qr_data.startswith(TICKET_PREFIX):
+        return verify_ticket(qr_data)
+    
     try:
         data = json.loads(qr_data)
+        if not isinstance(data, dict):
+            raise ValueError("Neispravan format QR koda")
         required_fields = ["prijava_id", "korisnik_id", "izlozba_id"]
         
         for field in required_fields:
             if field not in data:
                 raise ValueError(f"Nedostaje polje: {field}")
         
+        data["potpisan"] = False
         return data
     except json.JSONDecodeError:
         raise ValueError("Neispravan format QR koda")
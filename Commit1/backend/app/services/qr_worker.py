@@ -0,0 +1,182 @@
+"""
+QR worker
+Generisanje QR slika van toka zahteva (thread ili process pool)
+"""
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional, Set
+from sqlalchemy import select, update, and_, or_
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.exc import StaleDataError
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.prijava import Prijava, QR_NA_CEKANJU, QR_U_OBRADI, QR_SPREMAN, QR_GRESKA
+from app.models.izlozba import Izlozba
+from app.services.qr_service import render_qr_image
+from app.services.email_service import send_registration_email
+
+# Konfigurisanje logging-a
+logger = logging.getLogger(__name__)
+
+
+class QRWorker:
+    """
+    Lokalni (in-process) red poslova za QR slike prijava.
+
+    Prijava se potvrđuje odmah posle rezervacije; renderovanje slike
+    (PIL, PNG, base64) izvršava se u pool-u, a upis slike i slanje
+    emaila u zasebnoj sesiji. Status je vidljiv kroz Prijava.status_qr.
+
+    Svaki uvicorn worker pri pokretanju zakazuje prijave na čekanju, pa se
+    prijava pre renderovanja preuzima uslovnim UPDATE-om (na_cekanju ->
+    u_obradi) - samo jedan proces je renderuje i šalje email.
+    """
+
+    def __init__(self, workers: int = 2, use_processes: bool = False):
+        self.workers = workers
+        self.use_processes = use_processes
+        self._executor: Optional[Executor] = None
+        self._tasks: Set[asyncio.Task] = set()
+        # Ograničava i broj istovremeno otvorenih sesija, ne samo CPU posao
+        self._semaphore = asyncio.Semaphore(workers)
+
+    def _get_executor(self) -> Executor:
+        """Lenjo kreira pool (process pool se ne pravi pri importu)"""
+        if self._executor is None:
+            pool_class = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+            self._executor = pool_class(max_workers=self.workers)
+        return self._executor
+
+    def submit(self, prijava_id: int) -> None:
+        """
+        Zakazuje generisanje QR slike za prijavu.
+        Poziva se tek posle commit-a prijave.
+
+        Args:
+            prijava_id: ID prijave
+        """
+        task = asyncio.create_task(self._process(prijava_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    def _claimable():
+        """Prijave na čekanju i napuštene prijave u obradi (proces je pao)"""
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.QR_CLAIM_TIMEOUT_SECONDS)
+        return and_(
+            Prijava.qr_kod.is_not(None),
+            or_(
+                Prijava.status_qr == QR_NA_CEKANJU,
+                and_(Prijava.status_qr == QR_U_OBRADI, Prijava.datum_izmene < cutoff)
+            )
+        )
+
+    async def _claim(self, db, prijava_id: int) -> bool:
+        """
+        Preuzima prijavu u obradu jednim uslovnim UPDATE-om.
+
+        Returns:
+            True ako je ovaj proces preuzeo prijavu
+        """
+        claimed = await db.scalar(
+            update(Prijava)
+            .where(Prijava.id_prijava == prijava_id, self._claimable())
+            .values(status_qr=QR_U_OBRADI, datum_izmene=datetime.utcnow())
+            .returning(Prijava.id_prijava)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return claimed is not None
+
+    async def _process(self, prijava_id: int) -> None:
+        """Renderuje sliku, upisuje je i šalje email sa kartom"""
+        async with self._semaphore, AsyncSessionLocal() as db:
+            if not await self._claim(db, prijava_id):
+                return
+            prijava = await db.scalar(
+                select(Prijava).options(
+                    joinedload(Prijava.korisnik),
+                    joinedload(Prijava.izlozba).joinedload(Izlozba.lokacija)
+                ).where(Prijava.id_prijava == prijava_id)
+            )
+            if not prijava:
+                return
+
+            try:
+                loop = asyncio.get_running_loop()
+                qr_image = await loop.run_in_executor(
+                    self._get_executor(), render_qr_image, prijava.qr_kod
+                )
+                if settings.QR_STORE_IMAGE:
+                    prijava.slika_qr = qr_image
+                prijava.status_qr = QR_SPREMAN
+            except Exception:
+                logger.exception(f"Greška pri generisanju QR koda za prijavu {prijava_id}")
+                prijava.status_qr = QR_GRESKA
+                await self._commit(db, prijava_id)
+                return
+
+            izlozba = prijava.izlozba
+            korisnik = prijava.korisnik
+            # Simulacija slanja emaila
+            email_sent = send_registration_email(
+                email=korisnik.email,
+                korisnik_ime=korisnik.puno_ime,
+                izlozba_naslov=izlozba.naslov,
+                qr_image=qr_image,
+                broj_karata=prijava.broj_karata,
+                datum_izlozbe=f"{izlozba.datum_pocetka} - {izlozba.datum_zavrsetka}",
+                lokacija=f"{izlozba.lokacija.naziv}, {izlozba.lokacija.adresa}" if izlozba.lokacija else None
+            )
+
+            if email_sent:
+                prijava.email_poslat = True
+                prijava.datum_slanja_emaila = datetime.utcnow()
+
+            await self._commit(db, prijava_id)
+
+    @staticmethod
+    async def _commit(db, prijava_id: int) -> None:
+        """Commit koji toleriše prijavu obrisanu dok je slika generisana"""
+        try:
+            await db.commit()
+        except StaleDataError:
+            await db.rollback()
+            logger.info(f"Prijava {prijava_id} je obrisana pre upisa QR koda")
+
+    async def resume_pending(self) -> int:
+        """
+        Ponovo zakazuje prijave koje su ostale na čekanju (npr. posle restarta)
+        ili u obradi procesa koji je pao. Istu prijavu može zakazati više
+        workera - obrađuje je onaj koji je prvi preuzme.
+
+        Returns:
+            Broj zakazanih prijava
+        """
+        async with AsyncSessionLocal() as db:
+            ids = (await db.scalars(
+                select(Prijava.id_prijava).where(self._claimable())
+            )).all()
+
+        for prijava_id in ids:
+            self.submit(prijava_id)
+        return len(ids)
+
+    async def shutdown(self) -> None:
+        """Čeka započete poslove i gasi pool"""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        # Semafor se vezuje za event loop - novi za sledeće pokretanje
+        self._semaphore = asyncio.Semaphore(self.workers)
+
+
+# Globalna instanca QR worker-a
+qr_worker = QRWorker(
+    workers=settings.QR_WORKERS,
+    use_processes=settings.QR_WORKER_PROCESSES
+)
@@ -0,0 +1,185 @@
+"""
+Servis za pretragu izložbi
+PostgreSQL full-text pretraga sa težinama, in-process indeks kao rezerva
+"""
+import asyncio
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import Select, case, event, false, func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+from app.models.izlozba import Izlozba
+from app.utils.search import SEPARATOR_POLJA, tokenize
+
+# Težine polja dokumenta (kao podrazumevane težine ts_rank za A, B, C)
+TEZINE = (1.0, 0.4, 0.2)
+# Ključ u Session.info: sesija je upisala izložbu (indeks zastareva tek posle commit-a)
+_IZMENJENE_IZLOZBE = "izlozbe_index_dirty"
+
+
+def izlozba_tsvector():
+    """
+    tsvector izložbe sa težinama: naslov (A), kratak opis (B), opis (C).
+
+    Konstante su literali (ne parametri), pa se izraz poklapa sa GIN
+    indeksom ix_izlozbe_pretraga iz migracije 007.
+    """
+    separator = literal_column(f"'{SEPARATOR_POLJA.strip()}'")
+    delovi = [
+        func.setweight(
+            func.to_tsvector(
+                literal_column("'simple'"),
+                func.split_part(Izlozba.pretraga, separator, literal_column(str(i)))
+            ),
+            literal_column(f"'{tezina}'")
+        )
+        for i, tezina in enumerate("ABC", start=1)
+    ]
+    return delovi[0].op("||")(delovi[1]).op("||")(delovi[2])
+
+
+class InvertedIndex:
+    """
+    Invertovani indeks dokumenata za pretragu u memoriji procesa.
+
+    Rezerva za baze bez full-text pretrage (SQLite u razvoju i testovima):
+    reč -> {id_izlozba: težina}, pretraga po prefiksu reči. Commit koji
+    upisuje izložbu označava indeks zastarelim, pa se gradi ponovo pri
+    sledećoj pretrazi; max_age ograničava zastarelost kada izložbe menja
+    drugi proces.
+    """
+
+    def __init__(self, max_age: float = 60.0):
+        self.max_age = max_age
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._tokens: List[str] = []
+        self._built_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def mark_dirty(self) -> None:
+        """Označava indeks zastarelim"""
+        self._built_at = None
+
+    def _is_stale(self) -> bool:
+        return self._built_at is None or time.monotonic() - self._built_at > self.max_age
+
+    async def ensure(self, db: AsyncSession) -> None:
+        """Gradi indeks iz baze ako je zastareo"""
+        if not self._is_stale():
+            return
+        async with self._lock:
+            if not self._is_stale():
+                return
+            # Izmena tokom izgradnje ponovo označava indeks zastarelim
+            self._built_at = time.monotonic()
+            rows = (await db.execute(
+                select(Izlozba.id_izlozba, Izlozba.pretraga)
+            )).all()
+            self._build(rows)
+
+    def _build(self, rows) -> None:
+        postings: Dict[str, Dict[int, float]] = defaultdict(lambda: defaultdict(float))
+        for id_izlozba, dokument in rows:
+            polja = (dokument or "").split(SEPARATOR_POLJA)
+            for polje, tezina in zip(polja, TEZINE):
+                for token in polje.split():
+                    postings[token][id_izlozba] += tezina
+        self._postings = {token: dict(ids) for token, ids in postings.items()}
+        self._tokens = sorted(self._postings)
+
+    def _prefix(self, prefix: str) -> Dict[int, float]:
+        """Zbir težina po izložbi za sve reči koje počinju prefiksom"""
+        scores: Dict[int, float] = defaultdict(float)
+        i = bisect_left(self._tokens, prefix)
+        while i < len(self._tokens) and self._tokens[i].startswith(prefix):
+            for id_izlozba, tezina in self._postings[self._tokens[i]].items():
+                scores[id_izlozba] += tezina
+            i += 1
+        return scores
+
+    def search(self, tokens: List[str]) -> Dict[int, float]:
+        """
+        Vraća izložbe koje sadrže sve reči upita (po prefiksu) sa rangom.
+
+        Args:
+            tokens: Normalizovane reči upita
+
+        Returns:
+            Dict id_izlozba -> rang
+        """
+        result: Optional[Dict[int, float]] = None
+        for token in tokens:
+            scores = self._prefix(token)
+            if result is None:
+                result = dict(scores)
+            else:
+                result = {i: result[i] + s for i, s in scores.items() if i in result}
+            if not result:
+                return {}
+        return result or {}
+
+
+# Globalni rezervni indeks
+izlozbe_index = InvertedIndex()
+
+
+@event.listens_for(Izlozba, "after_insert")
+@event.listens_for(Izlozba, "after_update")
+@event.listens_for(Izlozba, "after_delete")
+def _zapamti_izmenu(mapper, connection, target) -> None:
+    # Flush još nije commit - indeks izgrađen pre commit-a (ili posle
+    # rollback-a) bi video stanje koje druge sesije ne vide
+    sesija = object_session(target)
+    if sesija is not None:
+        sesija.info[_IZMENJENE_IZLOZBE] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _zastareo_indeks(session) -> None:
+    if session.info.pop(_IZMENJENE_IZLOZBE, False):
+        izlozbe_index.mark_dirty()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _odbaci_izmene(session, previous_transaction) -> None:
+    if previous_transaction.parent is None:
+        session.info.pop(_IZMENJENE_IZLOZBE, None)
+
+
+async def search_izlozbe(
+    db: AsyncSession, query: Select, search: str
+) -> Tuple[Select, Optional[object]]:
+    """
+    Dodaje uslov pretrage na upit izložbi i vraća izraz za rang.
+
+    Na PostgreSQL-u koristi tsvector sa težinama (GIN indeks) i ts_rank;
+    na ostalim bazama in-process invertovani indeks. Pretraga ne razlikuje
+    ćirilicu/latinicu ni dijakritike i traži reči po prefiksu.
+
+    Args:
+        db: Sesija baze
+        query: Upit izložbi
+        search: Tekst pretrage
+
+    Returns:
+        (upit sa uslovom, izraz ranga za ORDER BY ili None ako nema rezultata)
+    """
+    tokens = tokenize(search)
+    if not tokens:
+        return query.where(false()), None
+
+    if db.bind.dialect.name == "postgresql":
+        tsquery = func.to_tsquery(
+            literal_column("'simple'"), " & ".join(f"{token}:*" for token in tokens)
+        )
+        dokument = izlozba_tsvector()
+        return query.where(dokument.op("@@")(tsquery)), func.ts_rank(dokument, tsquery)
+
+    await izlozbe_index.ensure(db)
+    scores = izlozbe_index.search(tokens)
+    if not scores:
+        return query.where(false()), None
+    rang = case(scores, value=Izlozba.id_izlozba, else_=0)
+    return query.where(Izlozba.id_izlozba.in_(scores.keys())), rang
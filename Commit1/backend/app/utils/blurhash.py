@@ -0,0 +1,94 @@
+"""
+BlurHash enkoder (https://blurha.sh)
+Kratak string iz kojeg klijent iscrtava zamućen placeholder slike
+"""
+import math
+from typing import List, Sequence, Tuple
+
+_BASE83 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+
+
+def _base83(value: int, length: int) -> str:
+    return "".join(
+        _BASE83[(value // 83 ** (length - i - 1)) % 83] for i in range(length)
+    )
+
+
+def _srgb_to_linear(value: int) -> float:
+    v = value / 255
+    return v / 12.92 if v <= 0.04045 else ((v + 0.055) / 1.055) ** 2.4
+
+
+def _linear_to_srgb(value: float) -> int:
+    v = max(0.0, min(1.0, value))
+    if v <= 0.0031308:
+        return int(v * 12.92 * 255 + 0.5)
+    return int((1.055 * v ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def _sign_pow(value: float, exp: float) -> float:
+    return math.copysign(abs(value) ** exp, value)
+
+
+def encode(
+    pixels: Sequence[Tuple[int, int, int]],
+    width: int,
+    height: int,
+    x_components: int = 4,
+    y_components: int = 3
+) -> str:
+    """
+    Enkoduje sliku u BlurHash.
+
+    Args:
+        pixels: RGB pikseli umanjene slike, red po red
+        width: Širina slike
+        height: Visina slike
+        x_components: Broj komponenti po širini (1-9)
+        y_components: Broj komponenti po visini (1-9)
+
+    Returns:
+        BlurHash string (6 + 2 * (x * y - 1) karaktera)
+    """
+    linear = [tuple(_srgb_to_linear(c) for c in pixel) for pixel in pixels]
+    cos_x = [[math.cos(math.pi * i * x / width) for x in range(width)] for i in range(x_components)]
+    cos_y = [[math.cos(math.pi * j * y / height) for y in range(height)] for j in range(y_components)]
+
+    factors: List[Tuple[float, float, float]] = []
+    for j in range(y_components):
+        for i in range(x_components):
+            scale = (1 if i == 0 and j == 0 else 2) / (width * height)
+            r = g = b = 0.0
+            for y in range(height):
+                row = y * width
+                cy = cos_y[j][y]
+                for x in range(width):
+                    basis = cos_x[i][x] * cy
+                    pr, pg, pb = linear[row + x]
+                    r += basis * pr
+                    g += basis * pg
+                    b += basis * pb
+            factors.append((r * scale, g * scale, b * scale))
+
+    dc, ac = factors[0], factors[1:]
+    result = _base83((x_components - 1) + (y_components - 1) * 9, 1)
+
+    if ac:
+        actual_max = max(abs(v) for factor in ac for v in factor)
+        quantised = max(0, min(82, int(actual_max * 166 - 0.5)))
+        max_value = (quantised + 1) / 166
+        result += _base83(quantised, 1)
+    else:
+        max_value = 1.0
+        result += _base83(0, 1)
+
+    r, g, b = (_linear_to_srgb(v) for v in dc)
+    result += _base83((r << 16) + (g << 8) + b, 4)
+
+    for factor in ac:
+        qr, qg, qb = (
+            max(0, min(18, int(math.floor(_sign_pow(v / max_value, 0.5) * 9 + 9.5))))
+            for v in factor
+        )
+        result += _base83(qr * 19 * 19 + qg * 19 + qb, 2)
+    return result
@@ -0,0 +1,226 @@
+"""
+Keš odgovora za javne GET rute
+TTL/LRU keš u memoriji procesa ili Redis-kompatibilan backend
+
+Memorijski backend invalidira samo keš svog procesa - sa više uvicorn
+workera ostali procesi služe zastarele odgovore do isteka TTL-a, pa se za
+takvu postavku koristi CACHE_BACKEND=redis.
+"""
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from app.config import settings
+
+
+class CacheBackend(ABC):
+    """
+    Interfejs backend-a keša (podskup Redis komandi GET/SET EX/INCR).
+
+    Brojači (incr/counter) i vrednosti (get/set) su odvojeni prostori ključeva.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        ...
+
+    @abstractmethod
+    async def incr(self, key: str) -> int:
+        ...
+
+    @abstractmethod
+    async def counter(self, key: str) -> int:
+        """Trenutna vrednost brojača (0 ako ne postoji)"""
+        ...
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Keš u memoriji procesa sa TTL-om i LRU izbacivanjem.
+
+    Invalidacija važi samo za ovaj proces (videti RedisCacheBackend za više
+    workera). Brojači (INCR) se čuvaju odvojeno i ne izbacuju, jer bi gubitak verzije
+    prostora imena ponovo "oživeo" zastarele unose.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    async def counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    def clear(self) -> None:
+        """Briše sve unose i brojače"""
+        self._entries.clear()
+        self._counters.clear()
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Backend nad Redis-kompatibilnim async klijentom (redis.asyncio, fakeredis...).
+    Deli keš između svih worker procesa.
+    """
+
+    def __init__(self, client: Any):
+        self.client = client
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        await self.client.set(key, value, ex=ttl)
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(key)
+
+    async def counter(self, key: str) -> int:
+        return int(await self.client.get(key) or 0)
+
+
+class ResponseCache:
+    """
+    Keš serijalizovanih JSON odgovora podeljen po prostorima imena.
+
+    Invalidacija ne briše ključeve već povećava verziju prostora imena
+    (jedan INCR), pa stari unosi samo ističu po TTL-u.
+
+    Odgovor se upisuje pod verzijom pročitanom u get(), pre upita nad bazom:
+    ako se invalidacija desi dok upit traje, rezultat ostaje pod starom
+    verzijom i ne služi se posle nje.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: int, enabled: bool = True):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+
+    @staticmethod
+    def _versioned_key(namespace: str, key: str, version: int) -> str:
+        return f"resp:{namespace}:{version}:{key}"
+
+    async def get(self, namespace: str, key: str) -> Tuple[Optional[Response], int]:
+        """
+        Vraća keširan odgovor (ili None) i trenutnu verziju prostora imena.
+
+        Args:
+            namespace: Prostor imena (npr. "izlozbe")
+            key: Ključ zahteva (videti cache_key)
+
+        Returns:
+            (odgovor ili None, verzija koja se prosleđuje u store)
+        """
+        if not self.enabled:
+            return None, 0
+
+        version = await self.backend.counter(f"ver:{namespace}")
+        raw = await self.backend.get(self._versioned_key(namespace, key, version))
+        if raw is None:
+            return None, version
+
+        headers, body = raw.split(b"\n", 1)
+        response = Response(
+            content=body,
+            media_type="application/json",
+            headers=json.loads(headers)
+        )
+        return response, version
+
+    async def store(
+        self,
+        namespace: str,
+        key: str,
+        version: int,
+        data: Any,
+        response_model: Any,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Response:
+        """
+        Serijalizuje podatke kroz response_model, kešira ih i vraća odgovor.
+
+        Args:
+            namespace: Prostor imena
+            key: Ključ zahteva
+            version: Verzija iz get() (pročitana pre upita nad bazom)
+            data: ORM objekat(i) ili Pydantic model
+            response_model: Šema odgovora (npr. List[LokacijaResponse])
+            headers: Dodatni headeri koji se keširaju uz telo
+        """
+        adapter = TypeAdapter(response_model)
+        body = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+        headers = headers or {}
+
+        if self.enabled:
+            raw = json.dumps(headers).encode() + b"\n" + body
+            await self.backend.set(
+                self._versioned_key(namespace, key, version), raw, self.ttl
+            )
+
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    async def invalidate(self, *namespaces: str) -> None:
+        """Poništava sve keširane odgovore datih prostora imena"""
+        for namespace in namespaces:
+            await self.backend.incr(f"ver:{namespace}")
+
+
+def cache_key(request: Request) -> str:
+    """
+    Ključ keša: putanja + sortirani query parametri.
+    Redosled parametara u URL-u ne utiče na ključ.
+    """
+    params = sorted(request.query_params.multi_items())
+    return f"{request.url.path}?{urlencode(params)}"
+
+
+def create_backend() -> CacheBackend:
+    """
+    Kreira backend keša prema podešavanjima.
+
+    CACHE_BACKEND=redis zahteva paket redis (requirements.txt).
+    """
+    if settings.CACHE_BACKEND == "redis":
+        from redis import asyncio as redis_asyncio
+
+        return RedisCacheBackend(redis_asyncio.from_url(settings.CACHE_REDIS_URL))
+    return MemoryCacheBackend(max_entries=settings.CACHE_MAX_ENTRIES)
+
+
+# Globalna instanca keša odgovora
+response_cache = ResponseCache(
+    create_backend(),
+    ttl=settings.CACHE_TTL_SECONDS,
+    enabled=settings.CACHE_ENABLED
+)
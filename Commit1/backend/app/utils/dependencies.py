@@ -5,10 +5,12 @@ Autentifikacija i autorizacija
 from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models.korisnik import Korisnik
+from app.schemas.korisnik import TrenutniKorisnik
 from app.utils.security import decode_access_token
+from app.utils.user_cache import user_cache
 
 # OAuth2 šema za token iz headera
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
@@ -16,11 +18,15 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=Fals
 
 async def get_current_user(
     token: Optional[str] = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> Optional[Korisnik]:
+    db: AsyncSession = Depends(get_db)
+) -> Optional[TrenutniKorisnik]:
     """
     Dobija trenutnog korisnika iz JWT tokena.
     Vraća None ako token nije prosleđen ili nije validan.
+    
+    Aktivni korisnici se kratko keširaju (user_cache), pa većina
+    zahteva ne ide u bazu. Vraća se TrenutniKorisnik (samo za čitanje,
+    nije vezan za sesiju); promena lozinke ne poništava izdate tokene.
     """
     if not token:
         return None
@@ -35,17 +41,23 @@ async def get_current_user(
     if username is None or user_id is None:
         return None
     
-    user = db.query(Korisnik).filter(Korisnik.id_korisnik == user_id).first()
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+    
+    korisnik = await db.get(Korisnik, user_id)
     
-    if user is None or not user.aktivan:
+    if korisnik is None or not korisnik.aktivan:
         return None
     
+    user = TrenutniKorisnik.model_validate(korisnik)
+    user_cache.set(user)
     return user
 
 
 async def get_current_user_required(
-    current_user: Optional[Korisnik] = Depends(get_current_user)
-) -> Korisnik:
+    current_user: Optional[TrenutniKorisnik] = Depends(get_current_user)
+) -> TrenutniKorisnik:
     """
     Zahteva prijavljenog korisnika.
     Baca izuzetak ako korisnik nije prijavljen.
@@ -60,8 +72,8 @@ async def get_current_user_required(
 
 
 async def get_current_admin(
-    current_user: Korisnik = Depends(get_current_user_required)
-) -> Korisnik:
+    current_user: TrenutniKorisnik = Depends(get_current_user_required)
+) -> TrenutniKorisnik:
     """
     Zahteva administratora (super_korisnik=True).
     Baca izuzetak ako korisnik nije admin.
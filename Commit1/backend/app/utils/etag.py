@@ -0,0 +1,54 @@
+"""
+ETag i uslovni GET (If-None-Match)
+"""
+import hashlib
+from typing import Any, Optional
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Pravi jak ETag iz verzija podataka (npr. id-jeva i datuma izmene redova).
+
+    Args:
+        parts: Vrednosti od kojih zavisi sadržaj odgovora
+
+    Returns:
+        ETag u navodnicima, npr. "3f2a..."
+    """
+    digest = hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def url_version(url: Optional[str]) -> Optional[str]:
+    """
+    Verzija sadržaja iza URL-a za ?v= parametar (menja se sa izvornim URL-om).
+
+    Adresa sa verzijom se sme keširati dugo (immutable) - izmena slike
+    menja i adresu koju klijent dobija.
+    """
+    if not url:
+        return None
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+
+
+def etag_matches(request: Request, etag: Optional[str]) -> bool:
+    """
+    Proverava If-None-Match header zahteva (slabo poređenje, RFC 9110).
+    """
+    header = request.headers.get("if-none-match")
+    if not header or not etag:
+        return False
+    if header.strip() == "*":
+        return True
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    return opaque(etag) in {opaque(tag) for tag in header.split(",")}
+
+
+def not_modified(etag: str) -> Response:
+    """Vraća 304 Not Modified bez tela"""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
@@ -0,0 +1,297 @@
+"""
+Metrike aplikacije u Prometheus tekstualnom formatu
+Latencija po ruti, statusni kodovi, zahtevi u toku i SQL upiti po zahtevu
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.utils.pool_metrics import pool_metrics
+
+# Content-Type Prometheus tekstualnog formata
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Granice histograma (sekunde, broj upita)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Labels, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Brojač sa labelama (samo raste)"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Histogram sa labelama (kumulativne granice u izlazu, kao prometheus_client)"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> (brojevi po granici + prekoračenje, suma)
+        self._values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Labels, value: float) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][i] += 1
+            entry[1][0] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            values = [(labels, list(counts), total[0]) for labels, (counts, total) in self._values.items()]
+        for labels, counts, total in values:
+            cumulative = 0
+            for granica, broj in zip(self.buckets, counts):
+                cumulative += broj
+                le = _format_labels(self.labelnames, labels, f'le="{_format_value(granica)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            cumulative += counts[-1]
+            label_str = _format_labels(self.labelnames, labels)
+            inf = _format_labels(self.labelnames, labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf} {cumulative}")
+            lines.append(f"{self.name}_sum{label_str} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_str} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Trenutna vrednost - čita se funkcijom u trenutku izvoza"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        read: Callable[[], Iterable[Tuple[Labels, float]]],
+        labelnames: Tuple[str, ...] = ()
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.read = read
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        for labels, value in self.read():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Skup metrika koje se izvoze na /metrics"""
+
+    def __init__(self):
+        self._metrics: list = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Globalni registar metrika
+registry = MetricsRegistry()
+
+http_requests = registry.register(Counter(
+    "http_requests_total", "Broj HTTP zahteva", ("method", "route", "status")
+))
+http_latency = registry.register(Histogram(
+    "http_request_duration_seconds", "Trajanje HTTP zahteva", ("method", "route")
+))
+db_queries = registry.register(Counter(
+    "db_queries_total", "Broj izvršenih SQL upita"
+))
+db_query_time = registry.register(Counter(
+    "db_query_seconds_total", "Ukupno vreme izvršavanja SQL upita"
+))
+request_queries = registry.register(Histogram(
+    "http_request_db_queries", "Broj SQL upita po zahtevu", ("route",), QUERY_COUNT_BUCKETS
+))
+request_query_time = registry.register(Histogram(
+    "http_request_db_seconds", "Vreme SQL upita po zahtevu", ("route",)
+))
+
+_in_progress = 0
+registry.register(Gauge(
+    "http_requests_in_progress", "HTTP zahtevi u toku", lambda: [((), _in_progress)]
+))
+
+
+class RequestStats:
+    """SQL statistika jednog zahteva (popunjavaju je engine eventi)"""
+
+    __slots__ = ("queries", "query_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.query_time = 0.0
+
+
+# Statistika zahteva koji se trenutno obrađuje (None van zahteva)
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Broji SQL upite i njihovo vreme preko engine evenata.
+
+    Args:
+        engine: Sinhroni engine (za async engine proslediti async_engine.sync_engine)
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        db_queries.inc()
+        db_query_time.inc(amount=elapsed)
+        stats = current_request.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.query_time += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        starts = context.connection.info.get("query_start") if context.connection else None
+        if starts:
+            starts.pop()
+
+
+class PoolCollector:
+    """Izvoz metrika connection pool-ova (videti pool_metrics)"""
+
+    def __init__(self, engines: Dict[str, Engine]):
+        self.engines = engines
+
+    def render(self) -> List[str]:
+        snapshots = {
+            name: pool_metrics[name].snapshot(engine.pool)
+            for name, engine in self.engines.items()
+        }
+        lines: List[str] = []
+        for metric, kind, key, documentation in (
+            ("db_pool_size", "gauge", "size", "Stalne konekcije pool-a"),
+            ("db_pool_checked_out", "gauge", "checked_out", "Konekcije u upotrebi"),
+            ("db_pool_overflow", "gauge", "overflow", "Konekcije preko veličine pool-a"),
+            ("db_pool_timeouts_total", "counter", "timeouts", "Isteklo čekanje na konekciju"),
+        ):
+            lines += [f"# HELP {metric} {documentation}", f"# TYPE {metric} {kind}"]
+            lines += [f'{metric}{{pool="{name}"}} {s[key]}' for name, s in snapshots.items()]
+
+        metric = "db_pool_wait_seconds"
+        lines += [f"# HELP {metric} Vreme preuzimanja konekcije iz pool-a", f"# TYPE {metric} histogram"]
+        for name, s in snapshots.items():
+            wait = s["wait_seconds"]
+            lines += [
+                f'{metric}_bucket{{pool="{name}",le="{le}"}} {count}'
+                for le, count in wait["buckets"].items()
+            ]
+            lines.append(f'{metric}_sum{{pool="{name}"}} {wait["sum"]}')
+            lines.append(f'{metric}_count{{pool="{name}"}} {wait["count"]}')
+        return lines
+
+
+def _route_template(scope) -> str:
+    """Šablon rute (npr. /api/izlozbe/{izlozba_id}) - ograničen broj labela"""
+    return getattr(scope.get("route"), "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware koji beleži latenciju, status i SQL upite po ruti.
+
+    Čist ASGI (bez BaseHTTPMiddleware) - ne kopira telo odgovora.
+    """
+
+    def __init__(self, app, exclude_prefixes: Tuple[str, ...] = ()):
+        self.app = app
+        self.exclude_prefixes = exclude_prefixes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        global _in_progress
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        _in_progress += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _in_progress -= 1
+            current_request.reset(token)
+
+            route = _route_template(scope)
+            method = scope["method"]
+            http_requests.inc((method, route, str(status_code)))
+            http_latency.observe((method, route), elapsed)
+            request_queries.observe((route,), stats.queries)
+            request_query_time.observe((route,), stats.query_time)
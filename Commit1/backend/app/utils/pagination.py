@@ -0,0 +1,117 @@
+"""
+Keyset (cursor) paginacija
+Kodiranje kursora i primena uslova na upite
+"""
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence
+from fastapi import HTTPException, status
+from sqlalchemy import Select, literal, tuple_
+
+# Header u kome liste bez omotača vraćaju kursor sledeće stranice
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Kodira vrednosti ključa sortiranja u neprozirni kursor.
+
+    Args:
+        values: Vrednosti kolona ključa poslednjeg reda stranice
+
+    Returns:
+        URL-safe base64 string
+    """
+    payload = [
+        v.isoformat() if isinstance(v, (date, datetime)) else v
+        for v in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _coerce(value: Any, column) -> Any:
+    """Vraća vrednost iz kursora u Python tip kolone"""
+    python_type = column.type.python_type
+    if value is None:
+        return None
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> List[Any]:
+    """
+    Dekoduje kursor u vrednosti ključa sortiranja.
+
+    Args:
+        cursor: Kursor dobijen iz prethodnog odgovora
+        columns: Kolone ključa sortiranja
+
+    Returns:
+        Lista vrednosti u tipovima kolona
+
+    Raises:
+        HTTPException: Ako kursor nije ispravan
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("Pogrešan broj vrednosti")
+        return [_coerce(v, c) for v, c in zip(values, columns)]
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Neispravan kursor"
+        )
+
+
+def apply_cursor(
+    query: Select,
+    columns: Sequence,
+    cursor: Optional[str] = None,
+    descending: bool = False
+) -> Select:
+    """
+    Sortira upit po ključu i, ako je kursor prosleđen, nastavlja posle njega.
+
+    Poslednja kolona ključa mora biti jedinstvena (primarni ključ), pa
+    poređenje reda (a, id) > (x, y) koristi indeks umesto OFFSET-a.
+
+    Args:
+        query: SELECT upit
+        columns: Kolone ključa sortiranja
+        cursor: Opcioni kursor prethodne stranice
+        descending: Opadajući redosled
+
+    Returns:
+        Upit sa ORDER BY i uslovom kursora
+    """
+    query = query.order_by(*[c.desc() if descending else c.asc() for c in columns])
+
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        key = tuple_(*columns)
+        after = tuple_(*[literal(v, c.type) for v, c in zip(values, columns)])
+        query = query.where(key < after if descending else key > after)
+
+    return query
+
+
+def next_cursor(items: Sequence[Any], columns: Sequence, limit: int) -> Optional[str]:
+    """
+    Vraća kursor sledeće stranice ili None ako je stranica poslednja.
+
+    Args:
+        items: Učitani redovi trenutne stranice
+        columns: Kolone ključa sortiranja
+        limit: Veličina stranice
+    """
+    if len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor([getattr(last, c.key) for c in columns])
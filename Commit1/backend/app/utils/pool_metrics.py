@@ -0,0 +1,114 @@
+"""
+Metrike connection pool-a
+Zauzetost pool-a i vreme čekanja na konekciju (histogram)
+"""
+import threading
+import time
+from typing import Any, Dict, List, Tuple, Type
+from sqlalchemy import exc
+from sqlalchemy.pool import Pool
+
+# Granice histograma vremena čekanja na konekciju (sekunde)
+WAIT_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+class PoolMetrics:
+    """
+    Brojači jednog pool-a: histogram vremena preuzimanja konekcije
+    (čekanje u redu + otvaranje nove konekcije) i broj isteklih čekanja.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = WAIT_BUCKETS):
+        self.buckets = buckets
+        self._counts: List[int] = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+        self._timeouts = 0
+        # Sinhroni engine se koristi iz više niti
+        self._lock = threading.Lock()
+
+    def observe_wait(self, seconds: float) -> None:
+        """Beleži vreme preuzimanja jedne konekcije"""
+        i = 0
+        while i < len(self.buckets) and seconds > self.buckets[i]:
+            i += 1
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += seconds
+
+    def observe_timeout(self) -> None:
+        """Beleži čekanje koje je isteklo (pool_timeout)"""
+        with self._lock:
+            self._timeouts += 1
+
+    def snapshot(self, pool: Pool) -> Dict[str, Any]:
+        """
+        Trenutno stanje pool-a i kumulativni histogram čekanja.
+
+        Args:
+            pool: Pool čije se zauzetost čita (QueuePool)
+
+        Returns:
+            Dict sa zauzetošću pool-a i histogramom
+        """
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+            timeouts = self._timeouts
+
+        cumulative, buckets = 0, {}
+        for granica, broj in zip(self.buckets, counts):
+            cumulative += broj
+            buckets[str(granica)] = cumulative
+        buckets["+Inf"] = cumulative + counts[-1]
+
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "timeouts": timeouts,
+            "wait_seconds": {
+                "count": buckets["+Inf"],
+                "sum": round(total, 6),
+                "buckets": buckets,
+            },
+        }
+
+
+class _TimedGetMixin:
+    """Meri preuzimanje konekcije iz pool-a (_do_get čeka u redu ili otvara novu)"""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.observe_timeout()
+            raise
+        self.metrics.observe_wait(time.perf_counter() - start)
+        return connection
+
+
+# Metrike po engine-u (ključ je ime pool-a)
+pool_metrics: Dict[str, PoolMetrics] = {}
+
+
+def instrumented_pool(pool_class: Type[Pool], name: str) -> Type[Pool]:
+    """
+    Pravi podklasu pool-a koja beleži metrike pod datim imenom.
+
+    Metrike su atribut klase, pa preživljavaju dispose()/recreate() pool-a.
+
+    Args:
+        pool_class: Klasa pool-a (npr. QueuePool, AsyncAdaptedQueuePool)
+        name: Ime pod kojim se metrike izveštavaju
+
+    Returns:
+        Klasa pool-a za poolclass argument create_engine
+    """
+    metrics = pool_metrics.setdefault(name, PoolMetrics())
+    return type(pool_class.__name__, (_TimedGetMixin, pool_class), {"metrics": metrics})
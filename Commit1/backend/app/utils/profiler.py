@@ -0,0 +1,261 @@
+"""
+SQL profiler po zahtevu (debug režim)
+Beleži sve SQL naredbe zahteva, otkriva N+1 obrasce i prekoračen budžet upita
+"""
+import logging
+import re
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Liste parametara (IN (?, ?, ?)) i literali se svode na isti oblik
+_PARAM_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s|%s|\$\d+|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|%s|\$\d+|:\w+))*\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+# Testovi (tests/query_budget_plugin.py) pretvaraju prekoračen budžet u grešku
+_enforce_budgets = False
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Zahtev ili test je izvršio više SQL upita od deklarisanog budžeta"""
+
+
+def enforce_budgets(enabled: bool = True) -> None:
+    """
+    Uključuje strogi režim: ProfilerMiddleware baca QueryBudgetExceeded
+    umesto da samo loguje zahtev preko budžeta (koristi ga pytest plugin).
+    """
+    global _enforce_budgets
+    _enforce_budgets = enabled
+
+
+def statement_shape(statement: str) -> str:
+    """Oblik SQL naredbe bez vrednosti - naredbe istog oblika su kandidati za N+1"""
+    shape = _PARAM_LIST.sub("(?)", statement)
+    shape = _LITERAL.sub("?", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+def query_budget(max_queries: int) -> Callable:
+    """
+    Dekorator - deklariše najveći očekivani broj SQL upita endpointa.
+
+    Profiler označava (i loguje) zahteve koji prekorače budžet; u testovima
+    (videti tests/query_budget_plugin.py) takav zahtev obara test.
+
+    Args:
+        max_queries: Najveći broj upita po zahtevu
+    """
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.__query_budget__ = max_queries
+        return endpoint
+    return decorator
+
+
+class QueryLog:
+    """SQL naredbe jednog zahteva (ili bloka koda - videti count_queries)"""
+
+    __slots__ = ("statements",)
+
+    def __init__(self):
+        self.statements: List[Tuple[str, float]] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def summary(self, n_plus_one_threshold: int) -> Dict[str, Any]:
+        """
+        Grupiše naredbe po obliku.
+
+        Returns:
+            Dict sa brojem upita, ukupnim vremenom, grupama i N+1 kandidatima
+        """
+        groups: "OrderedDict[str, List[float]]" = OrderedDict()
+        for statement, elapsed in self.statements:
+            groups.setdefault(statement_shape(statement), []).append(elapsed)
+
+        statements = [
+            {"sql": shape, "count": len(times), "total_ms": round(sum(times) * 1000, 3)}
+            for shape, times in groups.items()
+        ]
+        return {
+            "queries": self.count,
+            "sql_ms": round(sum(elapsed for _, elapsed in self.statements) * 1000, 3),
+            "statements": statements,
+            "n_plus_one": [s for s in statements if s["count"] >= n_plus_one_threshold],
+        }
+
+
+# Log zahteva koji se trenutno profiliše (None van zahteva)
+current_log: ContextVar[Optional[QueryLog]] = ContextVar("current_query_log", default=None)
+
+
+def profile_engine(engine: Engine) -> None:
+    """
+    Beleži svaku SQL naredbu u log tekućeg zahteva.
+
+    Args:
+        engine: Sinhroni engine (za async engine proslediti async_engine.sync_engine)
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if current_log.get() is not None:
+            conn.info.setdefault("profile_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        log = current_log.get()
+        starts = conn.info.get("profile_start")
+        if log is not None and starts:
+            log.statements.append((statement, time.perf_counter() - starts.pop()))
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        starts = context.connection.info.get("profile_start") if context.connection else None
+        if current_log.get() is not None and starts:
+            starts.pop()
+
+
+class count_queries:
+    """
+    Context manager za skripte i testove - broji SQL upite u bloku.
+
+    with count_queries() as log:
+        ...
+    assert log.count <= 3
+    """
+
+    def __enter__(self) -> QueryLog:
+        self._log = QueryLog()
+        self._token = current_log.set(self._log)
+        return self._log
+
+    def __exit__(self, *exc) -> None:
+        current_log.reset(self._token)
+
+
+class ProfileStore:
+    """Ograničena lista poslednjih profila (po X-Request-ID)"""
+
+    def __init__(self, max_entries: int = 200):
+        self.max_entries = max_entries
+        self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def add(self, profile: Dict[str, Any]) -> None:
+        self._profiles[profile["request_id"]] = profile
+        while len(self._profiles) > self.max_entries:
+            self._profiles.popitem(last=False)
+
+    def get(self, request_id: str) -> Optional[Dict[str, Any]]:
+        return self._profiles.get(request_id)
+
+    def recent(self, limit: int) -> List[Dict[str, Any]]:
+        """Poslednji profili bez liste naredbi, najnoviji prvi"""
+        return [
+            {k: v for k, v in profile.items() if k != "statements"}
+            for profile in reversed(list(self._profiles.values())[-limit:])
+        ]
+
+
+class ProfilerMiddleware:
+    """
+    ASGI middleware - profiliše svaki zahtev i čuva rezultat u ProfileStore.
+
+    Odgovor dobija X-Request-ID (za /debug/profile/{request_id}) i
+    X-SQL-Queries, X-SQL-Time-Ms, X-SQL-N1 headere.
+    """
+
+    def __init__(
+        self,
+        app,
+        store: ProfileStore,
+        n_plus_one_threshold: int = 3,
+        exclude_prefixes: Tuple[str, ...] = ()
+    ):
+        self.app = app
+        self.store = store
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.exclude_prefixes = exclude_prefixes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        request_id = uuid.uuid4().hex
+        log = QueryLog()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                summary = log.summary(self.n_plus_one_threshold)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (REQUEST_ID_HEADER.lower().encode(), request_id.encode()),
+                    (b"x-sql-queries", str(summary["queries"]).encode()),
+                    (b"x-sql-time-ms", str(summary["sql_ms"]).encode()),
+                    (b"x-sql-n1", str(len(summary["n_plus_one"])).encode()),
+                ]
+            await send(message)
+
+        token = current_log.set(log)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_log.reset(token)
+            profile = self._record(scope, request_id, status_code, time.perf_counter() - start, log)
+
+        if _enforce_budgets and profile["over_budget"]:
+            raise QueryBudgetExceeded(
+                f"{profile['method']} {profile['route']}: {profile['queries']} SQL upita, "
+                f"budžet {profile['query_budget']}: "
+                + "; ".join(f"{s['count']}x {s['sql'][:120]}" for s in profile["statements"])
+            )
+
+    def _record(
+        self, scope, request_id: str, status_code: int, elapsed: float, log: QueryLog
+    ) -> Dict[str, Any]:
+        route = scope.get("route")
+        budget = getattr(getattr(route, "endpoint", None), "__query_budget__", None)
+        summary = log.summary(self.n_plus_one_threshold)
+        profile = {
+            "request_id": request_id,
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": getattr(route, "path", None),
+            "status": status_code,
+            "duration_ms": round(elapsed * 1000, 3),
+            "query_budget": budget,
+            "over_budget": budget is not None and summary["queries"] > budget,
+            **summary,
+        }
+        self.store.add(profile)
+
+        if profile["n_plus_one"]:
+            logger.warning(
+                f"N+1 upiti u {profile['method']} {profile['path']}: "
+                + "; ".join(f"{s['count']}x {s['sql'][:120]}" for s in profile["n_plus_one"])
+            )
+        if profile["over_budget"]:
+            logger.warning(
+                f"{profile['method']} {profile['path']}: {summary['queries']} SQL upita "
+                f"(budžet {budget}, request {request_id})"
+            )
+        return profile
+
+
+# Globalna instanca skladišta profila
+profile_store = ProfileStore(settings.SQL_PROFILER_MAX_PROFILES)
@@ -0,0 +1,65 @@
+"""
+Normalizacija teksta za pretragu
+Ćirilica -> latinica, bez dijakritika, mala slova
+"""
+import re
+import unicodedata
+from typing import List, Optional
+
+# Srpska ćirilica u latinicu bez dijakritika (Изложба -> izlozba)
+_CIRILICA = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "ђ": "dj", "е": "e",
+    "ж": "z", "з": "z", "и": "i", "ј": "j", "к": "k", "л": "l", "љ": "lj",
+    "м": "m", "н": "n", "њ": "nj", "о": "o", "п": "p", "р": "r", "с": "s",
+    "т": "t", "ћ": "c", "у": "u", "ф": "f", "х": "h", "ц": "c", "ч": "c",
+    "џ": "dz", "ш": "s",
+}
+# Slova koja NFKD ne razlaže na osnovno slovo + dijakritik
+_LATINICA = {"đ": "dj", "ß": "ss", "æ": "ae", "ø": "o", "ł": "l"}
+_PRESLOVLJAVANJE = str.maketrans({**_CIRILICA, **_LATINICA})
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Separator polja u dokumentu za pretragu (naslov | kratak opis | opis)
+SEPARATOR_POLJA = " | "
+
+
+def normalize(text: Optional[str]) -> str:
+    """
+    Normalizuje tekst za poređenje: "Изложба", "Izložba" i "IZLOZBA"
+    daju isti rezultat ("izlozba").
+
+    Args:
+        text: Proizvoljan tekst
+
+    Returns:
+        Normalizovan tekst
+    """
+    if not text:
+        return ""
+    text = text.lower().translate(_PRESLOVLJAVANJE)
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Deli normalizovan tekst na reči (samo a-z i 0-9)"""
+    return _TOKEN.findall(normalize(text))
+
+
+def search_key(text: Optional[str]) -> str:
+    """
+    Ključ za pretragu: normalizovane reči razdvojene razmakom
+    ("Нови Сад" -> "novi sad"). Čuva se u indeksiranim kolonama.
+    """
+    return " ".join(tokenize(text))
+
+
+def search_document(*fields: Optional[str]) -> str:
+    """
+    Pravi dokument za pretragu od polja po opadajućoj težini.
+
+    Polja su normalizovana i razdvojena sa " | ", pa se na PostgreSQL-u
+    mogu izdvojiti sa split_part i dobiti težine A, B, C.
+    """
+    return SEPARATOR_POLJA.join(search_key(field) for field in fields)
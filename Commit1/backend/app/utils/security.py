@@ -2,14 +2,27 @@
 Sigurnosne funkcije
 Heširanje lozinki i JWT token operacije
 """
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Optional, Tuple
+from fastapi import HTTPException, status
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.config import settings
 
 # Kontekst za heširanje lozinki (bcrypt)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
+
+
+def _truncate_password(password: str) -> str:
+    """Bcrypt ima limit od 72 bajta, skratimo ako je potrebno"""
+    password_bytes = password.encode('utf-8')[:72]
+    return password_bytes.decode('utf-8', errors='ignore')
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -36,10 +49,81 @@ def get_password_hash(password: str) -> str:
     Returns:
         Heširana lozinka
     """
-    # Bcrypt ima limit od 72 bajta, skratimo ako je potrebno
-    password_bytes = password.encode('utf-8')[:72]
-    password_truncated = password_bytes.decode('utf-8', errors='ignore')
-    return pwd_context.hash(password_truncated)
+    return pwd_context.hash(_truncate_password(password))
+
+
+class PasswordHasher:
+    """
+    Izvršava bcrypt van event loop-a, u ograničenom pool-u niti.
+    
+    bcrypt oslobađa GIL, pa niti rade paralelno dok event loop nastavlja
+    sa ostalim zahtevima. Kada red čekanja premaši max_queue, zahtev se
+    odbija sa 503 umesto da se gomila (zaštita od navale prijava).
+    """
+    
+    def __init__(self, workers: int = 4, max_queue: int = 64):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.pending = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+    
+    @property
+    def queue_depth(self) -> int:
+        """Broj zahteva koji čekaju na slobodnu nit"""
+        return max(0, self.pending - self.workers)
+    
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self.queue_depth >= self.max_queue:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server je trenutno preopterećen, pokušajte ponovo",
+                headers={"Retry-After": "1"},
+            )
+        
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="lozinke"
+            )
+        
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self.pending -= 1
+    
+    async def hash(self, password: str) -> str:
+        """Asinhrona varijanta get_password_hash"""
+        return await self._run(get_password_hash, password)
+    
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Verifikuje lozinku i, ako je heš zastareo (npr. promenjen
+        BCRYPT_ROUNDS), vraća nov heš za upis u bazu.
+        
+        Returns:
+            (da li se lozinke poklapaju, nov heš ili None)
+        """
+        return await self._run(
+            pwd_context.verify_and_update,
+            _truncate_password(plain_password),
+            hashed_password
+        )
+    
+    def shutdown(self) -> None:
+        """Gasi pool niti (ponovo se kreira pri sledećem pozivu)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+# Globalna instanca za heširanje lozinki
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE
+)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -0,0 +1,67 @@
+"""
+Keš autentifikovanih korisnika
+Izbegava upit za korisnika na svakom zahtevu sa JWT tokenom
+
+Token nema verziju: promena lozinke ne poništava već izdate tokene - oni
+važe do isteka (ACCESS_TOKEN_EXPIRE_MINUTES). Deaktiviran korisnik se
+odbija odmah u procesu koji je izvršio izmenu (invalidate), a u ostalim
+procesima najkasnije posle AUTH_CACHE_TTL_SECONDS.
+"""
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from app.config import settings
+from app.schemas.korisnik import TrenutniKorisnik
+
+
+class UserCache:
+    """
+    Ograničen TTL/LRU keš aktivnih korisnika po ID-u.
+
+    Čuva TrenutniKorisnik (nepromenljiv, bez heša lozinke), pa se isti
+    objekat bezbedno deli između zahteva. Izmene korisnika moraju pozvati
+    invalidate; kratak TTL pokriva ostale procese.
+    """
+
+    def __init__(self, ttl: int = 30, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, Tuple[float, TrenutniKorisnik]]" = OrderedDict()
+
+    def get(self, user_id: int) -> Optional[TrenutniKorisnik]:
+        """Vraća keširanog korisnika ili None"""
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+
+        expires_at, korisnik = entry
+        if expires_at < time.monotonic():
+            del self._entries[user_id]
+            return None
+
+        self._entries.move_to_end(user_id)
+        return korisnik
+
+    def set(self, korisnik: TrenutniKorisnik) -> None:
+        """Kešira korisnika"""
+        if self.ttl <= 0:
+            return
+        self._entries[korisnik.id_korisnik] = (time.monotonic() + self.ttl, korisnik)
+        self._entries.move_to_end(korisnik.id_korisnik)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        """Uklanja korisnika iz keša (posle izmene ili brisanja)"""
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        """Briše ceo keš"""
+        self._entries.clear()
+
+
+# Globalna instanca keša korisnika
+user_cache = UserCache(
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES
+)
@@ -0,0 +1,118 @@
+"""
+Benchmark propusnosti istovremenih zahteva - sinhrona vs async sesija
+Pokreni sa: python benchmarks/bench_async_db.py [--requests 200] [--concurrency 50]
+
+Poredi stari obrazac (blokirajući Session upit u async def handleru) sa
+AsyncSession iz get_db. Oba endpointa izvršavaju isti spor upit nad bazom
+iz DATABASE_URL; sa sinhronom sesijom event loop čeka svaki upit, pa se
+istovremeni zahtevi izvršavaju jedan po jedan.
+
+Pored propusnosti meri se i najveće kašnjenje event loop-a za vreme
+opterećenja - koliko dugo proces nije mogao da odgovori ni na jedan drugi
+zahtev. SQLite upit troši CPU u istom procesu, pa je razlika u propusnosti
+vidljiva tek na PostgreSQL-u (pg_sleep); kašnjenje loop-a se vidi na obe.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import statistics
+import time
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import SessionLocal, async_engine, engine, get_db
+
+
+def spor_upit():
+    """Upit od nekoliko desetina milisekundi (bez tabela aplikacije)"""
+    if engine.dialect.name == "postgresql":
+        return text("SELECT pg_sleep(0.02)")
+    return text(
+        "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 100000) "
+        "SELECT count(*) FROM c"
+    )
+
+
+bench = FastAPI()
+
+
+@bench.get("/sync")
+async def sync_handler():
+    """Pre: sinhrona sesija blokira event loop dok traje upit"""
+    db = SessionLocal()
+    try:
+        db.execute(spor_upit()).scalar()
+    finally:
+        db.close()
+    return {"ok": True}
+
+
+@bench.get("/async")
+async def async_handler(db: AsyncSession = Depends(get_db)):
+    """Posle: AsyncSession - event loop opslužuje druge zahteve dok upit traje"""
+    await db.execute(spor_upit())
+    return {"ok": True}
+
+
+async def run_load(path: str, requests: int, concurrency: int) -> dict:
+    """Šalje requests zahteva sa najviše concurrency istovremenih"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    lags = []
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=bench), base_url="http://bench"
+    ) as client:
+        async def one() -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(path)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        async def probe() -> None:
+            while True:
+                expected = time.perf_counter() + 0.01
+                await asyncio.sleep(0.01)
+                lags.append(time.perf_counter() - expected)
+
+        await client.get(path)  # zagrevanje pool-a
+        prober = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+        prober.cancel()
+
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "lag_max_ms": max(lags, default=elapsed) * 1000,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    print(f"Baza: {engine.dialect.name}, {args.requests} zahteva, {args.concurrency} istovremeno")
+    print("=" * 50)
+    try:
+        for naziv, path in (("sinhrona sesija (pre)", "/sync"), ("AsyncSession (posle)", "/async")):
+            r = await run_load(path, args.requests, args.concurrency)
+            print(
+                f"{naziv:24} {r['rps']:8.1f} req/s   p50 {r['p50_ms']:7.1f} ms   "
+                f"p95 {r['p95_ms']:7.1f} ms   loop lag max {r['lag_max_ms']:7.1f} ms"
+            )
+    finally:
+        await async_engine.dispose()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Propusnost: sinhrona vs async sesija")
+    parser.add_argument("--requests", type=int, default=200, help="Ukupan broj zahteva")
+    parser.add_argument("--concurrency", type=int, default=50, help="Broj istovremenih zahteva")
+    asyncio.run(main(parser.parse_args()))
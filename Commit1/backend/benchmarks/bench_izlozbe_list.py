@@ -0,0 +1,153 @@
+"""
+Benchmark liste izložbi - pune izložbe vs kartice
+Pokreni sa: python benchmarks/bench_izlozbe_list.py [--izlozbe 1000] [--slike 50] [--per-page 50]
+
+Puni privremenu SQLite bazu sa izlozbe izložbi (dug opis) i po slike
+slika, pa prolazi kroz sve strane liste na tri načina:
+
+- pune izložbe (pre): opis + cela galerija svake izložbe (IzlozbaResponse)
+- GET /api/izlozbe/?include=slike: kartice sa galerijom, bez opisa
+- GET /api/izlozbe/: kartice bez galerije i opisa (podrazumevano)
+
+Keš odgovora se prazni pre svakog zahteva - meri se upit i serijalizacija.
+"""
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_TMP = tempfile.mkdtemp(prefix="izlozbe-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'bench.db')}"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ["IMAGE_METADATA_ENABLED"] = "false"
+os.environ["SQL_PROFILER_ENABLED"] = "false"
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+from datetime import date, datetime, timedelta
+from typing import List
+import httpx
+from sqlalchemy import insert, select
+from sqlalchemy.orm import joinedload, selectinload
+from app.database import AsyncSessionLocal, Base, SessionLocal, async_engine, engine
+from app.main import app
+from app.models.izlozba import Izlozba
+from app.models.lokacija import Lokacija
+from app.models.slika import Slika
+from app.schemas.izlozba import IzlozbaResponse
+from app.utils.cache import response_cache
+
+OPIS = "Dug opis izložbe sa istorijom umetnika i kontekstom dela. " * 40
+
+
+def pripremi(broj_izlozbi: int, broj_slika: int) -> None:
+    """Izložbe i slike se upisuju grupnim INSERT-om (bez ORM objekata)"""
+    Base.metadata.create_all(engine)
+    danas = date.today()
+    sada = datetime.utcnow()
+    with SessionLocal() as db:
+        lokacija = Lokacija(naziv="Galerija", adresa="Knez Mihailova 1", grad="Beograd")
+        db.add(lokacija)
+        db.flush()
+        db.execute(insert(Izlozba), [
+            {
+                "naslov": f"Izložba {i}", "slug": f"izlozba-{i}", "opis": OPIS,
+                "kratak_opis": "Kratak opis", "id_lokacija": lokacija.id_lokacija,
+                "datum_pocetka": danas - timedelta(days=i % 30),
+                "datum_zavrsetka": danas + timedelta(days=30), "kapacitet": 100,
+                "prodato_karata": 0, "aktivan": True, "objavljeno": True, "datum_kreiranja": sada,
+            }
+            for i in range(broj_izlozbi)
+        ])
+        ids = db.scalars(select(Izlozba.id_izlozba)).all()
+        for id_izlozba in ids:
+            db.execute(insert(Slika), [
+                {
+                    "id_izlozba": id_izlozba, "slika": f"https://example.com/{id_izlozba}/{j}.jpg",
+                    "naslov": f"Slika {j}", "opis": "Opis slike", "fotograf": "Fotograf",
+                    "redosled": j, "istaknuta": False, "naslovna": False, "datum_otpremanja": sada,
+                }
+                for j in range(broj_slika)
+            ])
+        db.commit()
+
+
+async def pune_izlozbe(strana: int, per_page: int) -> bytes:
+    """Pre: lista je vraćala pune izložbe (opis + galerija)"""
+    async with AsyncSessionLocal() as db:
+        izlozbe = (await db.scalars(
+            select(Izlozba)
+            .options(joinedload(Izlozba.lokacija), joinedload(Izlozba.slika_naslovna), selectinload(Izlozba.slike))
+            .order_by(Izlozba.datum_pocetka.desc(), Izlozba.id_izlozba.desc())
+            .offset((strana - 1) * per_page).limit(per_page)
+        )).all()
+        return json.dumps(
+            [IzlozbaResponse.model_validate(izlozba).model_dump(mode="json") for izlozba in izlozbe]
+        ).encode()
+
+
+async def izmeri(strane: int, per_page: int, zahtev) -> dict:
+    """Prolazi kroz sve strane i meri vreme i veličinu odgovora"""
+    vremena: List[float] = []
+    velicine: List[int] = []
+    for strana in range(1, strane + 1):
+        response_cache.backend.clear()
+        start = time.perf_counter()
+        telo = await zahtev(strana)
+        vremena.append(time.perf_counter() - start)
+        velicine.append(len(telo))
+    return {
+        "p50_ms": statistics.median(vremena) * 1000,
+        "max_ms": max(vremena) * 1000,
+        "kb": statistics.mean(velicine) / 1024,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    # Log svakog zahteva i pool-a bi merio ispis, ne listu
+    logging.disable(logging.INFO)
+    pripremi(args.izlozbe, args.slike)
+    strane = (args.izlozbe + args.per_page - 1) // args.per_page
+
+    print(f"{args.izlozbe} izložbi x {args.slike} slika, {strane} strana po {args.per_page}")
+    print("=" * 70)
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench"
+        ) as client:
+            async def api(params):
+                async def zahtev(strana: int) -> bytes:
+                    response = await client.get(
+                        "/api/izlozbe/", params={**params, "page": strana, "per_page": args.per_page}
+                    )
+                    response.raise_for_status()
+                    return response.content
+                return zahtev
+
+            varijante = (
+                ("pune izložbe (pre)", lambda strana: pune_izlozbe(strana, args.per_page)),
+                ("kartice + galerija", await api({"include": "slike"})),
+                ("kartice (posle)", await api({})),
+            )
+            for naziv, zahtev in varijante:
+                await zahtev(1)  # zagrevanje
+                r = await izmeri(strane, args.per_page, zahtev)
+                print(
+                    f"{naziv:20} p50 {r['p50_ms']:7.1f} ms   max {r['max_ms']:7.1f} ms   "
+                    f"{r['kb']:8.1f} KB po strani"
+                )
+    finally:
+        await async_engine.dispose()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lista izložbi: pune izložbe vs kartice")
+    parser.add_argument("--izlozbe", type=int, default=1000, help="Broj izložbi")
+    parser.add_argument("--slike", type=int, default=50, help="Broj slika po izložbi")
+    parser.add_argument("--per-page", type=int, default=50, help="Izložbi po strani (najviše 50)")
+    asyncio.run(main(parser.parse_args()))
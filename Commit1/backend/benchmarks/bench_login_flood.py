@@ -0,0 +1,143 @@
+"""
+Benchmark kašnjenja nepovezanog endpointa za vreme navale prijava
+Pokreni sa: python benchmarks/bench_login_flood.py [--logins 100] [--concurrency 50]
+
+Dok se šalje logins istovremenih POST /api/auth/login, drugi klijent
+svakih 10 ms poziva GET /health/live i meri njegovo kašnjenje. Poredi
+bcrypt proveru na event loop-u (stari obrazac - svaki login zaustavlja
+sve ostale zahteve) sa PasswordHasher-om (pool niti, ograničen red koji
+višak odbija sa 503).
+
+Radi nad privremenom SQLite bazom (promenljive okruženja se postavljaju
+pre importa aplikacije), pa ne dira podatke iz DATABASE_URL. Broj rundi
+bcrypt-a je BCRYPT_ROUNDS iz podešavanja.
+"""
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_TMP = tempfile.mkdtemp(prefix="izlozbe-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'bench.db')}"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ["IMAGE_METADATA_ENABLED"] = "false"
+os.environ["SQL_PROFILER_ENABLED"] = "false"
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from collections import Counter
+from typing import Optional, Tuple
+import httpx
+from app.config import settings
+from app.database import Base, SessionLocal, async_engine, engine
+from app.main import app
+from app.models.korisnik import Korisnik
+from app.utils.security import get_password_hash, password_hasher, pwd_context, _truncate_password
+
+LOZINKA = "lozinka123"
+
+
+def pripremi(broj: int) -> None:
+    """Kreira broj korisnika sa istom lozinkom (jedan bcrypt heš)"""
+    Base.metadata.create_all(engine)
+    hes = get_password_hash(LOZINKA)
+    with SessionLocal() as db:
+        db.add_all(
+            Korisnik(
+                username=f"posetilac{i}", email=f"posetilac{i}@bench.rs", lozinka=hes,
+                ime="Posetilac", prezime="Bench", aktivan=True
+            )
+            for i in range(broj)
+        )
+        db.commit()
+
+
+async def verify_na_loop_u(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Pre: bcrypt se izvršava direktno u handleru i blokira event loop"""
+    return pwd_context.verify_and_update(_truncate_password(plain_password), hashed_password)
+
+
+async def run_flood(logins: int, concurrency: int) -> dict:
+    """Navala prijava uz merenje kašnjenja /health/live"""
+    semaphore = asyncio.Semaphore(concurrency)
+    statusi: Counter = Counter()
+    latencies = []
+
+    # Greška aplikacije (npr. SQLite "database is locked" dok je loop blokiran) je 500, ne prekid
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app, raise_app_exceptions=False), base_url="http://bench"
+    ) as client:
+        async def login(i: int) -> None:
+            async with semaphore:
+                response = await client.post(
+                    "/api/auth/login", data={"username": f"posetilac{i}", "password": LOZINKA}
+                )
+                statusi[response.status_code] += 1
+
+        async def probe() -> None:
+            # Kašnjenje se meri od planiranog trenutka slanja - zahtev koji
+            # nije mogao da krene jer je loop blokiran se računa kao spor
+            planirano = time.perf_counter()
+            while True:
+                await asyncio.sleep(max(0.0, planirano - time.perf_counter()))
+                (await client.get("/health/live")).raise_for_status()
+                latencies.append(time.perf_counter() - planirano)
+                planirano = max(planirano + 0.01, time.perf_counter())
+
+        await client.get("/health/live")  # zagrevanje
+        prober = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(logins)))
+        elapsed = time.perf_counter() - start
+        prober.cancel()
+        await asyncio.gather(prober, return_exceptions=True)
+
+    latencies.sort()
+    return {
+        "logins_s": statusi[200] / elapsed,
+        "odbijeno": statusi[503],
+        "greske": statusi[500],
+        "uzoraka": len(latencies),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[max(0, int(len(latencies) * 0.99) - 1)] * 1000,
+        "max_ms": latencies[-1] * 1000,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    # Log svakog zahteva i pool-a bi merio ispis, ne prijave (greške se broje kao 500)
+    logging.disable(logging.ERROR)
+    pripremi(args.logins)
+
+    print(
+        f"{args.logins} prijava, {args.concurrency} istovremeno, bcrypt {settings.BCRYPT_ROUNDS} rundi, "
+        f"{password_hasher.workers} niti, red {password_hasher.max_queue}"
+    )
+    print("=" * 90)
+    try:
+        for naziv, na_loop_u in (("bcrypt na loop-u (pre)", True), ("PasswordHasher (posle)", False)):
+            if na_loop_u:
+                password_hasher.verify_and_update = verify_na_loop_u
+            try:
+                r = await run_flood(args.logins, args.concurrency)
+            finally:
+                password_hasher.__dict__.pop("verify_and_update", None)
+            print(
+                f"{naziv:24} {r['logins_s']:6.1f} login/s   503: {r['odbijeno']:3}   500: {r['greske']:3}   "
+                f"/health/live ({r['uzoraka']} uzoraka) p50 {r['p50_ms']:7.1f} ms   "
+                f"p99 {r['p99_ms']:7.1f} ms   max {r['max_ms']:7.1f} ms"
+            )
+    finally:
+        password_hasher.shutdown()
+        await async_engine.dispose()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kašnjenje za vreme navale prijava: bcrypt na loop-u vs pool")
+    parser.add_argument("--logins", type=int, default=100, help="Broj prijava")
+    parser.add_argument("--concurrency", type=int, default=50, help="Broj istovremenih prijava")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,160 @@
+"""
+Benchmark validacije QR karata - skeniranja u sekundi
+Pokreni sa: python benchmarks/bench_qr_validation.py [--tickets 2000] [--batch 200]
+
+Poredi potpisane karte (K1., HMAC provera potpisa) sa starim JSON kartama
+(bez potpisa - samo parsiranje). Meri se:
+
+- dekodovanje karte bez baze (decode_qr_data) - trošak provere potpisa
+- POST /api/prijave/validate/batch - dekodovanje i uslovni UPDATE u grupama
+
+Radi nad privremenom SQLite bazom (promenljive okruženja se postavljaju
+pre importa aplikacije), pa ne dira podatke iz DATABASE_URL.
+"""
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_TMP = tempfile.mkdtemp(prefix="izlozbe-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'bench.db')}"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ["IMAGE_METADATA_ENABLED"] = "false"
+os.environ["SQL_PROFILER_ENABLED"] = "false"
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from datetime import date, timedelta
+from typing import Dict, List
+import httpx
+from sqlalchemy import update
+from app.database import Base, SessionLocal, async_engine, engine
+from app.main import app
+from app.models.izlozba import Izlozba
+from app.models.korisnik import Korisnik
+from app.models.lokacija import Lokacija
+from app.models.prijava import Prijava
+from app.services.qr_service import decode_qr_data, generate_qr_data
+from app.utils.security import create_access_token
+
+
+def pripremi(broj: int) -> Dict[str, List[str]]:
+    """
+    Kreira dve izložbe sa po broj prijava - jedna sa potpisanim, druga sa
+    starim JSON kartama.
+
+    Returns:
+        Dict naziv varijante -> QR kodovi
+    """
+    Base.metadata.create_all(engine)
+    danas = date.today()
+    with SessionLocal() as db:
+        lokacija = Lokacija(naziv="Galerija", adresa="Knez Mihailova 1", grad="Beograd")
+        db.add(lokacija)
+        db.flush()
+        izlozbe = [
+            Izlozba(
+                naslov=naziv, slug=naziv, id_lokacija=lokacija.id_lokacija,
+                datum_pocetka=danas, datum_zavrsetka=danas + timedelta(days=1),
+                kapacitet=broj, prodato_karata=broj, objavljeno=True
+            )
+            for naziv in ("potpisane", "json")
+        ]
+        korisnici = [
+            Korisnik(
+                username=f"posetilac{i}", email=f"posetilac{i}@bench.rs", lozinka="-",
+                ime="Posetilac", prezime="Bench", aktivan=True
+            )
+            for i in range(broj)
+        ]
+        db.add_all(izlozbe + korisnici)
+        db.flush()
+
+        prijave = [
+            Prijava(id_korisnik=korisnik.id_korisnik, id_izlozba=izlozba.id_izlozba, broj_karata=1)
+            for izlozba in izlozbe for korisnik in korisnici
+        ]
+        db.add_all(prijave)
+        db.flush()
+
+        kodovi: Dict[str, List[str]] = {"potpisane": [], "json": []}
+        for prijava in prijave:
+            if prijava.id_izlozba == izlozbe[0].id_izlozba:
+                prijava.qr_kod = generate_qr_data(
+                    prijava.id_prijava, prijava.id_korisnik, prijava.id_izlozba, prijava.broj_karata
+                )
+                kodovi["potpisane"].append(prijava.qr_kod)
+            else:
+                prijava.qr_kod = json.dumps({
+                    "prijava_id": prijava.id_prijava,
+                    "korisnik_id": prijava.id_korisnik,
+                    "izlozba_id": prijava.id_izlozba,
+                    "broj_karata": prijava.broj_karata,
+                })
+                kodovi["json"].append(prijava.qr_kod)
+        db.commit()
+    return kodovi
+
+
+def bench_dekodovanje(kodovi: List[str], ponavljanja: int = 10) -> float:
+    """Dekodovanja u sekundi (bez baze)"""
+    start = time.perf_counter()
+    for _ in range(ponavljanja):
+        for kod in kodovi:
+            decode_qr_data(kod)
+    return len(kodovi) * ponavljanja / (time.perf_counter() - start)
+
+
+async def bench_batch(kodovi: List[str], velicina: int, headers: Dict[str, str]) -> float:
+    """Skeniranja u sekundi kroz /api/prijave/validate/batch (sve karte validne)"""
+    with SessionLocal() as db:
+        db.execute(update(Prijava).values(validirano=False))
+        db.commit()
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+        start = time.perf_counter()
+        for i in range(0, len(kodovi), velicina):
+            response = await client.post(
+                "/api/prijave/validate/batch", json={"qr_kodovi": kodovi[i:i + velicina]}, headers=headers
+            )
+            response.raise_for_status()
+            assert response.json()["validno"] == len(kodovi[i:i + velicina])
+        return len(kodovi) / (time.perf_counter() - start)
+
+
+async def main(args: argparse.Namespace) -> None:
+    # Log svakog zahteva i pool-a bi merio ispis, ne validaciju
+    logging.disable(logging.INFO)
+    kodovi = pripremi(args.tickets)
+    with SessionLocal() as db:
+        admin = Korisnik(
+            username="admin", email="admin@bench.rs", lozinka="-",
+            ime="Admin", prezime="Bench", super_korisnik=True, aktivan=True
+        )
+        db.add(admin)
+        db.commit()
+        token = create_access_token({"sub": admin.username, "user_id": admin.id_korisnik})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    print(f"{args.tickets} karata po varijanti, grupe od {args.batch}")
+    print("=" * 60)
+    try:
+        for naziv, opis in (("potpisane", "potpisane (HMAC)"), ("json", "JSON bez potpisa")):
+            dekodovanje = bench_dekodovanje(kodovi[naziv])
+            batch = await bench_batch(kodovi[naziv], args.batch, headers)
+            print(f"{opis:18} dekodovanje {dekodovanje:10.0f}/s   validate/batch {batch:8.0f} skeniranja/s")
+    finally:
+        await async_engine.dispose()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validacija QR karata: skeniranja u sekundi")
+    parser.add_argument("--tickets", type=int, default=2000, help="Broj karata po varijanti")
+    parser.add_argument("--batch", type=int, default=200, help="Karata po zahtevu (najviše 500)")
+    asyncio.run(main(parser.parse_args()))
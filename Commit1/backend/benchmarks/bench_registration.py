@@ -0,0 +1,149 @@
+"""
+Benchmark kašnjenja prijave na izložbu pod opterećenjem
+Pokreni sa: python benchmarks/bench_registration.py [--requests 300] [--concurrency 50]
+
+Poredi POST /api/prijave/ kada se QR slika renderuje u toku zahteva
+(stari obrazac - PIL na event loop-u) sa renderovanjem u qr_worker-u
+posle commit-a. Za oba slučaja se meri p50/p95/p99 kašnjenje prijave i
+ukupno vreme dok sve QR slike nisu gotove.
+
+Radi nad privremenom SQLite bazom (promenljive okruženja se postavljaju
+pre importa aplikacije), pa ne dira podatke iz DATABASE_URL.
+"""
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_TMP = tempfile.mkdtemp(prefix="izlozbe-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'bench.db')}"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ["IMAGE_METADATA_ENABLED"] = "false"
+os.environ["SQL_PROFILER_ENABLED"] = "false"
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from datetime import date, timedelta
+from typing import Dict, List
+import httpx
+from app.database import Base, SessionLocal, async_engine, engine
+from app.main import app
+from app.models.izlozba import Izlozba
+from app.models.korisnik import Korisnik
+from app.models.lokacija import Lokacija
+from app.services.qr_service import generate_qr_data, render_qr_image
+from app.services.qr_worker import qr_worker
+from app.utils.security import create_access_token
+
+
+def pripremi(broj: int) -> List[Dict[str, str]]:
+    """
+    Kreira broj posetilaca.
+
+    Returns:
+        Authorization header-i posetilaca
+    """
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        korisnici = [
+            Korisnik(
+                username=f"posetilac{i}", email=f"posetilac{i}@bench.rs", lozinka="-",
+                ime="Posetilac", prezime="Bench", aktivan=True
+            )
+            for i in range(broj)
+        ]
+        db.add_all(korisnici)
+        db.commit()
+        return [
+            {"Authorization": f"Bearer {create_access_token({'sub': k.username, 'user_id': k.id_korisnik})}"}
+            for k in korisnici
+        ]
+
+
+def nova_izlozba(naziv: str, kapacitet: int) -> int:
+    """Objavljena izložba u toku sa dovoljno mesta za sve prijave"""
+    danas = date.today()
+    with SessionLocal() as db:
+        lokacija = Lokacija(naziv="Galerija", adresa="Knez Mihailova 1", grad="Beograd")
+        izlozba = Izlozba(
+            naslov=naziv, slug=naziv, lokacija=lokacija,
+            datum_pocetka=danas, datum_zavrsetka=danas + timedelta(days=10),
+            kapacitet=kapacitet, objavljeno=True
+        )
+        db.add(izlozba)
+        db.commit()
+        return izlozba.id_izlozba
+
+
+def render_u_zahtevu(prijava_id: int) -> None:
+    """Pre: QR slika (iste veličine kao prava karta) se renderuje pre odgovora"""
+    render_qr_image(generate_qr_data(prijava_id, 0, 0, 1))
+
+
+async def run_load(id_izlozba: int, korisnici: List[Dict[str, str]], concurrency: int) -> dict:
+    """Šalje po jednu prijavu za svakog korisnika, najviše concurrency istovremeno"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+        async def one(headers: Dict[str, str]) -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(
+                    "/api/prijave/", json={"id_izlozba": id_izlozba, "broj_karata": 1}, headers=headers
+                )
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(headers) for headers in korisnici))
+        elapsed = time.perf_counter() - start
+        # Sve QR slike gotove (u pozadini)
+        await qr_worker.shutdown()
+        total = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": len(korisnici) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "ukupno_s": total,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    # Log svakog zahteva i pool-a bi merio ispis, ne prijavu
+    logging.disable(logging.INFO)
+    korisnici = pripremi(args.requests)
+
+    print(f"{args.requests} prijava, {args.concurrency} istovremeno")
+    print("=" * 70)
+    try:
+        for naziv, u_zahtevu in (("QR u zahtevu (pre)", True), ("qr_worker (posle)", False)):
+            id_izlozba = nova_izlozba(f"bench-{int(u_zahtevu)}", args.requests)
+            if u_zahtevu:
+                qr_worker.submit = render_u_zahtevu
+            try:
+                r = await run_load(id_izlozba, korisnici, args.concurrency)
+            finally:
+                qr_worker.__dict__.pop("submit", None)
+            print(
+                f"{naziv:20} {r['rps']:7.1f} req/s   p50 {r['p50_ms']:7.1f} ms   "
+                f"p95 {r['p95_ms']:7.1f} ms   p99 {r['p99_ms']:7.1f} ms   QR gotovi za {r['ukupno_s']:5.1f} s"
+            )
+    finally:
+        await async_engine.dispose()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kašnjenje prijave: QR u zahtevu vs qr_worker")
+    parser.add_argument("--requests", type=int, default=300, help="Broj prijava po varijanti")
+    parser.add_argument("--concurrency", type=int, default=50, help="Broj istovremenih prijava")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,56 @@
+"""
+Skripta za grupni uvoz radova sa Art Institute of Chicago API
+Pokreni sa: python import_artic.py --ids 27992,28560 [--izlozba 1]
+        ili: python import_artic.py --search monet --limit 200
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import asyncio
+from collections import Counter
+from app.database import AsyncSessionLocal, async_engine
+from app.services import import_service
+from app.services.artic_service import artic_client, ArticUnavailable
+
+
+async def run(args: argparse.Namespace) -> int:
+    """Uvozi radove i ispisuje ishod za svaki"""
+    artwork_ids = [int(x) for x in args.ids.split(",") if x.strip()] if args.ids else None
+    
+    await artic_client.start()
+    try:
+        async with AsyncSessionLocal() as db:
+            rezultati = await import_service.import_artworks(
+                db,
+                artwork_ids=artwork_ids,
+                search=args.search,
+                limit=args.limit,
+                id_izlozba=args.izlozba
+            )
+    except ArticUnavailable as e:
+        print(f"Artic API nije dostupan: {e}")
+        return 1
+    finally:
+        await artic_client.close()
+        await async_engine.dispose()
+    
+    for r in rezultati:
+        slika = f" -> slika {r['id_slika']}" if r["id_slika"] else ""
+        print(f"{r['artwork_id']}: {r['status']}{slika}")
+    
+    ukupno = Counter(r["status"] for r in rezultati)
+    print("=" * 50)
+    print(", ".join(f"{status}: {broj}" for status, broj in ukupno.items()) or "Nema rezultata")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grupni uvoz radova sa Artic API-ja")
+    izvor = parser.add_mutually_exclusive_group(required=True)
+    izvor.add_argument("--ids", help="ID-jevi radova odvojeni zarezom")
+    izvor.add_argument("--search", help="Termin za pretragu")
+    parser.add_argument("--limit", type=int, default=100, help="Broj rezultata pretrage")
+    parser.add_argument("--izlozba", type=int, help="ID izložbe za galeriju")
+    sys.exit(asyncio.run(run(parser.parse_args())))
@@ -0,0 +1,43 @@
+"""
+Skripta za sinhronizaciju lokalnog mirror-a Artic radova
+Pokreni sa: python sync_artic.py                  (inkrementalno, po last_updated)
+        ili: python sync_artic.py --full           (sve stranice API-ja)
+        ili: python sync_artic.py --dump artic-api-data.tar.bz2
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import asyncio
+from app.database import AsyncSessionLocal, async_engine
+from app.services import artic_mirror
+from app.services.artic_service import artic_client, ArticUnavailable
+
+
+async def run(args: argparse.Namespace) -> int:
+    """Pokreće sinhronizaciju i ispisuje broj obrađenih radova"""
+    await artic_client.start()
+    try:
+        async with AsyncSessionLocal() as db:
+            if args.dump:
+                total = await artic_mirror.ingest_dump(db, args.dump)
+            else:
+                total = await artic_mirror.sync_from_api(db, full=args.full)
+    except ArticUnavailable as e:
+        print(f"Artic API nije dostupan: {e}")
+        return 1
+    finally:
+        await artic_client.close()
+        await async_engine.dispose()
+    
+    print(f"Obrađeno radova: {total}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sinhronizacija Artic mirror-a")
+    izvor = parser.add_mutually_exclusive_group()
+    izvor.add_argument("--dump", help="Data dump: direktorijum, tar arhiva ili JSON Lines fajl")
+    izvor.add_argument("--full", action="store_true", help="Puna sinhronizacija sa API-ja")
+    sys.exit(asyncio.run(run(parser.parse_args())))
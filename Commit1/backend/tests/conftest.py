@@ -0,0 +1,92 @@
+"""
+Zajednička podešavanja testova
+Pokreni sa: python -m pytest (iz backend direktorijuma)
+
+Testovi rade nad privremenom SQLite bazom - promenljive okruženja se
+postavljaju pre importa aplikacije.
+"""
+import os
+import sys
+import tempfile
+
+_TMP = tempfile.mkdtemp(prefix="izlozbe-test-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'test.db')}"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ["IMAGE_CACHE_DIR"] = os.path.join(_TMP, "images")
+os.environ["IMAGE_METADATA_ENABLED"] = "false"
+os.environ["ARTIC_MIRROR_SYNC_MINUTES"] = "0"
+# Profiler je uključen da bi pytest plugin proveravao @query_budget endpointa
+os.environ["SQL_PROFILER_ENABLED"] = "true"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import date, timedelta
+from typing import Callable, Dict
+import pytest
+from fastapi.testclient import TestClient
+from app.database import Base, SessionLocal, engine
+from app.main import app
+from app.models.korisnik import Korisnik
+from app.utils.cache import response_cache
+from app.utils.security import create_access_token, get_password_hash
+from app.utils.user_cache import user_cache
+
+pytest_plugins = ["query_budget_plugin"]
+
+# Jedan bcrypt heš za sve test korisnike (heširanje je namerno sporo)
+LOZINKA = "lozinka123"
+_HES_LOZINKE = get_password_hash(LOZINKA)
+
+
+@pytest.fixture
+def client():
+    """Aplikacija nad praznom bazom (lifespan kreira tabele)"""
+    Base.metadata.drop_all(engine)
+    response_cache.backend.clear()
+    user_cache.clear()
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture
+def make_user(client) -> Callable[..., Dict[str, str]]:
+    """Kreira korisnika direktno u bazi i vraća Authorization header"""
+    def factory(username: str, admin: bool = False) -> Dict[str, str]:
+        with SessionLocal() as db:
+            korisnik = Korisnik(
+                username=username, email=f"{username}@test.rs", lozinka=_HES_LOZINKE,
+                ime=username, prezime="Test", super_korisnik=admin, aktivan=True
+            )
+            db.add(korisnik)
+            db.commit()
+            token = create_access_token({"sub": korisnik.username, "user_id": korisnik.id_korisnik})
+        return {"Authorization": f"Bearer {token}"}
+    return factory
+
+
+@pytest.fixture
+def admin(make_user) -> Dict[str, str]:
+    """Authorization header administratora"""
+    return make_user("admin", admin=True)
+
+
+@pytest.fixture
+def izlozba(client, admin) -> Callable[..., dict]:
+    """Kreira objavljenu izložbu koja je u toku (uz novu lokaciju)"""
+    def factory(kapacitet: int = 100, **extra) -> dict:
+        lokacija = client.post("/api/lokacije/", json={
+            "naziv": "Galerija", "adresa": "Knez Mihailova 1", "grad": "Beograd",
+            "g_sirina": 44.8, "g_duzina": 20.46
+        }, headers=admin)
+        assert lokacija.status_code == 201, lokacija.text
+        danas = date.today()
+        data = {
+            "naslov": "Izložba", "slug": f"izlozba-{lokacija.json()['id_lokacija']}",
+            "datum_pocetka": str(danas - timedelta(days=1)),
+            "datum_zavrsetka": str(danas + timedelta(days=10)),
+            "id_lokacija": lokacija.json()["id_lokacija"],
+            "kapacitet": kapacitet, "objavljeno": True, **extra
+        }
+        response = client.post("/api/izlozbe/", json=data, headers=admin)
+        assert response.status_code == 201, response.text
+        return response.json()
+    return factory
@@ -0,0 +1,43 @@
+"""
+Pytest plugin - budžet SQL upita u testovima
+Učitava se sa pytest_plugins = ["query_budget_plugin"] u conftest.py
+(ili pytest -p query_budget_plugin iz direktorijuma tests)
+
+- endpoint sa @query_budget(n) koji u testu izvrši više od n upita obara
+  test (potreban je SQL_PROFILER_ENABLED=true pre importa aplikacije)
+- @pytest.mark.query_budget(n) ograničava upite samog testa (count_queries)
+"""
+import pytest
+from app.config import settings
+from app.utils.profiler import QueryBudgetExceeded, count_queries, enforce_budgets
+
+
+def pytest_configure(config) -> None:
+    config.addinivalue_line(
+        "markers", "query_budget(n): test ne sme izvršiti više od n SQL upita"
+    )
+    enforce_budgets(True)
+
+
+def pytest_report_header(config) -> str:
+    if settings.SQL_PROFILER_ENABLED:
+        return "query budget: endpointi sa @query_budget se proveravaju"
+    return "query budget: SQL_PROFILER_ENABLED nije uključen - proveravaju se samo markeri"
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker("query_budget")
+    if marker is None:
+        return (yield)
+
+    budget = marker.args[0]
+    with count_queries() as log:
+        result = yield
+    if log.count > budget:
+        summary = log.summary(n_plus_one_threshold=2)
+        raise QueryBudgetExceeded(
+            f"{item.nodeid}: {log.count} SQL upita, budžet {budget}: "
+            + "; ".join(f"{s['count']}x {s['sql'][:120]}" for s in summary["statements"])
+        )
+    return result
@@ -0,0 +1,60 @@
+"""
+Lokalni mirror Artic radova
+Punjenje iz data dump-a i inkrementalna sinhronizacija po last_updated
+"""
+import os
+from datetime import datetime
+from app.database import AsyncSessionLocal, SessionLocal
+from app.models.artic_rad import ArticRad
+from app.services import artic_mirror, artic_service
+
+DUMP = os.path.join(os.path.dirname(__file__), "fixtures", "artic_dump.jsonl")
+
+
+def _ingest(client) -> int:
+    async def ingest():
+        async with AsyncSessionLocal() as db:
+            return await artic_mirror.ingest_dump(db, DUMP)
+    return client.portal.call(ingest)
+
+
+def test_dump_se_pretrazuje_bez_api_ja(client, monkeypatch):
+    monkeypatch.setattr(artic_mirror, "_has_data", False)
+
+    async def bez_mreze(*args, **kwargs):
+        raise AssertionError("Mirror ne sme da zove Artic API")
+    monkeypatch.setattr(artic_service, "fetch_artworks", bez_mreze)
+
+    assert _ingest(client) == 4
+
+    # Rad bez slike se ne prikazuje; pretraga bez obzira na velika slova
+    odgovor = client.get("/api/slike/artic", params={"limit": 2}).json()
+    assert [rad["id"] for rad in odgovor["items"]] == [27992, 28560]
+    assert odgovor["pagination"]["total"] == 3
+
+    nadjeni = client.get("/api/slike/artic", params={"search": "GOGH bedroom"}).json()["items"]
+    assert [rad["naslov"] for rad in nadjeni] == ["The Bedroom"]
+    assert nadjeni[0]["slika"].startswith("https://www.artic.edu/iiif/2/25c31d8d")
+
+
+def test_inkrementalna_sinhronizacija_ukljucuje_watermark(client, monkeypatch):
+    _ingest(client)
+    pozivi = []
+
+    async def get_json(path, params, cache=True):
+        pozivi.append(params)
+        # Izmenjen u istoj sekundi kao poslednji rad u mirror-u
+        return {"data": [{
+            "id": 999, "title": "Novi rad", "image_id": "novi",
+            "last_updated": "2024-01-15T10:00:00Z"
+        }]}
+    monkeypatch.setattr(artic_mirror.artic_client, "get_json", get_json)
+
+    async def sync():
+        async with AsyncSessionLocal() as db:
+            return await artic_mirror.sync_from_api(db)
+    assert client.portal.call(sync) == 1
+
+    assert pozivi[0]["query[range][last_updated][gte]"] == "2024-01-15T10:00:00Z"
+    with SessionLocal() as db:
+        assert db.get(ArticRad, 999).poslednja_izmena == datetime(2024, 1, 15, 10)
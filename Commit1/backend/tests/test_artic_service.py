@@ -0,0 +1,124 @@
+"""
+Artic API klijent
+Formatiranje radova, circuit breaker i spajanje istovetnih zahteva
+"""
+import asyncio
+import httpx
+import pytest
+from app.services.artic_service import (
+    IIIF_SIRINA, ArticClient, ArticUnavailable, CircuitBreaker, format_artwork_to_slika
+)
+
+
+class Sat:
+    """Lažni izvor vremena za circuit breaker"""
+
+    def __init__(self):
+        self.sada = 1000.0
+
+    def __call__(self) -> float:
+        return self.sada
+
+
+def test_dimenzije_su_dimenzije_iiif_slike():
+    slika = format_artwork_to_slika({
+        "image_id": "abc", "title": "Rad",
+        "thumbnail": {"width": 3000, "height": 2000, "lqip": "data:image/gif;base64,R0"}
+    })
+    assert slika["slika"].endswith(f"/abc/full/{IIIF_SIRINA},/0/default.jpg")
+    assert (slika["sirina"], slika["visina"]) == (IIIF_SIRINA, 562)
+
+
+def test_bez_dimenzija_originala():
+    slika = format_artwork_to_slika({"image_id": "abc", "thumbnail": {"width": 3000}})
+    assert slika["sirina"] is None and slika["visina"] is None
+
+
+def test_breaker_otvara_i_propusta_jedan_probni_poziv():
+    sat = Sat()
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30, clock=sat)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and not breaker.allow()
+
+    sat.sada += 30
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow() and not breaker.allow()  # samo jedan probni poziv
+
+    # Probni poziv bez ishoda oslobađa mesto sledećem
+    breaker.release()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    sat.sada += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def _klijent(handler, sat):
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30, clock=sat)
+    return ArticClient(transport=httpx.MockTransport(handler), breaker=breaker)
+
+
+def test_prekinut_probni_poziv_oslobadja_breaker():
+    sat = Sat()
+    ishodi = iter([
+        httpx.Response(500),                 # otvara breaker
+        RuntimeError("neočekivana greška"),  # probni poziv bez ishoda
+        asyncio.CancelledError(),            # prekinut probni poziv
+        httpx.Response(200, json={"data": []}),
+    ])
+
+    async def handler(request):
+        ishod = next(ishodi)
+        if isinstance(ishod, BaseException):
+            raise ishod
+        return ishod
+
+    async def scenario():
+        client = _klijent(handler, sat)
+        try:
+            with pytest.raises(ArticUnavailable):
+                await client.get_json("/artworks", {"page": 1})
+            assert client.breaker.state == CircuitBreaker.OPEN
+
+            sat.sada += 30
+            with pytest.raises(RuntimeError):
+                await client.get_json("/artworks", {"page": 2})
+            with pytest.raises(asyncio.CancelledError):
+                await client.get_json("/artworks", {"page": 3})
+            assert await client.get_json("/artworks", {"page": 4}) == {"data": []}
+            assert client.breaker.state == CircuitBreaker.CLOSED
+        finally:
+            await client.close()
+
+    asyncio.run(scenario())
+
+
+def test_istovetni_istovremeni_zahtevi_dele_poziv():
+    pozivi = []
+
+    async def handler(request):
+        pozivi.append(str(request.url))
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"data": [{"id": 1}]})
+
+    async def scenario():
+        client = _klijent(handler, Sat())
+        try:
+            odgovori = await asyncio.gather(
+                *(client.get_json("/artworks", {"page": 1}) for _ in range(5)),
+                client.get_json("/artworks", {"page": 2})
+            )
+            assert all(odgovor == {"data": [{"id": 1}]} for odgovor in odgovori)
+            assert len(pozivi) == 2
+            # Sledeći poziv je iz keša
+            await client.get_json("/artworks", {"page": 1})
+            assert len(pozivi) == 2
+        finally:
+            await client.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,51 @@
+"""
+Keš odgovora javnih ruta
+Invalidacija prostora imena, TTL i LRU memorijskog backend-a
+"""
+import asyncio
+from app.database import SessionLocal
+from app.models.slika import Slika
+from app.utils.cache import MemoryCacheBackend, response_cache
+
+
+def test_invalidacija_prostora_imena(client):
+    assert client.get("/api/slike/").json() == []
+    assert client.get("/api/lokacije/").json() == []
+
+    # Upis mimo API-ja ne invalidira keš - lista je i dalje keširana
+    with SessionLocal() as db:
+        db.add(Slika(slika="https://example.com/1.jpg"))
+        db.commit()
+    assert client.get("/api/slike/").json() == []
+
+    client.portal.call(response_cache.invalidate, "slike", "izlozbe")
+    assert [s["slika"] for s in client.get("/api/slike/").json()] == ["https://example.com/1.jpg"]
+
+
+def test_memorijski_backend_ttl_i_lru():
+    async def scenario():
+        backend = MemoryCacheBackend(max_entries=2)
+        await backend.set("istekao", b"x", ttl=0)
+        await asyncio.sleep(0.01)
+        assert await backend.get("istekao") is None
+
+        await backend.set("a", b"1", ttl=60)
+        await backend.set("b", b"2", ttl=60)
+        assert await backend.get("a") == b"1"  # a je sada skorije korišćen
+        await backend.set("c", b"3", ttl=60)
+        assert await backend.get("b") is None
+        assert await backend.get("a") == b"1" and await backend.get("c") == b"3"
+
+    asyncio.run(scenario())
+
+
+def test_brojaci_odvojeni_od_vrednosti():
+    async def scenario():
+        backend = MemoryCacheBackend(max_entries=1)
+        assert await backend.incr("ver:slike") == 1
+        assert await backend.get("ver:slike") is None
+        await backend.set("ver:slike", b"vrednost", ttl=60)
+        await backend.set("drugi", b"x", ttl=60)  # LRU izbacuje vrednost, ne brojač
+        assert await backend.counter("ver:slike") == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,55 @@
+"""
+Pretraga izložbi u blizini (grid indeks lokacija)
+Indeks mora videti lokaciju tek kada je izmena commit-ovana
+"""
+from app.database import AsyncSessionLocal, SessionLocal
+from app.models.lokacija import Lokacija
+from app.services.geo_service import haversine_km, lokacije_index
+from app.utils.cache import response_cache
+
+BEOGRAD = {"lat": 44.8, "lng": 20.46}
+NOVI_SAD = {"lat": 45.25, "lng": 19.84}
+
+
+def _u_blizini(client, tacka):
+    odgovor = client.get("/api/izlozbe/nearby", params={**tacka, "radius_km": 20})
+    assert odgovor.status_code == 200, odgovor.text
+    return [izlozba["id_izlozba"] for izlozba in odgovor.json()]
+
+
+def test_haversine():
+    assert abs(haversine_km(BEOGRAD["lat"], BEOGRAD["lng"], NOVI_SAD["lat"], NOVI_SAD["lng"]) - 69.2) < 1
+
+
+def test_izmena_lokacije_menja_rezultate(client, izlozba, admin):
+    nova = izlozba()
+    assert _u_blizini(client, BEOGRAD) == [nova["id_izlozba"]]
+    assert _u_blizini(client, NOVI_SAD) == []
+
+    izmena = client.put(f"/api/lokacije/{nova['id_lokacija']}", json={
+        "g_sirina": NOVI_SAD["lat"], "g_duzina": NOVI_SAD["lng"]
+    }, headers=admin)
+    assert izmena.status_code == 200, izmena.text
+
+    assert _u_blizini(client, BEOGRAD) == []
+    assert _u_blizini(client, NOVI_SAD) == [nova["id_izlozba"]]
+
+
+def test_indeks_izgradjen_pre_commit_a_zastareva(client, izlozba):
+    nova = izlozba()
+
+    async def izgradi():
+        lokacije_index.mark_dirty()
+        async with AsyncSessionLocal() as db:
+            await lokacije_index.ensure(db)
+
+    with SessionLocal() as db:
+        lokacija = db.get(Lokacija, nova["id_lokacija"])
+        lokacija.g_sirina, lokacija.g_duzina = NOVI_SAD["lat"], NOVI_SAD["lng"]
+        db.flush()
+        # Drugi zahtev gradi indeks dok izmena još nije commit-ovana
+        client.portal.call(izgradi)
+        db.commit()
+
+    response_cache.backend.clear()
+    assert _u_blizini(client, NOVI_SAD) == [nova["id_izlozba"]]
@@ -0,0 +1,77 @@
+"""
+Liveness i readiness - keširane provere, kritične i informativne zavisnosti
+"""
+import asyncio
+from app.services.artic_service import CircuitBreaker, artic_client
+from app.services.health_service import HealthChecker, health_checker
+
+
+def test_otvoren_artic_breaker_ne_iskljucuje_proces(client, monkeypatch):
+    monkeypatch.setattr(health_checker, "cache_seconds", 0)
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+    monkeypatch.setattr(artic_client, "breaker", breaker)
+
+    odgovor = client.get("/health/ready")
+    assert odgovor.status_code == 200
+    assert odgovor.json()["checks"]["artic"] == {"ok": True, "state": "closed", "failures": 0}
+
+    breaker.record_failure()
+    odgovor = client.get("/health/ready")
+    assert odgovor.status_code == 200, odgovor.text
+    telo = odgovor.json()
+    assert (telo["status"], telo["ready"]) == ("ready", True)
+    assert telo["checks"]["artic"]["ok"] is False
+    assert telo["checks"]["artic"]["state"] == "open"
+    assert telo["checks"]["database"]["ok"] and telo["checks"]["pool"]["ok"]
+
+    # Liveness ne proverava zavisnosti
+    assert client.get("/health/live").json() == {"status": "healthy"}
+
+
+def test_kriticna_provera_i_kes_rezultata():
+    pozivi = {"baza": 0, "spoljni": 0}
+
+    async def baza():
+        pozivi["baza"] += 1
+        raise asyncio.TimeoutError
+
+    async def spoljni():
+        pozivi["spoljni"] += 1
+        raise RuntimeError("nedostupan")
+
+    async def provera(checker):
+        return await asyncio.gather(*(checker.ready() for _ in range(5)))
+
+    checker = HealthChecker(cache_seconds=60)
+    checker.register("spoljni", spoljni, critical=False)
+    rezultati = asyncio.run(provera(checker))
+    assert all(r == {"ready": True, "checks": {"spoljni": {"ok": False, "error": "nedostupan"}}} for r in rezultati)
+
+    async def kriticna():
+        checker = HealthChecker(cache_seconds=60)
+        checker.register("baza", baza)
+        rezultati = await provera(checker)
+        assert all(r == {"ready": False, "checks": {"baza": {"ok": False, "error": "timeout"}}} for r in rezultati)
+        # Istovremeni probe-ovi čekaju istu proveru, a rezultat se kešira
+        assert pozivi == {"baza": 1, "spoljni": 1}
+        await checker.ready()
+        assert pozivi["baza"] == 1
+
+        checker.cache_seconds = 0
+        await checker.ready()
+        assert pozivi["baza"] == 2
+
+    asyncio.run(kriticna())
+
+
+def test_nespremna_baza_vraca_503(client, monkeypatch):
+    checker = HealthChecker(cache_seconds=0)
+
+    async def baza():
+        raise asyncio.TimeoutError
+
+    checker.register("database", baza)
+    monkeypatch.setattr("app.main.health_checker", checker)
+    odgovor = client.get("/health/ready")
+    assert odgovor.status_code == 503
+    assert odgovor.json()["status"] == "not_ready"
@@ -0,0 +1,21 @@
+"""
+Image proxy
+Reference URL -> hash su unosi LRU keša na disku
+"""
+import os
+from app.services.image_proxy import DiskCache, ImageProxy
+
+
+def test_reference_se_cuvaju_i_izbacuju_kao_ostali_unosi(tmp_path):
+    proxy = ImageProxy()
+    proxy.cache = DiskCache(str(tmp_path), max_bytes=200)
+
+    proxy._write_ref("https://example.com/a.jpg", "a" * 64)
+    assert proxy._read_ref("https://example.com/a.jpg") == "a" * 64
+    # Atomski upis - bez zaostalih privremenih fajlova
+    assert not [ime for _, _, imena in os.walk(tmp_path) for ime in imena if ime.startswith(".")]
+
+    for i in range(5):
+        proxy._write_ref(f"https://example.com/{i}.jpg", "b" * 64)
+    assert proxy._read_ref("https://example.com/a.jpg") is None
+    assert proxy.cache.size <= 200
@@ -0,0 +1,156 @@
+"""
+Grupni uvoz radova sa Artic API-ja (POST /api/slike/from-artic/bulk)
+"""
+from typing import Dict, List
+import httpx
+import pytest
+from sqlalchemy import Insert, event, select
+from app.database import SessionLocal, async_engine
+from app.models.slika import Slika
+from app.services import artic_service
+from app.services.artic_service import ARTIC_PAGE_LIMIT, ArticClient, CircuitBreaker, get_image_url
+
+BEZ_SLIKE = 119
+NEPOSTOJECI = 120
+NEDOSTUPNI = 1000  # Artic vraća 500 za grupu u kojoj je
+
+
+def _rad(artwork_id: int) -> dict:
+    # 117 i 118 dele sliku - drugi je duplikat u istom uvozu
+    image_id = None if artwork_id == BEZ_SLIKE else f"img{117 if artwork_id == 118 else artwork_id}"
+    return {
+        "id": artwork_id, "title": f"Rad {artwork_id}", "artist_display": "Umetnik",
+        "description": "Opis rada", "image_id": image_id,
+        "thumbnail": {"width": 1000, "height": 500},
+    }
+
+
+@pytest.fixture
+def artic(client, monkeypatch) -> List[httpx.Request]:
+    """Artic API preko MockTransport-a; vraća listu primljenih zahteva"""
+    zahtevi: List[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        zahtevi.append(request)
+        if request.url.path.endswith("/artworks/search"):
+            if request.url.params["q"] == "nedostupno":
+                return httpx.Response(503)
+            strana, limit = int(request.url.params["page"]), int(request.url.params["limit"])
+            ids = range((strana - 1) * limit + 1, strana * limit + 1)
+            return httpx.Response(200, json={"data": [_rad(i) for i in ids]})
+        ids = [int(i) for i in request.url.params["ids"].split(",")]
+        if NEDOSTUPNI in ids:
+            return httpx.Response(500)
+        return httpx.Response(200, json={"data": [_rad(i) for i in ids if i != NEPOSTOJECI]})
+
+    klijent = ArticClient(
+        transport=httpx.MockTransport(handler),
+        breaker=CircuitBreaker(failure_threshold=100, reset_seconds=30)
+    )
+    monkeypatch.setattr(artic_service, "artic_client", klijent)
+    yield zahtevi
+    client.portal.call(klijent.close)
+
+
+@pytest.fixture
+def inserti() -> List[int]:
+    """
+    Broj redova svakog INSERT-a u tabelu slike za vreme testa.
+
+    Meri se izvršavanje iskaza, ne kursor: PostgreSQL grupni INSERT sa
+    RETURNING šalje kao jedan upit (insertmanyvalues), a SQLite ga zbog
+    redosleda RETURNING-a izvršava red po red.
+    """
+    redova: List[int] = []
+
+    def zabelezi(conn, clauseelement, multiparams, params, execution_options):
+        if isinstance(clauseelement, Insert) and clauseelement.table.name == Slika.__tablename__:
+            redova.append(len(multiparams) or 1)
+
+    event.listen(async_engine.sync_engine, "before_execute", zabelezi)
+    yield redova
+    event.remove(async_engine.sync_engine, "before_execute", zabelezi)
+
+
+def _uvoz(client, admin, **zahtev) -> dict:
+    odgovor = client.post("/api/slike/from-artic/bulk", json=zahtev, headers=admin)
+    assert odgovor.status_code == 200, odgovor.text
+    return odgovor.json()
+
+
+def test_grupni_uvoz_u_galeriju(client, admin, izlozba, artic, inserti):
+    id_izlozba = izlozba(slike_urls=["https://example.com/postojeca.jpg"])["id_izlozba"]
+    # Rad 1 je već uvezen (van izložbe)
+    prvi = _uvoz(client, admin, artwork_ids=[1])
+    assert prvi["uvezeno"] == 1
+    id_prvog = prvi["rezultati"][0]["id_slika"]
+    artic.clear()
+    inserti.clear()
+
+    ids = list(range(1, 121))
+    odgovor = _uvoz(client, admin, artwork_ids=ids + [5], id_izlozba=id_izlozba)
+
+    # ids= u grupama od ARTIC_PAGE_LIMIT, ponovljen ID se ne traži dvaput
+    assert len(artic) == 2
+    grupe = sorted(len(r.url.params["ids"].split(",")) for r in artic)
+    assert grupe == [len(ids) - ARTIC_PAGE_LIMIT, ARTIC_PAGE_LIMIT]
+    # Sve nove slike jednim grupnim INSERT-om
+    assert inserti == [116]
+
+    statusi: Dict[int, dict] = {r["artwork_id"]: r for r in odgovor["rezultati"]}
+    assert [r["artwork_id"] for r in odgovor["rezultati"]] == ids
+    assert statusi[1] == {"artwork_id": 1, "status": "duplikat", "id_slika": id_prvog}
+    assert statusi[118]["status"] == "duplikat"
+    assert statusi[BEZ_SLIKE]["status"] == "bez_slike"
+    assert statusi[NEPOSTOJECI]["status"] == "nije_pronadjena"
+    uvezene = [r["id_slika"] for r in odgovor["rezultati"] if r["status"] == "uvezena"]
+    assert odgovor["uvezeno"] == len(uvezene) == 116
+
+    with SessionLocal() as db:
+        slike = db.execute(
+            select(Slika.id_slika, Slika.slika, Slika.redosled, Slika.pretraga)
+            .where(Slika.id_izlozba == id_izlozba)
+            .order_by(Slika.redosled)
+        ).all()
+    # Postojeća slika ostaje prva, uvezene se nastavljaju redom ulaza
+    assert [s.slika for s in slike][0] == "https://example.com/postojeca.jpg"
+    assert [s.id_slika for s in slike[1:]] == uvezene
+    assert [s.redosled for s in slike] == list(range(len(slike)))
+    assert slike[1].slika == get_image_url("img2")
+    # Grupni INSERT zaobilazi mapper evente - dokument za pretragu je popunjen
+    assert all(s.pretraga for s in slike[1:])
+
+    galerija = client.get(f"/api/izlozbe/{id_izlozba}").json()["slike"]
+    assert len(galerija) == 117
+
+
+def test_nedostupna_grupa_i_pretraga(client, admin, artic):
+    odgovor = _uvoz(client, admin, artwork_ids=list(range(1, ARTIC_PAGE_LIMIT + 1)) + [NEDOSTUPNI])
+    # Greška jedne grupe ne prekida uvoz ostalih
+    assert odgovor["uvezeno"] == ARTIC_PAGE_LIMIT
+    assert odgovor["rezultati"][-1] == {"artwork_id": NEDOSTUPNI, "status": "greska", "id_slika": None}
+
+    # Pretraga: stranice po ARTIC_PAGE_LIMIT, rezultat skraćen na limit
+    artic.clear()
+    odgovor = _uvoz(client, admin, search="pejzaž", limit=150)
+    assert [r.url.params["page"] for r in artic] == ["1", "2"]
+    assert len(odgovor["rezultati"]) == 150
+    # Prvih 100 već postoji, 118 deli sliku sa 117, 119 nema sliku
+    assert odgovor["uvezeno"] == 150 - ARTIC_PAGE_LIMIT - 2
+
+    assert client.post(
+        "/api/slike/from-artic/bulk", json={"search": "nedostupno"}, headers=admin
+    ).status_code == 503
+
+
+def test_uvoz_proverava_izlozbu_i_prava(client, admin, make_user, artic):
+    assert client.post(
+        "/api/slike/from-artic/bulk", json={"artwork_ids": [1], "id_izlozba": 999}, headers=admin
+    ).status_code == 404
+    assert client.post(
+        "/api/slike/from-artic/bulk", json={"artwork_ids": [1]}, headers=make_user("posetilac")
+    ).status_code == 403
+    assert client.post(
+        "/api/slike/from-artic/bulk", json={"artwork_ids": [1], "search": "rad"}, headers=admin
+    ).status_code == 422
+    assert artic == []
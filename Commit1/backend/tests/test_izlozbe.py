@@ -0,0 +1,88 @@
+"""
+Lista izložbi
+Kartice ne nose pun opis, galerija je prazna lista dok nije tražena
+"""
+
+
+def test_kartica_bez_opisa(client, izlozba):
+    nova = izlozba(opis="Dugačak opis izložbe", slike_urls=["https://example.com/1.jpg"])
+
+    kartica = client.get("/api/izlozbe/").json()["items"][0]
+    assert kartica["id_izlozba"] == nova["id_izlozba"]
+    assert "opis" not in kartica
+    assert kartica["slike"] == []
+
+    sa_slikama = client.get("/api/izlozbe/", params={"include": "slike"}).json()["items"][0]
+    assert [s["slika"] for s in sa_slikama["slike"]] == ["https://example.com/1.jpg"]
+
+    assert client.get(f"/api/izlozbe/{nova['id_izlozba']}").json()["opis"] == "Dugačak opis izložbe"
+
+
+def test_pretraga_vidi_izmenu_posle_commit_a(client, izlozba, admin):
+    nova = izlozba(naslov="Impresionisti")
+
+    def pretraga(tekst):
+        odgovor = client.get("/api/izlozbe/", params={"search": tekst})
+        return [i["id_izlozba"] for i in odgovor.json()["items"]]
+
+    assert pretraga("impres") == [nova["id_izlozba"]]
+
+    odgovor = client.put(f"/api/izlozbe/{nova['id_izlozba']}", json={"naslov": "Кубисти"}, headers=admin)
+    assert odgovor.status_code == 200, odgovor.text
+    assert pretraga("kubist") == [nova["id_izlozba"]]
+    assert pretraga("impres") == []
+
+
+def test_pretraga_ne_prima_kursor(client, izlozba):
+    izlozba(naslov="Impresionisti")
+
+    odgovor = client.get("/api/izlozbe/", params={"search": "impres"})
+    assert odgovor.status_code == 200
+    assert odgovor.json()["next_cursor"] is None
+
+    assert client.get("/api/izlozbe/", params={"search": "impres", "cursor": "x"}).status_code == 400
+
+
+def test_nova_slika_menja_verziju_izlozbe(client, izlozba, admin):
+    nova = izlozba()
+    pre = client.get(f"/api/izlozbe/{nova['id_izlozba']}")
+
+    slika = client.post("/api/slike/", json={
+        "slika": "https://example.com/nova.jpg", "id_izlozba": nova["id_izlozba"]
+    }, headers=admin)
+    assert slika.status_code == 201, slika.text
+
+    posle = client.get(f"/api/izlozbe/{nova['id_izlozba']}").json()
+    assert [s["slika"] for s in posle["slike"]] == ["https://example.com/nova.jpg"]
+    assert posle["datum_izmene"] is not None and posle["datum_izmene"] != pre.json()["datum_izmene"]
+
+    assert client.post("/api/slike/", json={
+        "slika": "https://example.com/x.jpg", "id_izlozba": 999
+    }, headers=admin).status_code == 404
+
+
+def test_premestena_slika_menja_etag_obe_izlozbe(client, izlozba, admin):
+    stara = izlozba(naslov="Akvareli")
+    nova = izlozba(naslov="Skulpture")
+    slika = client.post("/api/slike/", json={
+        "slika": "https://example.com/premestena.jpg", "id_izlozba": stara["id_izlozba"]
+    }, headers=admin).json()
+
+    def etag(naslov, **headers):
+        return client.get("/api/izlozbe/", params={"search": naslov}, headers=headers)
+
+    etagovi = {naslov: etag(naslov).headers["etag"] for naslov in ("akvareli", "skulpture")}
+
+    premestena = client.put(f"/api/slike/{slika['id_slika']}", json={
+        "id_izlozba": nova["id_izlozba"]
+    }, headers=admin)
+    assert premestena.status_code == 200, premestena.text
+
+    # Obe galerije su promenjene - keširana verzija nijedne ne važi
+    for naslov, stari_etag in etagovi.items():
+        odgovor = etag(naslov, **{"If-None-Match": stari_etag})
+        assert odgovor.status_code == 200, naslov
+    assert client.get(f"/api/izlozbe/{stara['id_izlozba']}").json()["slike"] == []
+    assert [s["id_slika"] for s in client.get(f"/api/izlozbe/{nova['id_izlozba']}").json()["slike"]] == [
+        slika["id_slika"]
+    ]
@@ -0,0 +1,40 @@
+"""
+Preuzimanje obrade metapodataka slika
+Slika na čekanju pripada tačno jednom procesu, napuštena se ponovo preuzima
+"""
+import asyncio
+from datetime import datetime, timedelta
+from app.database import SessionLocal
+from app.models.slika import Slika, META_U_OBRADI
+from app.services.metadata_worker import MetadataWorker
+
+
+def test_procesi_preuzimaju_razlicite_slike(client):
+    with SessionLocal() as db:
+        db.add_all(Slika(slika=f"https://example.com/{i}.jpg") for i in range(30))
+        db.commit()
+
+    procesi = [MetadataWorker(batch_size=10) for _ in range(4)]
+
+    async def preuzimanje():
+        return await asyncio.gather(*(proces._claim() for proces in procesi))
+
+    grupe = client.portal.call(preuzimanje)
+    preuzete = [slika_id for grupa in grupe for slika_id, _ in grupa]
+    assert len(preuzete) == len(set(preuzete)) == 30
+
+    # Sve su u obradi - drugi krug nema šta da preuzme
+    assert client.portal.call(procesi[0]._claim) == []
+
+
+def test_napustena_obrada_se_ponovo_preuzima(client):
+    with SessionLocal() as db:
+        slika = Slika(
+            slika="https://example.com/pao.jpg", status_metapodataka=META_U_OBRADI,
+            datum_obrade_metapodataka=datetime.utcnow() - timedelta(hours=1)
+        )
+        db.add(slika)
+        db.commit()
+        slika_id = slika.id_slika
+
+    assert client.portal.call(MetadataWorker()._claim) == [(slika_id, "https://example.com/pao.jpg")]
@@ -0,0 +1,53 @@
+"""
+Prometheus /metrics - latencija po ruti i SQL upiti
+"""
+from typing import Dict
+
+
+def _metrike(client) -> Dict[str, float]:
+    """Čita /metrics: "ime{labele}" -> vrednost (bez HELP/TYPE linija)"""
+    odgovor = client.get("/metrics")
+    assert odgovor.status_code == 200
+    assert odgovor.headers["content-type"].startswith("text/plain")
+    metrike = {}
+    for linija in odgovor.text.splitlines():
+        if linija and not linija.startswith("#"):
+            ime, vrednost = linija.rsplit(" ", 1)
+            metrike[ime] = float(vrednost)
+    return metrike
+
+
+def test_metrike_po_ruti_i_sql_upiti(client, izlozba):
+    id_izlozba = izlozba()["id_izlozba"]
+    ruta = 'method="GET",route="/api/izlozbe/{izlozba_id}"'
+    pre = _metrike(client)
+
+    for _ in range(2):
+        assert client.get(f"/api/izlozbe/{id_izlozba}").status_code == 200
+    posle = _metrike(client)
+
+    def razlika(ime: str) -> float:
+        return posle[ime] - pre.get(ime, 0)
+
+    # Šablon rute, ne stvarna putanja - broj labela je ograničen
+    assert razlika(f'http_requests_total{{{ruta},status="200"}}') == 2
+    assert razlika(f'http_request_duration_seconds_count{{{ruta}}}') == 2
+    assert razlika(f'http_request_duration_seconds_bucket{{{ruta},le="+Inf"}}') == 2
+    assert razlika(f'http_request_duration_seconds_sum{{{ruta}}}') > 0
+    assert not any(f"/api/izlozbe/{id_izlozba}\"" in ime for ime in posle)
+
+    # Upiti zahteva se broje i globalno i po ruti
+    upita = razlika('http_request_db_queries_sum{route="/api/izlozbe/{izlozba_id}"}')
+    assert upita >= 2
+    assert razlika("db_queries_total") >= upita
+    assert razlika("db_query_seconds_total") > 0
+
+
+def test_metrics_i_health_se_ne_mere(client):
+    pre = _metrike(client)
+    client.get("/health/live")
+    posle = _metrike(client)
+    assert not any('route="/metrics"' in ime or 'route="/health' in ime for ime in posle)
+    assert {ime for ime in posle if ime.startswith("http_requests_total")} == {
+        ime for ime in pre if ime.startswith("http_requests_total")
+    }
@@ -0,0 +1,60 @@
+"""
+Metrike connection pool-a - zauzetost, čekanje na konekciju i istekla čekanja
+"""
+import pytest
+from sqlalchemy import create_engine, exc
+from sqlalchemy.pool import QueuePool
+from app.config import settings
+from app.utils.pool_metrics import instrumented_pool, pool_metrics
+
+
+def test_zauzetost_i_istekla_cekanja():
+    engine = create_engine(
+        "sqlite://", poolclass=instrumented_pool(QueuePool, "test-pool"),
+        pool_size=1, max_overflow=0, pool_timeout=0.05
+    )
+    metrike = pool_metrics["test-pool"]
+    try:
+        with engine.connect():
+            stanje = metrike.snapshot(engine.pool)
+            assert (stanje["size"], stanje["checked_out"], stanje["timeouts"]) == (1, 1, 0)
+            assert stanje["wait_seconds"]["count"] == 1
+
+            # Jedina konekcija je zauzeta - drugi zahtev čeka pool_timeout
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+
+        stanje = metrike.snapshot(engine.pool)
+        assert (stanje["checked_out"], stanje["timeouts"]) == (0, 1)
+        # Isteklo čekanje nije preuzimanje konekcije
+        assert stanje["wait_seconds"]["count"] == 1
+        # Histogram je kumulativan, poslednja granica je +Inf
+        granice = list(stanje["wait_seconds"]["buckets"].values())
+        assert granice == sorted(granice) and granice[-1] == 1
+    finally:
+        engine.dispose()
+
+
+def test_metrike_poola_u_health_i_metrics(client):
+    def preuzimanja():
+        odgovor = client.get("/health/db-pool")
+        assert odgovor.status_code == 200
+        return odgovor.json()
+
+    pre = preuzimanja()
+    assert client.get("/api/izlozbe/").status_code == 200
+    posle = preuzimanja()
+
+    assert posle["pool_size"] == settings.DB_POOL_SIZE
+    assert posle["max_overflow"] == settings.DB_MAX_OVERFLOW
+    # Zahtev je preuzeo i vratio async konekciju
+    async_pool = posle["pools"]["async"]
+    assert async_pool["wait_seconds"]["count"] > pre["pools"]["async"]["wait_seconds"]["count"]
+    assert async_pool["checked_out"] == 0
+
+    tekst = client.get("/metrics").text
+    for pool in ("async", "sync"):
+        for metrika in ("db_pool_size", "db_pool_checked_out", "db_pool_overflow", "db_pool_timeouts_total"):
+            assert f'{metrika}{{pool="{pool}"}} ' in tekst
+        assert f'db_pool_wait_seconds_bucket{{pool="{pool}",le="+Inf"}} ' in tekst
+        assert f'db_pool_wait_seconds_count{{pool="{pool}"}} ' in tekst
@@ -0,0 +1,90 @@
+"""
+Prijave - grupna validacija QR kodova na ulazu i QR slike karata
+"""
+import pytest
+from app.config import settings
+from app.services.qr_service import render_qr_png, render_qr_svg
+from app.services.qr_worker import qr_worker
+
+PNG_POTPIS = b"\x89PNG\r\n\x1a\n"
+
+
+def test_ponovljen_kod_vraca_prijavu_prvog_pojavljivanja(client, make_user, admin, izlozba):
+    id_izlozba = izlozba()["id_izlozba"]
+    kodovi = []
+    for i in range(2):
+        posetilac = make_user(f"posetilac{i}")
+        prijava = client.post("/api/prijave/", json={"id_izlozba": id_izlozba}, headers=posetilac)
+        assert prijava.status_code == 201, prijava.text
+        kodovi.append((prijava.json()["id_prijava"], prijava.json()["qr_kod"]))
+    (prva, kod), (druga, drugi_kod) = kodovi
+
+    odgovor = client.post("/api/prijave/validate/batch", json={
+        "id_izlozba": id_izlozba + 1, "qr_kodovi": [drugi_kod, drugi_kod]
+    }, headers=admin).json()
+    assert [(r["status"], r["id_prijava"]) for r in odgovor["rezultati"]] == [
+        ("pogresna_izlozba", druga), ("pogresna_izlozba", druga)
+    ]
+
+    odgovor = client.post("/api/prijave/validate/batch", json={
+        "id_izlozba": id_izlozba, "qr_kodovi": [kod, "neispravan", kod, "neispravan"]
+    }, headers=admin).json()
+    assert [(r["status"], r["id_prijava"]) for r in odgovor["rezultati"]] == [
+        ("validna", prva), ("neispravna", None), ("vec_iskoriscena", prva), ("neispravna", None)
+    ]
+    assert odgovor["validno"] == 1
+
+
+def _prijava(client, headers, id_izlozba) -> dict:
+    """Prijava sa gotovom QR slikom (čeka qr_worker)"""
+    odgovor = client.post("/api/prijave/", json={"id_izlozba": id_izlozba}, headers=headers)
+    assert odgovor.status_code == 201, odgovor.text
+    client.portal.call(qr_worker.shutdown)
+    odgovor = client.get(f"/api/prijave/{odgovor.json()['id_prijava']}", headers=headers)
+    assert odgovor.json()["status_qr"] == "spreman"
+    return odgovor.json()
+
+
+def test_qr_png_iz_kesa_i_etag(client, make_user, admin, izlozba):
+    posetilac = make_user("posetilac")
+    prijava = _prijava(client, posetilac, izlozba()["id_izlozba"])
+    adresa = f"/api/prijave/{prijava['id_prijava']}/qr.png"
+
+    render_qr_png.cache_clear()
+    prvi = client.get(adresa, headers=posetilac)
+    assert prvi.status_code == 200
+    assert prvi.headers["content-type"] == "image/png"
+    assert prvi.content.startswith(PNG_POTPIS)
+    assert render_qr_png.cache_info().misses == 1
+
+    # Ista karta se ne renderuje ponovo (admin vidi tuđu prijavu)
+    drugi = client.get(adresa, headers=admin)
+    assert drugi.content == prvi.content
+    assert render_qr_png.cache_info().hits == 1
+
+    # Slika se menja samo sa qr_kod-om - klijent je kešira po ETag-u
+    assert "max-age" in prvi.headers["cache-control"]
+    nepromenjen = client.get(adresa, headers={**posetilac, "If-None-Match": prvi.headers["etag"]})
+    assert nepromenjen.status_code == 304
+    assert nepromenjen.content == b""
+
+    assert client.get(adresa, headers=make_user("drugi")).status_code == 403
+    assert client.get(adresa).status_code == 401
+
+
+@pytest.mark.parametrize("sacuvaj", [True, False])
+def test_qr_slika_bez_cuvanja_u_bazi(client, make_user, izlozba, monkeypatch, sacuvaj):
+    monkeypatch.setattr(settings, "QR_STORE_IMAGE", sacuvaj)
+    posetilac = make_user("posetilac")
+    prijava = _prijava(client, posetilac, izlozba()["id_izlozba"])
+    assert (prijava["slika_qr"] is not None) == sacuvaj
+
+    # Bez sačuvane slike PNG i SVG se generišu iz qr_kod-a na zahtev
+    render_qr_png.cache_clear()
+    render_qr_svg.cache_clear()
+    png = client.get(f"/api/prijave/{prijava['id_prijava']}/qr.png", headers=posetilac)
+    svg = client.get(f"/api/prijave/{prijava['id_prijava']}/qr.svg", headers=posetilac)
+    assert png.status_code == svg.status_code == 200
+    assert png.content == render_qr_png(prijava["qr_kod"])
+    assert svg.headers["content-type"] == "image/svg+xml"
+    assert b"<svg" in svg.content
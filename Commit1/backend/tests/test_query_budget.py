@@ -0,0 +1,80 @@
+"""
+Budžet SQL upita endpointa
+Svaki endpoint sa @query_budget se poziva sa praznim kešom korisnika i
+odgovora - pytest plugin obara test kada zahtev prekorači budžet
+"""
+import pytest
+from sqlalchemy import text
+from app.database import AsyncSessionLocal, SessionLocal
+from app.utils.cache import response_cache
+from app.utils.profiler import QueryBudgetExceeded, query_budget
+from app.utils.user_cache import user_cache
+
+
+@pytest.fixture
+def hladno():
+    """Poziva endpoint bez keša - najgori slučaj za budžet"""
+    def call(method, url, **kwargs):
+        user_cache.clear()
+        response_cache.backend.clear()
+        return method(url, **kwargs)
+    return call
+
+
+def test_javni_endpointi_u_budzetu(client, izlozba, hladno):
+    # Slike izložbe - selectinload ulazi u budžet
+    nova = izlozba(slike_urls=["https://example.com/1.jpg", "https://example.com/2.jpg"])
+    id_izlozba = nova["id_izlozba"]
+
+    assert hladno(client.get, "/api/lokacije/").status_code == 200
+    assert hladno(client.get, "/api/izlozbe/").status_code == 200
+    assert hladno(client.get, "/api/izlozbe/", params={"include": "slike"}).status_code == 200
+    assert hladno(client.get, "/api/izlozbe/", params={"search": "izlozba"}).status_code == 200
+    assert hladno(client.get, "/api/izlozbe/nearby", params={"lat": 44.8, "lng": 20.46}).status_code == 200
+    assert hladno(client.get, f"/api/izlozbe/slug/{nova['slug']}").status_code == 200
+    assert hladno(client.get, f"/api/izlozbe/{id_izlozba}").status_code == 200
+    assert hladno(client.get, f"/api/izlozbe/{id_izlozba}/thumbnail").status_code == 404
+    assert hladno(client.get, "/api/slike/").status_code == 200
+    assert hladno(client.get, "/api/slike/999/image").status_code == 404
+
+
+def test_prijave_u_budzetu(client, make_user, admin, izlozba, hladno):
+    id_izlozba = izlozba()["id_izlozba"]
+    posetilac = make_user("posetilac")
+
+    prijava = hladno(client.post, "/api/prijave/", json={
+        "id_izlozba": id_izlozba, "broj_karata": 2
+    }, headers=posetilac)
+    assert prijava.status_code == 201, prijava.text
+    id_prijava = prijava.json()["id_prijava"]
+
+    assert hladno(client.get, "/api/prijave/moje", headers=posetilac).status_code == 200
+    assert hladno(client.get, f"/api/prijave/{id_prijava}", headers=posetilac).status_code == 200
+    assert hladno(client.get, "/api/prijave/", headers=admin).status_code == 200
+
+    qr_kod = client.get(f"/api/prijave/{id_prijava}", headers=posetilac).json()["qr_kod"]
+    batch = hladno(client.post, "/api/prijave/validate/batch", json={
+        "qr_kodovi": [qr_kod, qr_kod, "neispravan"]
+    }, headers=admin)
+    assert batch.status_code == 200, batch.text
+
+
+def test_prekoracen_budzet_obara_zahtev(client):
+    @client.app.get("/_test/preko-budzeta")
+    @query_budget(0)
+    async def preko_budzeta():
+        async with AsyncSessionLocal() as db:
+            await db.execute(text("SELECT 1"))
+        return {}
+
+    try:
+        with pytest.raises(QueryBudgetExceeded):
+            client.get("/_test/preko-budzeta")
+    finally:
+        client.app.router.routes.pop()
+
+
+@pytest.mark.query_budget(1)
+def test_marker_ogranicava_upite_testa():
+    with SessionLocal() as db:
+        db.execute(text("SELECT 1"))
@@ -0,0 +1,100 @@
+"""
+Rezervacija karata i brojač prodato_karata
+Istovremene prijave na jednu izložbu ne smeju prodati više od kapaciteta,
+a otkazivanje i brisanje korisnika vraćaju karte u preostali kapacitet
+"""
+import asyncio
+import httpx
+from sqlalchemy import func, select
+from app.database import SessionLocal
+from app.main import app
+from app.models.izlozba import Izlozba
+from app.models.prijava import Prijava
+
+KAPACITET = 37
+ZAHTEVA = 200
+KARATA_PO_PRIJAVI = 2
+
+
+def test_istovremene_rezervacije_ne_prodaju_vise_od_kapaciteta(client, make_user, izlozba):
+    id_izlozba = izlozba(kapacitet=KAPACITET)["id_izlozba"]
+    korisnici = [make_user(f"posetilac{i}") for i in range(ZAHTEVA)]
+
+    async def navala():
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as ac:
+            return await asyncio.gather(*(
+                ac.post("/api/prijave/", json={
+                    "id_izlozba": id_izlozba, "broj_karata": KARATA_PO_PRIJAVI
+                }, headers=headers)
+                for headers in korisnici
+            ))
+
+    # Isti event loop kao aplikacija (i async engine) u TestClient-u
+    odgovori = client.portal.call(navala)
+
+    statusi = [r.status_code for r in odgovori]
+    assert set(statusi) <= {201, 400}, [r.text for r in odgovori if r.status_code not in (201, 400)][:3]
+    uspesne = statusi.count(201)
+    assert uspesne == KAPACITET // KARATA_PO_PRIJAVI
+
+    with SessionLocal() as db:
+        prodato = db.scalar(select(Izlozba.prodato_karata).where(Izlozba.id_izlozba == id_izlozba))
+        u_prijavama = db.scalar(
+            select(func.sum(Prijava.broj_karata)).where(Prijava.id_izlozba == id_izlozba)
+        )
+    assert prodato == u_prijavama == uspesne * KARATA_PO_PRIJAVI
+    assert prodato <= KAPACITET
+    assert client.get(f"/api/izlozbe/{id_izlozba}").json()["preostali_kapacitet"] == KAPACITET - prodato
+
+
+def _preostalo(client, id_izlozba):
+    """Preostali kapacitet iz detalja i iz kartice u listi (moraju se slagati)"""
+    detalj = client.get(f"/api/izlozbe/{id_izlozba}").json()["preostali_kapacitet"]
+    (kartica,) = [k for k in client.get("/api/izlozbe/").json()["items"] if k["id_izlozba"] == id_izlozba]
+    assert kartica["preostali_kapacitet"] == detalj
+    return detalj
+
+
+def _prodato(id_izlozba):
+    """Brojač i zbir karata u prijavama"""
+    with SessionLocal() as db:
+        prodato = db.scalar(select(Izlozba.prodato_karata).where(Izlozba.id_izlozba == id_izlozba))
+        u_prijavama = db.scalar(
+            select(func.coalesce(func.sum(Prijava.broj_karata), 0)).where(Prijava.id_izlozba == id_izlozba)
+        )
+    assert prodato == u_prijavama
+    return prodato
+
+
+def test_otkazivanje_i_brisanje_korisnika_vracaju_karte(client, make_user, admin, izlozba):
+    id_izlozba = izlozba(kapacitet=10)["id_izlozba"]
+    prvi, drugi, treci = (make_user(f"posetilac{i}") for i in range(3))
+    assert _preostalo(client, id_izlozba) == 10
+
+    prijava = client.post("/api/prijave/", json={"id_izlozba": id_izlozba, "broj_karata": 3}, headers=prvi)
+    assert prijava.status_code == 201, prijava.text
+    assert client.post(
+        "/api/prijave/", json={"id_izlozba": id_izlozba, "broj_karata": 4}, headers=drugi
+    ).status_code == 201
+    assert _prodato(id_izlozba) == 7
+    assert _preostalo(client, id_izlozba) == 3
+
+    odbijena = client.post("/api/prijave/", json={"id_izlozba": id_izlozba, "broj_karata": 4}, headers=treci)
+    assert odbijena.status_code == 400
+    assert "Preostalo: 3" in odbijena.json()["detail"]
+    assert _prodato(id_izlozba) == 7
+
+    # Kapacitet ne može pasti ispod prodatih karata
+    assert client.put(f"/api/izlozbe/{id_izlozba}", json={"kapacitet": 6}, headers=admin).status_code == 400
+
+    assert client.delete(f"/api/prijave/{prijava.json()['id_prijava']}", headers=prvi).status_code == 204
+    assert _prodato(id_izlozba) == 4
+    assert _preostalo(client, id_izlozba) == 6
+
+    # Brisanje korisnika briše i njegove prijave
+    id_drugog = client.get("/api/auth/me", headers=drugi).json()["id_korisnik"]
+    assert client.delete(f"/api/korisnici/{id_drugog}", headers=admin).status_code == 204
+    assert _prodato(id_izlozba) == 0
+    assert _preostalo(client, id_izlozba) == 10
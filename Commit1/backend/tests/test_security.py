@@ -0,0 +1,48 @@
+"""
+Heširanje lozinki van event loop-a
+Pun red čekanja odbija zahtev odmah (503) umesto da blokira event loop
+"""
+import asyncio
+import threading
+import time
+import pytest
+from fastapi import HTTPException
+from app.utils import security
+from app.utils.security import PasswordHasher
+
+
+def test_pun_red_odbija_bez_blokiranja(monkeypatch):
+    pusti = threading.Event()
+
+    def spor_hes(password):
+        pusti.wait(5)
+        return f"hes:{password}"
+    monkeypatch.setattr(security, "get_password_hash", spor_hes)
+
+    hasher = PasswordHasher(workers=1, max_queue=1)
+
+    async def scenario():
+        # Jedan zahtev u niti, jedan u redu - red je pun
+        zauzeti = [asyncio.ensure_future(hasher.hash(f"lozinka{i}")) for i in range(2)]
+        while hasher.pending < 2:
+            await asyncio.sleep(0)
+        assert hasher.queue_depth == 1
+
+        start = time.perf_counter()
+        with pytest.raises(HTTPException) as odbijen:
+            await hasher.hash("visak")
+        assert time.perf_counter() - start < 0.5
+        assert odbijen.value.status_code == 503
+        assert odbijen.value.headers["Retry-After"] == "1"
+
+        pusti.set()
+        assert await asyncio.gather(*zauzeti) == ["hes:lozinka0", "hes:lozinka1"]
+        assert hasher.pending == 0
+        # Red je ispražnjen - novi zahtev prolazi
+        assert await hasher.hash("posle") == "hes:posle"
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        pusti.set()
+        hasher.shutdown()
@@ -0,0 +1,65 @@
+"""
+Keš autentifikovanih korisnika
+"""
+import pytest
+from pydantic import ValidationError
+from app.database import SessionLocal
+from app.models.korisnik import Korisnik
+from app.schemas.korisnik import TrenutniKorisnik
+from app.utils.user_cache import user_cache
+
+
+def test_kesirani_korisnik_je_samo_za_citanje(client, make_user):
+    headers = make_user("citalac")
+    assert client.get("/api/auth/me", headers=headers).json()["username"] == "citalac"
+
+    (korisnik,) = [k for _, k in user_cache._entries.values()]
+    assert isinstance(korisnik, TrenutniKorisnik)
+    assert not hasattr(korisnik, "lozinka")
+    with pytest.raises(ValidationError):
+        korisnik.super_korisnik = True
+
+    # Pogodak iz keša vraća iste podatke
+    assert client.get("/api/auth/me", headers=headers).json()["id_korisnik"] == korisnik.id_korisnik
+
+
+def _id(client, headers):
+    odgovor = client.get("/api/auth/me", headers=headers)
+    assert odgovor.status_code == 200, odgovor.text
+    return odgovor.json()["id_korisnik"]
+
+
+def test_izmene_korisnika_ponistavaju_kes(client, make_user, admin):
+    deaktiviran = make_user("deaktiviran")
+    obrisan = make_user("obrisan")
+    razvlascen = make_user("razvlascen", admin=True)
+    # Tokeni su važeći, a korisnici u kešu
+    id_deaktiviran, id_obrisan, id_razvlascen = (
+        _id(client, h) for h in (deaktiviran, obrisan, razvlascen)
+    )
+    assert client.get("/api/korisnici/", headers=razvlascen).status_code == 200
+
+    assert client.put(f"/api/korisnici/{id_deaktiviran}", json={"aktivan": False}, headers=admin).status_code == 200
+    assert client.get("/api/auth/me", headers=deaktiviran).status_code == 401
+
+    assert client.delete(f"/api/korisnici/{id_obrisan}", headers=admin).status_code == 204
+    assert client.get("/api/auth/me", headers=obrisan).status_code == 401
+
+    assert client.put(
+        f"/api/korisnici/{id_razvlascen}", json={"super_korisnik": False}, headers=admin
+    ).status_code == 200
+    assert client.get("/api/korisnici/", headers=razvlascen).status_code == 403
+
+
+def test_upis_mimo_api_ja_vidi_se_tek_posle_invalidacije(client, make_user):
+    headers = make_user("mimo")
+    id_korisnik = _id(client, headers)
+
+    with SessionLocal() as db:
+        db.get(Korisnik, id_korisnik).aktivan = False
+        db.commit()
+    # Keš je i dalje važeći (do isteka AUTH_CACHE_TTL_SECONDS)
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+
+    user_cache.invalidate(id_korisnik)
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
@@ -58,7 +58,7 @@ export default function AdminPanel() {
                 setLoading(true);
 
                 // Fetch based on active tab
-                const exhibitionsData = await izlozbeAPI.getAll({ per_page: 50 });
+                const exhibitionsData = await izlozbeAPI.getAll({ per_page: 50, include: 'slike' });
                 setExhibitions(exhibitionsData.items || []);
 
                 const locationsData = await lokacijeAPI.getAll();
@@ -121,6 +121,17 @@ export default function AdminPanel() {
     };
 
     // Exhibition Handlers
+    // Lista vraća kartice bez opisa - forma za izmenu se puni punom izložbom
+    const openExhibitionEdit = async (exhibition) => {
+        try {
+            const data = await izlozbeAPI.getById(exhibition.id_izlozba);
+            setExhibitionModal({ open: true, mode: 'edit', data });
+        } catch (err) {
+            console.error('Greška pri učitavanju izložbe:', err);
+            setMessage('Došlo je do greške');
+        }
+    };
+
     const handleExhibitionSubmit = async (e) => {
         e.preventDefault();
         setLoading(true);
@@ -190,7 +201,7 @@ export default function AdminPanel() {
             }
 
             // Refresh list
-            const refreshData = await izlozbeAPI.getAll({ per_page: 50 });
+            const refreshData = await izlozbeAPI.getAll({ per_page: 50, include: 'slike' });
             setExhibitions(refreshData.items || []);
             setExhibitionModal({ open: false, mode: 'create', data: null });
         } catch (err) {
@@ -387,7 +398,7 @@ export default function AdminPanel() {
                                                                 <FiEye className="w-4 h-4" />
                                                             </button>
                                                             <button
-                                                                onClick={() => setExhibitionModal({ open: true, mode: 'edit', data: exhibition })}
+                                                                onClick={() => openExhibitionEdit(exhibition)}
                                                                 className="p-2 text-luxury-silver hover:text-accent-gold transition-colors"
                                                                 title="Izmeni"
                                                             >
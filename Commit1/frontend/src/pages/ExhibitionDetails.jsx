@@ -72,8 +72,8 @@ export default function ExhibitionDetails() {
                 broj_karata: ticketCount,
             });
 
-            setQrData(response.slika_qr);
             setRegisterSuccess(true);
+            setQrData(await prijaveAPI.getQr(response.id_prijava));
         } catch (err) {
             setRegisterError(err.response?.data?.detail || 'Greška pri prijavi');
         } finally {
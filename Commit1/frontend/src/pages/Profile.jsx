@@ -34,7 +34,7 @@ export default function Profile() {
     const [successModal, setSuccessModal] = useState(false);
 
     // QR modal
-    const [qrModal, setQrModal] = useState({ open: false, data: null });
+    const [qrModal, setQrModal] = useState({ open: false, data: null, src: null });
 
     // Redirect ako nije prijavljen
     useEffect(() => {
@@ -63,6 +63,21 @@ export default function Profile() {
         }
     }, [isAuthenticated]);
 
+    // Prikaz QR koda (slika se dohvata sa servera tek na zahtev)
+    const openQrModal = async (registration) => {
+        try {
+            const src = await prijaveAPI.getQr(registration.id_prijava);
+            setQrModal({ open: true, data: registration, src });
+        } catch (err) {
+            console.error('Greška pri učitavanju QR koda:', err);
+        }
+    };
+
+    const closeQrModal = () => {
+        if (qrModal.src) URL.revokeObjectURL(qrModal.src);
+        setQrModal({ open: false, data: null, src: null });
+    };
+
     // Otkazivanje prijave
     const handleDelete = async () => {
         try {
@@ -238,11 +253,11 @@ export default function Profile() {
                                     {/* Actions */}
                                     <div className="flex items-center gap-2">
                                         {/* QR kod */}
-                                        {registration.slika_qr && (
+                                        {registration.qr_kod && (
                                             <CustomButton
                                                 variant="outline"
                                                 size="sm"
-                                                onClick={() => setQrModal({ open: true, data: registration })}
+                                                onClick={() => openQrModal(registration)}
                                             >
                                                 <FiDownload className="w-4 h-4 mr-1" />
                                                 QR Kod
@@ -297,14 +312,14 @@ export default function Profile() {
             {/* QR Modal */}
             <Modal
                 isOpen={qrModal.open}
-                onClose={() => setQrModal({ open: false, data: null })}
+                onClose={closeQrModal}
                 title="QR kod za ulaz"
                 size="sm"
             >
                 {qrModal.data && (
                     <div className="text-center">
                         <img
-                            src={qrModal.data.slika_qr}
+                            src={qrModal.src}
                             alt="QR kod"
                             className="w-48 h-48 mx-auto mb-4 border border-luxury-gray"
                         />
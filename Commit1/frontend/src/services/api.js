@@ -206,6 +206,12 @@ export const prijaveAPI = {
         return response.data;
     },
 
+    // QR kod prijave kao slika (object URL za <img>)
+    getQr: async (id, format = 'png') => {
+        const response = await api.get(`/prijave/${id}/qr.${format}`, { responseType: 'blob' });
+        return URL.createObjectURL(response.data);
+    },
+
     // Kreiranje prijave
     create: async (data) => {
         const response = await api.post('/prijave', data);